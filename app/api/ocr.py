@@ -1,126 +1,586 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Form, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 import aiofiles
+import asyncio
+import json
+import logging
 import os
-from typing import Dict, Any
+import threading
+import time
+import zipfile
+from datetime import datetime
+from concurrent.futures import Future
+from typing import AsyncIterator, Callable, Dict, Any, Iterable, List, Optional, Tuple
 
 from app.services.comparator import OCRComparator
 from app.services.google_sheets import GoogleSheetsService
+from app.services.google_vision import VISION_FEATURES
+from app.services.cache import result_cache
+from app.services.documents import DOCUMENT_FORMATS, DocumentComparator
+from app.services.ratelimit import client_limiter, provider_quotas, retry_after_header
+from app.services.results import ResultSheetSync, ResultStore
+from app.services.scheduler import BatchItem, BatchScheduler
+from app.services.jobs import JobManager
+from app.services.routing import ProviderRouter
+from app.services.shared import hold_lease
+from app.services.sheet_writer import SheetWriter
+from app.utils.lazy import Lazy
+from app.utils.payload import ImagePayload
 from app.models.schemas import OCRComparisonResponse
 from app.core.config import settings
+from app.core.metrics import RATE_LIMITED, UPLOAD_BYTES, registry as metrics_registry, span
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
-comparator = OCRComparator()
-sheets_service = GoogleSheetsService()
+# 모든 비교 결과의 기준 기록 (SQLite 연결은 첫 기록/조회 시 생성)
+result_store = Lazy("result_store", lambda: ResultStore(settings.RESULTS_DB_PATH))
+comparator = OCRComparator(results=result_store if settings.RESULTS_ENABLED else None)
+# 자격증명 확인과 gspread 인증은 첫 시트 저장(또는 워밍업) 시 수행
+sheets_service = Lazy("google_sheets", GoogleSheetsService)
+sheet_writer = SheetWriter(sheets_service.get)
+# 저장소 → 시트 주기적 내보내기 (SHEET_SYNC_INTERVAL > 0일 때 앱 시작 시 실행)
+# 다중 워커에서는 리스를 잡은 워커만 내보냄 (한 번 내보내는 동안 리스가 끝나지 않도록 여유를 둠)
+sheet_sync = ResultSheetSync(
+    result_store.get, sheet_writer, settings.SHEET_SYNC_SHEET, settings.SHEET_SYNC_INTERVAL,
+    leader=lambda: hold_lease("sheet_sync", max(settings.SHEET_SYNC_INTERVAL * 3, 300))
+)
+batch_scheduler = BatchScheduler(comparator)
+# 라우팅 모드: 비교 모드와 같은 제공자/실행기/롤링 통계를 공유
+provider_router = ProviderRouter(comparator.registry, comparator.executor, comparator.stats, comparator.preprocessor)
+job_manager = JobManager(batch_scheduler)
+# PDF/다중 프레임 TIFF: 페이지를 배치 스케줄러로 병렬 비교
+document_comparator = DocumentComparator(batch_scheduler)
 
-@router.post("/compare", response_model=OCRComparisonResponse)
-async def compare_ocr(file: UploadFile = File(...), save_to_sheet: bool = Form(False), sheet_name: str = Form("OCR Comparison")):
-    print(f"🔍 [API] 파라미터 수신: save_to_sheet={save_to_sheet}, sheet_name={sheet_name}")
+# 수집 시점에 각 구성 요소의 현재 상태를 읽는 게이지
+metrics_registry.gauge(
+    "ocr_cache_entries", "OCR result cache entries",
+    callback=lambda: {(): result_cache.stats()["entries"]}
+)
+metrics_registry.gauge(
+    "ocr_cache_hit_ratio", "OCR result cache hit ratio",
+    callback=lambda: {(): result_cache.stats()["hit_rate"]}, merge_mode="mean"
+)
+metrics_registry.gauge(
+    "ocr_sheet_queue_rows", "Rows waiting in the sheet writer queue",
+    callback=lambda: {(): sheet_writer.stats()["queued"]}
+)
+metrics_registry.gauge(
+    "ocr_sheet_spill_pending", "1 if failed sheet rows are waiting in the spill file",
+    callback=lambda: {(): float(sheet_writer.stats()["spill_pending"])}, merge_mode="max"
+)
+metrics_registry.gauge(
+    "ocr_sheet_rows_written", "Rows appended to Google Sheets since start",
+    callback=lambda: {(): sheet_writer.stats()["rows_written"]}
+)
+metrics_registry.gauge(
+    "ocr_circuit_open", "1 if the provider circuit breaker is open, 0.5 if half-open", ("provider",),
+    callback=lambda: {
+        (("provider", name),): {"open": 1.0, "half_open": 0.5}.get(status["state"], 0.0)
+        for name, status in comparator.executor.breakers.status()["providers"].items()
+    },
+    merge_mode="max"
+)
+
+async def _read_upload(file: UploadFile) -> ImagePayload:
+    with span("read_upload"):
+        payload = await ImagePayload.from_upload(file)
+    UPLOAD_BYTES.observe(payload.size)
+    return payload
+
+def _client_id(request: Request) -> str:
+    """요청 수 제한 키: 등록된 API 키, 아니면 (신뢰하는 프록시를 거친) 클라이언트 IP"""
+    return client_limiter.client_key(
+        request.headers.get(settings.RATE_LIMIT_HEADER),
+        request.client.host if request.client else None,
+        request.headers.get("x-forwarded-for")
+    )
+
+def admission(providers: Optional[Callable[[Request], Iterable[str]]] = None):
+    """
+    OCR 엔드포인트 진입 제어 (제공자를 호출하기 전에 빠르게 429 + Retry-After로 거절).
+    호출할 제공자의 예산 대기가 한도를 넘었거나 클라이언트가 요청 수 한도를 넘으면 거절한다.
+    providers를 주지 않으면 비교 대상 제공자 전체를 확인
+    """
+    async def admit(request: Request):
+        names = providers(request) if providers is not None else comparator.providers
+        retry_after = await provider_quotas.aretry_after(names)
+        reason = "provider_quota"
+        if retry_after is None:
+            retry_after = await client_limiter.acheck(_client_id(request))
+            reason = "client"
+        if retry_after is not None:
+            RATE_LIMITED.inc(reason=reason)
+            detail = "Rate limit exceeded" if reason == "client" else "OCR provider call budget exhausted"
+            raise HTTPException(status_code=429, detail=f"{detail}, retry later",
+                                headers={"Retry-After": retry_after_header(retry_after)})
+    return Depends(admit)
+
+def _spreadsheet_url():
+    """시트 서비스가 이미 초기화된 경우에만 URL 반환 (요청 경로에서 초기화하지 않음)"""
+    return sheets_service.get().get_spreadsheet_url() if sheets_service.ready else None
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp", ".tif", ".tiff")
+
+def _is_zip(file: UploadFile) -> bool:
+    return file.content_type in ("application/zip", "application/x-zip-compressed") or \
+        (file.filename or "").lower().endswith(".zip")
+
+def _zip_member_loader(archive: zipfile.ZipFile, info: zipfile.ZipInfo, lock: threading.Lock):
+    def read() -> bytes:
+        with lock:
+            return archive.read(info)
+
+    async def load() -> bytes:
+        return await asyncio.to_thread(read)
+    return load
+
+def _batch_items(files: List[UploadFile]) -> List[BatchItem]:
+    """업로드 파일(이미지 여러 장 또는 zip)을 배치 항목으로 변환 (내용은 처리 시점에 읽음)"""
+    items = []
+    for file in files:
+        if _is_zip(file):
+            try:
+                archive = zipfile.ZipFile(file.file)
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail=f"Invalid zip file: {file.filename}")
+            lock = threading.Lock()
+            for info in archive.infolist():
+                if info.is_dir() or info.filename.startswith("__MACOSX/"):
+                    continue
+                error = None
+                if not info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                    error = "File must be an image"
+                elif info.file_size > settings.MAX_FILE_SIZE:
+                    error = "File size exceeds 10MB limit"
+                items.append(BatchItem(len(items), info.filename, _zip_member_loader(archive, info, lock), error))
+        else:
+            error = None
+            if not (file.content_type or "").startswith('image/'):
+                error = "File must be an image"
+            elif file.size and file.size > settings.MAX_FILE_SIZE:
+                error = "File size exceeds 10MB limit"
+            items.append(BatchItem(len(items), file.filename, file.read, error))
     
-    if not file.content_type.startswith('image/'):
-        raise HTTPException(status_code=400, detail="File must be an image")
+    if len(items) > settings.BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"Too many images (max {settings.BATCH_MAX_FILES})")
+    return items
+
+def _is_document_upload(file: UploadFile) -> bool:
+    return file.content_type == "application/pdf" or (file.filename or "").lower().endswith(".pdf")
+
+async def _open_document(payload: ImagePayload, single_page: bool = True):
+    """문서를 열어 페이지 수 확인 (single_page=False이면 한 페이지짜리 TIFF는 None을 반환해 일반 이미지로 처리)"""
+    try:
+        document = await document_comparator.rasterizer.open(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImportError:
+        raise HTTPException(status_code=501, detail="PDF support requires the pypdfium2 package")
+    if not single_page and document.format == "tiff" and document.pages == 1:
+        document.close()
+        return None
+    return document
+
+def _document_stream(document, save_to_sheet: bool = False, sheet_name: str = "OCR Comparison") -> StreamingResponse:
+    """
+    페이지별 비교 결과를 완료 순서대로 NDJSON으로 스트리밍하고, 마지막 줄에 문서 단위 병합 결과를 보냄
+    (페이지 이미지는 처리할 때 래스터화되어 전체 페이지를 메모리에 올리지 않음)
+    """
+    async def stream():
+        try:
+            async for line in document_comparator.run(document):
+                if "document" in line and save_to_sheet:
+                    merged = line["document"]
+                    row = GoogleSheetsService.build_row(
+                        image_name=f"{document.filename} ({document.pages} pages)",
+                        image_size=os.path.getsize(document.path),
+                        google_result=merged.get("google_vision", {}),
+                        naver_result=merged.get("naver_clova", {}),
+                        comparison_result=merged["comparison"]
+                    )
+                    with span("sheet_enqueue"):
+                        sheet_writer.submit(sheet_name, row)
+                    merged["sheet_info"] = _queued_sheet_info(sheet_name)
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+        finally:
+            document.close()
     
-    if file.size > settings.MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="File size exceeds 10MB limit")
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+async def _queue_sheet_row(result: Dict[str, Any], image_name: str, image_size: int, sheet_name: str) -> Future:
+    """비교 결과 행을 백그라운드 시트 작성기에 넣음 (반환된 Future는 실제 기록 후 상태 dict로 완료됨)"""
+    row = GoogleSheetsService.build_row(
+        image_name=image_name,
+        image_size=image_size,
+        google_result=result.get("google_vision", {}),
+        naver_result=result.get("naver_clova", {}),
+        comparison_result=result["comparison"]
+    )
+    with span("sheet_enqueue"):
+        future = sheet_writer.submit(sheet_name, row)
+    # 이미 내보낸 결과는 주기적 동기화에서 제외
+    if result.get("result_id") is not None:
+        await asyncio.to_thread(comparator.results.get().mark_exported, [result["result_id"]], sheet_name)
+    return future
+
+def _queued_sheet_info(sheet_name: str) -> Dict[str, Any]:
+    """작성기 대기열에 넣기만 한 행 (실제 기록 또는 스필 여부는 아직 모름)"""
+    return {
+        "saved": False,
+        "queued": True,
+        "spreadsheet_url": _spreadsheet_url(),
+        "sheet_name": sheet_name,
+        "message": "Row queued for batched write"
+    }
+
+def _unsaved_sheet_info(sheet_name: str) -> Dict[str, Any]:
+    return {
+        "saved": False,
+        "message": "Not requested to save to sheet",
+        "sheet_name": sheet_name
+    }
+
+async def _compare_stream(payload: ImagePayload, filename: str, save_to_sheet: bool, sheet_name: str,
+                          preprocess: Optional[bool]) -> AsyncIterator[str]:
+    """
+    이미지 한 장 비교를 NDJSON으로 스트리밍.
+    제공자 결과를 도착 순서대로 {"provider", "result"} 줄로 보내고, 이어서 비교 분석 줄({"comparison", ...}),
+    마지막으로 시트 저장 상태 줄({"sheet_info"})을 보낸다. 오류가 나면 {"error"} 줄로 끝낸다.
+    """
+    lines: "asyncio.Queue[Optional[Tuple[str, Dict[str, Any]]]]" = asyncio.Queue()
+    task = asyncio.create_task(comparator.compare_ocr_results(
+        payload, preprocess=preprocess, on_result=lambda name, result: lines.put_nowait((name, result))
+    ))
+    task.add_done_callback(lambda _: lines.put_nowait(None))
+    
+    def line(data: Dict[str, Any]) -> str:
+        return json.dumps(data, ensure_ascii=False) + "\n"
     
     try:
-        image_content = await file.read()
-        result = await comparator.compare_ocr_results(image_content)
+        sent = set()
+        while (item := await lines.get()) is not None:
+            name, result = item
+            sent.add(name)
+            yield line({"provider": name, "result": result})
         
-        # Google Sheets에 저장 옵션
+        try:
+            result = task.result()
+        except Exception as e:
+            logger.exception("compare failed", extra={"image": filename})
+            yield line({"error": str(e)})
+            return
+        # 사전 검사로 생략되거나 쿼럼 도달로 취소된 제공자 결과도 비교 줄 전에 보냄
+        for name in result["providers"]:
+            if name not in sent:
+                yield line({"provider": name, "result": result[name]})
+        yield line({key: value for key, value in result.items() if key not in result["providers"]})
+        
+        if not save_to_sheet:
+            yield line({"sheet_info": _unsaved_sheet_info(sheet_name)})
+            return
+        future = await _queue_sheet_row(result, filename, payload.size, sheet_name)
+        # 실제 기록 결과를 기다리되, 작성기가 밀려 있으면 대기열에 들어간 상태로 응답을 끝냄
+        try:
+            status = await asyncio.wait_for(asyncio.wrap_future(future), timeout=settings.COMPARE_STREAM_SHEET_WAIT)
+            sheet_info = {**status, "spreadsheet_url": _spreadsheet_url()}
+        except asyncio.TimeoutError:
+            sheet_info = _queued_sheet_info(sheet_name)
+        yield line({"sheet_info": sheet_info})
+    finally:
+        # 클라이언트가 연결을 끊으면 남은 제공자 호출을 취소하고 업로드 버퍼 정리
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        payload.close()
+
+@router.post("/compare", response_model=OCRComparisonResponse, dependencies=[admission()])
+async def compare_ocr(file: UploadFile = File(...), save_to_sheet: bool = Form(False), sheet_name: str = Form("OCR Comparison"),
+                      preprocess: Optional[bool] = Form(None)):
+    """이미지 한 장 비교. PDF와 여러 페이지 TIFF는 /compare/document와 같이 페이지별 NDJSON 스트림으로 응답"""
+    logger.info("compare request", extra={"save_to_sheet": save_to_sheet, "sheet_name": sheet_name, "image": file.filename})
+    
+    is_document = _is_document_upload(file)
+    if not (file.content_type.startswith('image/') or is_document):
+        raise HTTPException(status_code=400, detail="File must be an image or PDF")
+    
+    # 문서(PDF/TIFF)는 별도 한도, 페이지로 나뉘지 않는 이미지는 내용 확인 후 기존 10MB 한도 적용
+    if file.size > (settings.DOCUMENT_MAX_FILE_SIZE if is_document or file.content_type == "image/tiff" else settings.MAX_FILE_SIZE):
+        raise HTTPException(status_code=400, detail="File size exceeds 10MB limit" if not is_document
+                            else f"File size exceeds {settings.DOCUMENT_MAX_FILE_SIZE // (1024 * 1024)}MB limit")
+    
+    # 업로드는 한 번만 읽고(큰 파일은 스풀된 임시 파일을 mmap) 두 제공자가 공유
+    payload = await _read_upload(file)
+    try:
+        if payload.format in DOCUMENT_FORMATS:
+            document = await _open_document(payload, single_page=False)
+            if document is not None:
+                return _document_stream(document, save_to_sheet, sheet_name)
+        if payload.size > settings.MAX_FILE_SIZE:
+            raise HTTPException(status_code=400, detail="File size exceeds 10MB limit")
+        
+        result = await comparator.compare_ocr_results(payload, preprocess=preprocess)
+        
+        # Google Sheets에 저장 옵션 (백그라운드 작성기에 넣고 기다리지 않음)
         if save_to_sheet:
-            try:
-                print(f"🔍 시트 저장 시작: sheet_name={sheet_name}")
-                print(f"📊 OCR 결과 받음: google_success={result['google_vision'].get('success')}, naver_success={result['naver_clova'].get('success')}")
-                
-                # 스프레드시트 연결
-                spreadsheet_url = settings.SPREADSHEET_URL
-                if spreadsheet_url:
-                    print(f"🔗 기존 스프레드시트 연결: {spreadsheet_url}")
-                    sheets_service.get_or_create_spreadsheet(spreadsheet_url=spreadsheet_url)
-                else:
-                    print(f"🆕 새 스프레드시트 생성: {settings.SPREADSHEET_NAME}")
-                    sheets_service.get_or_create_spreadsheet()
-                
-                print(f"✅ 스프레드시트 준비 완료")
-                
-                # 데이터 저장
-                save_result = sheets_service.save_ocr_results(
-                    image_name=file.filename,
-                    image_size=file.size,
-                    google_result=result["google_vision"],
-                    naver_result=result["naver_clova"],
-                    comparison_result=result["comparison"],
-                    sheet_name=sheet_name
-                )
-                
-                print(f"💾 시트 저장 완료: {save_result}")
-                
-                # 시트 정보 추가
-                result["sheet_info"] = {
-                    "saved": True,
-                    "spreadsheet_url": sheets_service.get_spreadsheet_url(),
-                    "sheet_name": sheet_name,
-                    "message": save_result
-                }
-            except Exception as sheet_error:
-                print(f"❌ 시트 저장 실패: {sheet_error}")
-                import traceback
-                traceback.print_exc()
-                result["sheet_info"] = {
-                    "saved": False,
-                    "error": str(sheet_error),
-                    "sheet_name": sheet_name
-                }
+            await _queue_sheet_row(result, file.filename, file.size, sheet_name)
+            result["sheet_info"] = _queued_sheet_info(sheet_name)
         else:
-            print("📝 시트 저장 요청 안함")
-            result["sheet_info"] = {
-                "saved": False,
-                "message": "Not requested to save to sheet",
-                "sheet_name": sheet_name
-            }
+            result["sheet_info"] = _unsaved_sheet_info(sheet_name)
         
         return result
+    except HTTPException:
+        raise
     except Exception as e:
+        logger.exception("compare failed", extra={"image": file.filename})
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        payload.close()
 
-@router.post("/google-vision")
-async def google_vision_ocr(file: UploadFile = File(...)):
+@router.post("/compare/stream", dependencies=[admission()])
+async def compare_ocr_stream(file: UploadFile = File(...), save_to_sheet: bool = Form(False),
+                             sheet_name: str = Form("OCR Comparison"), preprocess: Optional[bool] = Form(None)):
+    """
+    /compare의 스트리밍 버전: 제공자별 OCR 결과를 도착하는 대로, 이어서 비교 분석, 마지막으로 시트 저장 상태를
+    NDJSON 줄로 보냄 (가장 빠른 제공자 결과를 바로 받을 수 있음). PDF와 여러 페이지 TIFF는 페이지별 스트림으로 응답
+    """
+    logger.info("compare stream request", extra={"save_to_sheet": save_to_sheet, "sheet_name": sheet_name, "image": file.filename})
+    
+    is_document = _is_document_upload(file)
+    if not (file.content_type.startswith('image/') or is_document):
+        raise HTTPException(status_code=400, detail="File must be an image or PDF")
+    if file.size > (settings.DOCUMENT_MAX_FILE_SIZE if is_document or file.content_type == "image/tiff" else settings.MAX_FILE_SIZE):
+        raise HTTPException(status_code=400, detail="File size exceeds 10MB limit" if not is_document
+                            else f"File size exceeds {settings.DOCUMENT_MAX_FILE_SIZE // (1024 * 1024)}MB limit")
+    
+    payload = await _read_upload(file)
+    try:
+        if payload.format in DOCUMENT_FORMATS:
+            document = await _open_document(payload, single_page=False)
+            if document is not None:
+                payload.close()
+                return _document_stream(document, save_to_sheet, sheet_name)
+        if payload.size > settings.MAX_FILE_SIZE:
+            raise HTTPException(status_code=400, detail="File size exceeds 10MB limit")
+    except BaseException:
+        payload.close()
+        raise
+    # 업로드 버퍼는 스트림이 끝날 때 정리
+    return StreamingResponse(_compare_stream(payload, file.filename, save_to_sheet, sheet_name, preprocess),
+                             media_type="application/x-ndjson")
+
+@router.post("/compare/document", dependencies=[admission()])
+async def compare_document(file: UploadFile = File(...), save_to_sheet: bool = Form(False),
+                           sheet_name: str = Form("OCR Comparison")):
+    """
+    PDF/TIFF 문서의 페이지를 제한된 동시성으로 비교하고 페이지별 결과를 완료 순서대로 NDJSON으로 스트리밍
+    (마지막 줄은 제공자별 전체 텍스트를 페이지 순서로 병합한 문서 결과)
+    """
+    if file.size > settings.DOCUMENT_MAX_FILE_SIZE:
+        raise HTTPException(status_code=400, detail=f"File size exceeds {settings.DOCUMENT_MAX_FILE_SIZE // (1024 * 1024)}MB limit")
+    
+    payload = await _read_upload(file)
+    try:
+        document = await _open_document(payload)
+    finally:
+        payload.close()
+    return _document_stream(document, save_to_sheet, sheet_name)
+
+@router.post("/route", dependencies=[admission()])
+async def route_ocr(file: UploadFile = File(...), preprocess: Optional[bool] = Form(None)):
+    """
+    라우팅 모드: 최근 지연/오류율/품질/비용 기준 최적 제공자 하나만 호출.
+    1순위가 느리면 2순위로 헤지하고, 실패하거나 저신뢰 결과면 다음 제공자로 폴백
+    """
     if not file.content_type.startswith('image/'):
         raise HTTPException(status_code=400, detail="File must be an image")
     
+    if file.size > settings.MAX_FILE_SIZE:
+        raise HTTPException(status_code=400, detail="File size exceeds 10MB limit")
+    
+    payload = await _read_upload(file)
     try:
-        image_content = await file.read()
-        result = await comparator.google_service.extract_text(image_content)
-        return result
+        return await provider_router.route(payload, preprocess=preprocess)
     except Exception as e:
+        logger.exception("route failed", extra={"image": file.filename})
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        payload.close()
 
-@router.post("/naver-clova")
-async def naver_clova_ocr(file: UploadFile = File(...)):
+@router.get("/routing/stats")
+async def get_routing_stats():
+    """제공자별 롤링 통계와 현재 라우팅 순위"""
+    return {
+        "providers": provider_router.stats.snapshot(),
+        "ranking": [{"provider": name, "score": score} for name, score in provider_router.rank()],
+        "hedge_after": {name: provider_router.hedge_delay(name) for name in comparator.providers}
+    }
+
+@router.post("/compare/batch", dependencies=[admission()])
+async def compare_ocr_batch(files: List[UploadFile] = File(...)):
+    """
+    여러 이미지(multipart 또는 zip)를 제한된 동시성으로 비교하고
+    이미지별 결과를 완료 순서대로 NDJSON으로 스트리밍 (마지막 줄은 요약)
+    """
+    items = _batch_items(files)
+    
+    async def stream():
+        start_time = time.monotonic()
+        succeeded = 0
+        async for line in batch_scheduler.run(items):
+            succeeded += line["success"]
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+        elapsed = time.monotonic() - start_time
+        yield json.dumps({
+            "summary": {
+                "total": len(items),
+                "succeeded": succeeded,
+                "failed": len(items) - succeeded,
+                "elapsed": round(elapsed * 1000, 2),
+                "images_per_second": round(len(items) / elapsed, 2) if elapsed > 0 else 0.0
+            }
+        }) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.post("/jobs", status_code=202, dependencies=[admission()])
+async def submit_job(files: List[UploadFile] = File(...), callback_url: Optional[str] = Form(None)):
+    """
+    배치 비교 작업 등록 후 작업 ID 반환.
+    진행 상황은 /api/jobs/{job_id}로 조회하거나 완료 시 callback_url로 전달받음
+    """
+    items = _batch_items(files)
+    try:
+        job_id = await job_manager.submit(items, callback_url=callback_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"job_id": job_id, "status": "pending", "total": len(items)}
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """작업 진행률, 처리량, 예상 남은 시간 조회"""
+    status = await job_manager.get_status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return status
+
+@router.get("/jobs/{job_id}/results")
+async def get_job_results(job_id: str, offset: int = 0, limit: int = 100):
+    """완료된 이미지별 비교 결과 조회 (offset/limit 페이지네이션)"""
+    if await job_manager.get_status(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "job_id": job_id,
+        "offset": offset,
+        "results": await job_manager.get_results(job_id, offset=offset, limit=min(limit, 1000))
+    }
+
+async def _single_provider_ocr(name: str, file: UploadFile, **options) -> Dict[str, Any]:
     if not file.content_type.startswith('image/'):
         raise HTTPException(status_code=400, detail="File must be an image")
     
+    payload = await _read_upload(file)
     try:
-        image_content = await file.read()
-        result = await comparator.clova_service.extract_text(image_content)
-        return result
+        # 비교 모드와 같은 실행기로 호출 (마감 시간, 서킷 브레이커, 헤지 요청 적용)
+        results = await comparator.executor.run({name: lambda: comparator.registry.get(name).extract_text(payload, **options)})
+        return results[name]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        payload.close()
+
+@router.post("/google-vision", dependencies=[admission(lambda request: ["google_vision"])])
+async def google_vision_ocr(file: UploadFile = File(...), feature: Optional[str] = Form(None)):
+    """feature로 이 요청의 Vision 기능 유형 지정 (TEXT_DETECTION | DOCUMENT_TEXT_DETECTION)"""
+    if feature is not None and feature.upper() not in VISION_FEATURES:
+        raise HTTPException(status_code=400, detail=f"feature must be one of {', '.join(VISION_FEATURES)}")
+    return await _single_provider_ocr("google_vision", file, feature=feature.upper() if feature else None)
+
+@router.post("/naver-clova", dependencies=[admission(lambda request: ["naver_clova"])])
+async def naver_clova_ocr(file: UploadFile = File(...)):
+    return await _single_provider_ocr("naver_clova", file)
+
+@router.post("/providers/{provider}/ocr", dependencies=[admission(lambda request: [request.path_params["provider"]])])
+async def provider_ocr(provider: str, file: UploadFile = File(...)):
+    """등록된 제공자 하나로만 OCR 실행 (비교 대상에 포함되지 않은 제공자도 가능)"""
+    if provider not in comparator.registry:
+        raise HTTPException(status_code=404, detail=f"Unknown OCR provider: {provider}")
+    return await _single_provider_ocr(provider, file)
 
 @router.get("/providers")
 async def get_providers():
     return {
-        "providers": [
-            {
-                "name": "google_vision",
-                "description": "Google Cloud Vision API - 강력한 다국어 OCR 지원"
-            },
-            {
-                "name": "naver_clova",
-                "description": "Naver Clova OCR - 한글 인식에 최적화"
-            }
-        ]
+        "providers": comparator.registry.describe(),
+        "baseline": comparator.providers[0],
+        "prescreen": comparator.prescreen_provider or None
+    }
+
+@router.get("/breakers")
+async def get_breaker_status():
+    """제공자별 서킷 브레이커 상태 (closed/open/half_open, 연속 실패 수, p95 지연)와 헤지 설정"""
+    executor = comparator.executor
+    return {
+        **executor.breakers.status(),
+        "hedge": {name: executor.hedge_delay_for(name) for name in sorted(executor.hedge_providers)}
+    }
+
+@router.get("/limits")
+async def get_rate_limits():
+    """클라이언트 요청 수 제한 설정/거절 수와 제공자별 호출 예산 (남은 토큰, 대기/거절 횟수)"""
+    return {"clients": client_limiter.status(), "provider_quotas": provider_quotas.status()}
+
+def _parse_time(value: Optional[str], name: str) -> Optional[float]:
+    """유닉스 시각(초) 또는 ISO 8601 문자열"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: expected unix seconds or ISO 8601")
+
+def _result_store() -> ResultStore:
+    if not settings.RESULTS_ENABLED:
+        raise HTTPException(status_code=404, detail="Result store is disabled (RESULTS_ENABLED=false)")
+    return result_store.get()
+
+@router.get("/results")
+async def get_results(since: Optional[str] = None, until: Optional[str] = None, provider: Optional[str] = None,
+                      image_hash: Optional[str] = None, include_text: bool = False,
+                      offset: int = 0, limit: int = 100):
+    """저장된 비교 결과 조회 (최신순, 시각/제공자/이미지 해시 인덱스 사용)"""
+    store = _result_store()
+    results = await asyncio.to_thread(
+        store.query, _parse_time(since, "since"), _parse_time(until, "until"), provider, image_hash,
+        min(limit, 1000), offset, include_text
+    )
+    return {"offset": offset, "count": len(results), "results": results}
+
+@router.get("/results/stats")
+async def get_result_stats(since: Optional[str] = None, until: Optional[str] = None, provider: Optional[str] = None):
+    """기간 내 비교 수와 제공자별 성공률/처리 시간/유사도 집계"""
+    store = _result_store()
+    return await asyncio.to_thread(store.stats, _parse_time(since, "since"), _parse_time(until, "until"), provider)
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """OCR 결과 캐시 적중/미적중 통계"""
+    return result_cache.stats()
+
+@router.get("/sheets/status")
+async def get_sheet_writer_status():
+    """시트 일괄 작성기 버퍼/스필 상태와 저장소 동기화 상태"""
+    return {
+        **sheet_writer.stats(),
+        "sync": {
+            "enabled": settings.SHEET_SYNC_INTERVAL > 0,
+            "interval": settings.SHEET_SYNC_INTERVAL,
+            "sheet_name": sheet_sync.sheet_name,
+            "exported": sheet_sync.exported,
+            "last_error": sheet_sync.last_error
+        }
     }
 
 @router.post("/test-sheet")
@@ -146,25 +606,24 @@ async def test_sheet_save(sheet_name: str = "test", test_data: str = "test messa
             "recommendation": "Test completed successfully"
         }
         
-        # Google Sheets에 저장
-        spreadsheet_url = settings.SPREADSHEET_URL
-        sheets_service.get_or_create_spreadsheet(spreadsheet_url=spreadsheet_url if spreadsheet_url else None)
-        
-        save_result = sheets_service.save_ocr_results(
+        # 일반 요청과 같은 일괄 작성기를 거쳐 저장하고, 기록 완료까지 대기
+        row = GoogleSheetsService.build_row(
             image_name=f"test_{test_data}.jpg",
             image_size=2048,
             google_result=sample_google,
             naver_result=sample_naver,
-            comparison_result=sample_comparison,
-            sheet_name=sheet_name
+            comparison_result=sample_comparison
         )
+        save_result = await asyncio.wrap_future(sheet_writer.submit(sheet_name, row))
+        if not save_result["saved"]:
+            raise RuntimeError(save_result.get("error") or save_result["message"])
         
         return {
             "success": True,
             "message": f"Test data saved to sheet '{sheet_name}'",
             "sheet_name": sheet_name,
             "test_data": test_data,
-            "spreadsheet_url": sheets_service.get_spreadsheet_url(),
+            "spreadsheet_url": _spreadsheet_url(),
             "save_result": save_result
         }
         
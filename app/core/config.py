@@ -16,6 +16,30 @@ class Settings:
     NCP_SECRET_KEY = os.getenv("NCP_SECRET_KEY")
     NCP_OCR_URL = os.getenv("NCP_OCR_URL")
     
+    # Tesseract (로컬 CPU OCR, 네트워크/비용 없음)
+    TESSERACT_LANG = os.getenv("TESSERACT_LANG", "kor+eng")
+    TESSERACT_CONFIG = os.getenv("TESSERACT_CONFIG", "--psm 6")
+    TESSERACT_WORKERS = int(os.getenv("TESSERACT_WORKERS", str(os.cpu_count() or 1)))
+    
+    # 비교에 사용할 OCR 제공자 (쉼표 구분, 첫 번째가 비교 기준)
+    OCR_PROVIDERS = [name.strip() for name in os.getenv("OCR_PROVIDERS", "google_vision,naver_clova").split(",") if name.strip()]
+    # 로컬 제공자로 먼저 읽어 보고 텍스트가 거의 없으면 클라우드 호출 생략 (빈 값 = 사용 안 함)
+    PRESCREEN_PROVIDER = os.getenv("PRESCREEN_PROVIDER", "")
+    PRESCREEN_MIN_CHARS = int(os.getenv("PRESCREEN_MIN_CHARS", "5"))
+    
+    # 라우팅 모드 (요청마다 최적 제공자 하나만 호출, 느리거나 실패/저신뢰일 때만 다음 제공자로 헤지·폴백)
+    ROUTING_WINDOW = int(os.getenv("ROUTING_WINDOW", "200"))  # 제공자별로 유지하는 최근 결과 수
+    ROUTING_HEDGE_AFTER = float(os.getenv("ROUTING_HEDGE_AFTER", "0"))  # 초 단위, 0 = 1순위 제공자의 최근 p95 지연
+    ROUTING_MIN_CHARS = int(os.getenv("ROUTING_MIN_CHARS", "5"))
+    ROUTING_MIN_CONFIDENCE = float(os.getenv("ROUTING_MIN_CONFIDENCE", "0.8"))
+    ROUTING_LATENCY_WEIGHT = float(os.getenv("ROUTING_LATENCY_WEIGHT", "0.05"))  # p95 지연 1초당 감점
+    ROUTING_COST_WEIGHT = float(os.getenv("ROUTING_COST_WEIGHT", "0.02"))  # 1,000건당 비용(USD) 1당 감점
+    PROVIDER_COSTS = {  # 1,000건당 비용 (USD)
+        "google_vision": float(os.getenv("GOOGLE_VISION_COST", "1.5")),
+        "naver_clova": float(os.getenv("NAVER_CLOVA_COST", "3.0")),
+        "tesseract": float(os.getenv("TESSERACT_COST", "0")),
+    }
+    
     # Google Sheets
     SPREADSHEET_NAME = os.getenv("SPREADSHEET_NAME", "OCR Results Comparison")
     SPREADSHEET_URL = os.getenv("SPREADSHEET_URL", "")
@@ -23,5 +47,154 @@ class Settings:
     # App settings
     UPLOAD_DIR = "uploads"
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    # 시작 시 제공자 클라이언트를 백그라운드에서 미리 생성 (요청 수신은 바로 시작)
+    WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+    WARMUP_SHEETS = os.getenv("WARMUP_SHEETS", "true").lower() == "true"
+    
+    # 로깅 (json | text, 성공 경로 로그는 요청 단위로 LOG_SAMPLE_RATE 비율만 기록, 경고/오류는 항상 기록)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+    
+    # Provider execution (초 단위 마감 시간, 제공자별 값이 없으면 PROVIDER_TIMEOUT 사용)
+    PROVIDER_TIMEOUT = float(os.getenv("PROVIDER_TIMEOUT", "30"))
+    PROVIDER_TIMEOUTS = {
+        "google_vision": float(os.getenv("GOOGLE_VISION_TIMEOUT", PROVIDER_TIMEOUT)),
+        "naver_clova": float(os.getenv("NAVER_CLOVA_TIMEOUT", PROVIDER_TIMEOUT)),
+        "tesseract": float(os.getenv("TESSERACT_TIMEOUT", PROVIDER_TIMEOUT)),
+    }
+    # 서킷 브레이커 (연속 실패/느린 응답 횟수, 초 단위 느린 응답 기준과 재시도 대기)
+    BREAKER_ENABLED = os.getenv("BREAKER_ENABLED", "true").lower() == "true"
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+    BREAKER_SLOW_CALL_THRESHOLD = float(os.getenv("BREAKER_SLOW_CALL_THRESHOLD", "10"))
+    BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+    # 헤지 요청: 같은 제공자에 p95 지연(또는 HEDGE_DELAY초)이 지나도 응답이 없으면 중복 요청 (비용 증가, 기본 꺼짐)
+    HEDGE_PROVIDERS = [name.strip() for name in os.getenv("HEDGE_PROVIDERS", "").split(",") if name.strip()]
+    HEDGE_DELAY = float(os.getenv("HEDGE_DELAY", "0"))
+    # 성공 응답이 이 개수만큼 모이면 나머지 제공자를 기다리지 않음 (0 = 전체 대기)
+    COMPARE_QUORUM = int(os.getenv("COMPARE_QUORUM", "0"))
+    
+    # 요청 수 제한: API 키(RATE_LIMIT_HEADER, 없으면 클라이언트 IP)별 토큰 버킷 (초당 요청 수, 버스트)
+    # RATE_LIMIT_TENANTS: API 키별 한도 ("키=초당요청/버스트,..."), 한도를 넘으면 429 + Retry-After
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
+    RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", "5"))
+    RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "20"))
+    RATE_LIMIT_TENANTS = os.getenv("RATE_LIMIT_TENANTS", "")
+    RATE_LIMIT_HEADER = os.getenv("RATE_LIMIT_HEADER", "X-API-Key")
+    # 기본 한도를 쓰는 등록 API 키 (쉼표 구분, RATE_LIMIT_TENANTS의 키도 등록된 것으로 봄, 그 외 키는 익명으로 IP별 제한)
+    RATE_LIMIT_API_KEYS = os.getenv("RATE_LIMIT_API_KEYS", "")
+    # 앞단의 신뢰하는 프록시 수 (X-Forwarded-For 오른쪽에서 이만큼 건너뛴 주소를 클라이언트로 봄, 0이면 헤더 무시)
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "0"))
+    RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+    # 제공자별 초당 호출 예산 (워커 프로세스 기준, 0 = 제한 없음). 예산을 넘은 호출은 최대 PROVIDER_QUOTA_MAX_WAIT초 대기,
+    # 대기가 그보다 길어질 상황이면 새 요청을 429로 거절
+    PROVIDER_QPS = {
+        "google_vision": float(os.getenv("GOOGLE_VISION_QPS", "0")),
+        "naver_clova": float(os.getenv("NAVER_CLOVA_QPS", "0")),
+        "tesseract": float(os.getenv("TESSERACT_QPS", "0")),
+    }
+    PROVIDER_QPS_BURST = {
+        "google_vision": float(os.getenv("GOOGLE_VISION_QPS_BURST", "0")),
+        "naver_clova": float(os.getenv("NAVER_CLOVA_QPS_BURST", "0")),
+        "tesseract": float(os.getenv("TESSERACT_QPS_BURST", "0")),
+    }
+    PROVIDER_QUOTA_MAX_WAIT = float(os.getenv("PROVIDER_QUOTA_MAX_WAIT", "2"))
+    
+    # Naver Clova HTTP 커넥션 풀 (워커 프로세스당) 및 재시도
+    CLOVA_MAX_CONNECTIONS = int(os.getenv("CLOVA_MAX_CONNECTIONS", "100"))
+    CLOVA_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("CLOVA_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    CLOVA_KEEPALIVE_EXPIRY = float(os.getenv("CLOVA_KEEPALIVE_EXPIRY", "30"))
+    CLOVA_CONNECT_TIMEOUT = float(os.getenv("CLOVA_CONNECT_TIMEOUT", "5"))
+    CLOVA_MAX_RETRIES = int(os.getenv("CLOVA_MAX_RETRIES", "2"))
+    CLOVA_BACKOFF_BASE = float(os.getenv("CLOVA_BACKOFF_BASE", "0.2"))
+    CLOVA_BACKOFF_MAX = float(os.getenv("CLOVA_BACKOFF_MAX", "2"))
+    # 여러 이미지를 images[] 하나의 요청으로 묶어 전송 (묶음 최대 이미지 수/base64 바이트, 대기 시간(초), 호출당 지연 예산(초))
+    CLOVA_BATCH_ENABLED = os.getenv("CLOVA_BATCH_ENABLED", "false").lower() == "true"
+    CLOVA_BATCH_MAX_IMAGES = int(os.getenv("CLOVA_BATCH_MAX_IMAGES", "8"))
+    CLOVA_BATCH_MAX_BYTES = int(os.getenv("CLOVA_BATCH_MAX_BYTES", str(20 * 1024 * 1024)))
+    CLOVA_BATCH_LINGER = float(os.getenv("CLOVA_BATCH_LINGER", "0.02"))
+    CLOVA_BATCH_LATENCY_BUDGET = float(os.getenv("CLOVA_BATCH_LATENCY_BUDGET", "5"))
+    
+    # Google Vision 기능 유형 기본값 (TEXT_DETECTION | DOCUMENT_TEXT_DETECTION, 요청마다 바꿀 수 있음)
+    GOOGLE_VISION_FEATURE = os.getenv("GOOGLE_VISION_FEATURE", "TEXT_DETECTION").upper()
+    # 여러 이미지를 batch_annotate_images 한 번으로 묶어 전송 (묶음 최대 이미지 수(API 한도 16)/바이트, 대기 시간(초), 호출당 지연 예산(초))
+    GOOGLE_VISION_BATCH_ENABLED = os.getenv("GOOGLE_VISION_BATCH_ENABLED", "false").lower() == "true"
+    GOOGLE_VISION_BATCH_MAX_IMAGES = min(int(os.getenv("GOOGLE_VISION_BATCH_MAX_IMAGES", "16")), 16)
+    GOOGLE_VISION_BATCH_MAX_BYTES = int(os.getenv("GOOGLE_VISION_BATCH_MAX_BYTES", str(10 * 1024 * 1024)))
+    GOOGLE_VISION_BATCH_LINGER = float(os.getenv("GOOGLE_VISION_BATCH_LINGER", "0.01"))
+    GOOGLE_VISION_BATCH_LATENCY_BUDGET = float(os.getenv("GOOGLE_VISION_BATCH_LATENCY_BUDGET", "5"))
+    
+    # 다중 워커 실행 (gunicorn.conf.py가 코어 수에 맞춘 워커 수를 WEB_CONCURRENCY로 전달, 1이면 단일 프로세스)
+    WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # 워커 간 공유 상태 (none | sqlite | redis): 결과 캐시, 요청 수 제한/호출 예산 버킷, 시트 기록 예산, 메트릭, 단일 실행 작업 담당자
+    # 워커가 둘 이상이면 기본값 sqlite (같은 컨테이너 안에서 공유), 여러 컨테이너가 함께 쓰려면 redis
+    SHARED_STATE_BACKEND = os.getenv("SHARED_STATE_BACKEND", "sqlite" if WORKERS > 1 else "none")
+    SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", ".shared/state.sqlite3")
+    SHARED_STATE_URL = os.getenv("SHARED_STATE_URL", "redis://localhost:6379/0")
+    # 워커별 메트릭을 공유 저장소에 올리는 주기 (초, /metrics는 모든 워커 값을 합산해 응답)
+    METRICS_SHARE_INTERVAL = float(os.getenv("METRICS_SHARE_INTERVAL", "5"))
+    # 작업 재개 담당 워커의 리스 유지 시간 (초, 담당 워커가 TTL/3마다 갱신하고 종료 시 반환)
+    JOB_RESUME_LEASE_TTL = float(os.getenv("JOB_RESUME_LEASE_TTL", "60"))
+    
+    # OCR 결과 캐시 (CACHE_BACKEND: none | sqlite | directory | shared, shared는 공유 상태 저장소 사용)
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 64MB
+    CACHE_TTL = float(os.getenv("CACHE_TTL", "86400"))  # 초 단위
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "shared" if SHARED_STATE_BACKEND != "none" else "none")
+    CACHE_DIR = os.getenv("CACHE_DIR", ".cache/ocr")
+    
+    # 배치 비교 (워커 수, 제공자별 동시 호출 제한)
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "8"))
+    BATCH_PROVIDER_CONCURRENCY = {
+        "google_vision": int(os.getenv("BATCH_GOOGLE_CONCURRENCY", "4")),
+        "naver_clova": int(os.getenv("BATCH_CLOVA_CONCURRENCY", "4")),
+        "tesseract": int(os.getenv("BATCH_TESSERACT_CONCURRENCY", str(os.cpu_count() or 1))),
+    }
+    BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "5000"))
+    
+    # 비동기 배치 작업 (SQLite 저장소, 업로드 이미지 보관 경로, 완료 콜백)
+    JOB_DB_PATH = os.getenv("JOB_DB_PATH", ".jobs/jobs.sqlite3")
+    JOB_IMAGE_DIR = os.getenv("JOB_IMAGE_DIR", ".jobs/images")
+    JOB_CALLBACK_TIMEOUT = float(os.getenv("JOB_CALLBACK_TIMEOUT", "10"))
+    JOB_CALLBACK_RETRIES = int(os.getenv("JOB_CALLBACK_RETRIES", "3"))
+    # 콜백을 허용할 호스트 (쉼표 구분, 비어 있으면 공인 주소로 확인되는 http/https URL만 허용)
+    JOB_CALLBACK_ALLOWED_HOSTS = [h.strip().lower() for h in os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "").split(",") if h.strip()]
+    
+    # Google Sheets 일괄 기록 (버퍼 크기/주기, 실패 행 스필 파일과 재시도 주기)
+    SHEET_BATCH_SIZE = int(os.getenv("SHEET_BATCH_SIZE", "50"))
+    SHEET_FLUSH_INTERVAL = float(os.getenv("SHEET_FLUSH_INTERVAL", "2"))
+    SHEET_RETRY_INTERVAL = float(os.getenv("SHEET_RETRY_INTERVAL", "30"))
+    SHEET_SPILL_PATH = os.getenv("SHEET_SPILL_PATH", ".sheets/spill.jsonl")
+    # append_rows 호출 예산 (초당, 모든 워커 합계, 0 = 제한 없음. Sheets 쓰기 할당량은 사용자당 분당 60회)
+    SHEET_WRITE_RATE = float(os.getenv("SHEET_WRITE_RATE", "1"))
+    # /compare/stream에서 시트 기록 결과를 기다리는 최대 시간 (초, 넘으면 대기열에 들어간 상태로 응답)
+    COMPARE_STREAM_SHEET_WAIT = float(os.getenv("COMPARE_STREAM_SHEET_WAIT", "10"))
+    
+    # 비교 결과 저장소 (모든 비교를 기록하는 SQLite, 시트는 주기적으로 내보내는 선택적 사본, 0이면 동기화 안 함)
+    RESULTS_ENABLED = os.getenv("RESULTS_ENABLED", "true").lower() == "true"
+    RESULTS_DB_PATH = os.getenv("RESULTS_DB_PATH", ".results/results.sqlite3")
+    SHEET_SYNC_INTERVAL = float(os.getenv("SHEET_SYNC_INTERVAL", "0"))
+    SHEET_SYNC_SHEET = os.getenv("SHEET_SYNC_SHEET", "OCR Comparison")
+    
+    # 이미지 전처리 (축소/재인코딩/메타데이터 제거, 요청별로 켜고 끌 수 있음)
+    PREPROCESS_ENABLED = os.getenv("PREPROCESS_ENABLED", "false").lower() == "true"
+    PREPROCESS_DEFAULT_MAX_SIDE = int(os.getenv("PREPROCESS_MAX_SIDE", "2048"))
+    PREPROCESS_MAX_SIDE = {
+        "google_vision": int(os.getenv("GOOGLE_VISION_MAX_SIDE", PREPROCESS_DEFAULT_MAX_SIDE)),
+        "naver_clova": int(os.getenv("NAVER_CLOVA_MAX_SIDE", PREPROCESS_DEFAULT_MAX_SIDE)),
+        "tesseract": int(os.getenv("TESSERACT_MAX_SIDE", PREPROCESS_DEFAULT_MAX_SIDE)),
+    }
+    PREPROCESS_FORMAT = os.getenv("PREPROCESS_FORMAT", "JPEG")
+    PREPROCESS_QUALITY = int(os.getenv("PREPROCESS_QUALITY", "85"))
+    PREPROCESS_WORKERS = int(os.getenv("PREPROCESS_WORKERS", str(os.cpu_count() or 1)))
+    
+    # 다중 페이지 문서 (PDF/TIFF 페이지 래스터화, 페이지 처리는 배치 워커/제공자별 제한을 공유)
+    DOCUMENT_MAX_FILE_SIZE = int(os.getenv("DOCUMENT_MAX_FILE_SIZE", str(50 * 1024 * 1024)))
+    DOCUMENT_MAX_PAGES = int(os.getenv("DOCUMENT_MAX_PAGES", "200"))
+    DOCUMENT_DPI = int(os.getenv("DOCUMENT_DPI", "200"))
+    DOCUMENT_PAGE_FORMAT = os.getenv("DOCUMENT_PAGE_FORMAT", "JPEG")
+    DOCUMENT_PAGE_QUALITY = int(os.getenv("DOCUMENT_PAGE_QUALITY", "90"))
+    DOCUMENT_WORKERS = int(os.getenv("DOCUMENT_WORKERS", str(os.cpu_count() or 1)))
     
 settings = Settings()
\ No newline at end of file
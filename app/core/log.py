@@ -0,0 +1,122 @@
+"""
+구조화(JSON) 로깅.
+로그 레코드는 호출한 스레드에서 큐에 넣기만 하고, 포맷팅과 stdout 기록은 별도 리스너 스레드가 담당한다.
+요청 단위로 성공 경로 로그(INFO 이하)를 샘플링하고, WARNING 이상은 항상 전체를 남긴다.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+from app.core.config import settings
+
+LOGGER_NAME = "app"
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_sampled: ContextVar[bool] = ContextVar("log_sampled", default=True)
+
+# LogRecord 기본 속성 (그 외 extra로 넘긴 값은 JSON 필드로 출력)
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+
+def begin_request(request_id: Optional[str] = None) -> str:
+    """요청 ID를 설정하고 이 요청의 성공 경로 로그를 남길지 결정 (요청 단위 샘플링)"""
+    request_id = request_id or uuid.uuid4().hex
+    _request_id.set(request_id)
+    _sampled.set(random.random() < settings.LOG_SAMPLE_RATE)
+    return request_id
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            data["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED:
+                data[key] = value
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _RequestContextFilter(logging.Filter):
+    """호출 스레드에서 요청 ID를 붙이고, 샘플링에서 빠진 요청의 성공 경로 로그는 큐에 넣기 전에 버림"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        return record.levelno >= logging.WARNING or _sampled.get()
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """기본 QueueHandler와 달리 호출 스레드에서 포맷팅하지 않음 (같은 프로세스 안의 큐이므로 레코드를 그대로 전달)"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging():
+    """app.* 로거에 비동기 큐 핸들러 연결 (여러 번 호출해도 한 번만 설정, 중지된 리스너는 다시 시작)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    output = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+
+    handler = _DeferredQueueHandler(log_queue)
+    handler.addFilter(_RequestContextFilter())
+
+    logger = logging.getLogger(LOGGER_NAME)
+    for old in [h for h in logger.handlers if isinstance(h, _DeferredQueueHandler)]:
+        logger.removeHandler(old)
+    logger.addHandler(handler)
+    logger.setLevel(settings.LOG_LEVEL)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging():
+    """큐에 남은 로그를 모두 기록하고 리스너 종료"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def log_request(method: str, path: str, status: int, elapsed: float, spans):
+    """요청 하나당 한 줄의 접근 로그 (단계별 소요 시간 포함, 4xx/5xx는 샘플링 없이 WARNING/ERROR로 기록)"""
+    logger = logging.getLogger(f"{LOGGER_NAME}.access")
+    level = logging.ERROR if status >= 500 else logging.WARNING if status >= 400 else logging.INFO
+    if not logger.isEnabledFor(level):
+        return
+    logger.log(level, "request", extra={
+        "method": method,
+        "path": path,
+        "status": status,
+        "duration_ms": round(elapsed * 1000, 2),
+        "spans": {name: round(seconds * 1000, 2) for name, seconds in spans}
+    })
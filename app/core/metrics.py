@@ -0,0 +1,259 @@
+"""
+Prometheus 텍스트 형식(0.0.4)으로 노출하는 경량 메트릭과 요청별 단계 타이밍.
+외부 의존성 없이 카운터/게이지/히스토그램만 지원하며, 시간은 모두 time.monotonic() 기준 초 단위로 기록한다.
+다중 워커 실행 시에는 워커별 스냅숏(snapshot)을 모아 render(snapshots)로 합산해 노출한다.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (16 * 1024, 64 * 1024, 256 * 1024, 512 * 1024, 1024 ** 2, 2 * 1024 ** 2, 5 * 1024 ** 2, 10 * 1024 ** 2)
+
+Labels = Tuple[Tuple[str, str], ...]
+# 메트릭 이름 -> [[샘플 이름, [[라벨, 값], ...], 값], ...] (JSON으로 공유 저장소에 올리는 워커별 스냅숏)
+Snapshot = Dict[str, List[list]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _labels(self, labels: Dict[str, str]) -> Labels:
+        return tuple((name, str(labels.get(name, ""))) for name in self.labelnames)
+
+    def samples(self) -> Iterator[Tuple[str, Labels, float]]:
+        raise NotImplementedError
+
+    def merge(self, values: List[float]) -> float:
+        """여러 워커의 같은 샘플 값을 하나로 (카운터/히스토그램은 합계)"""
+        return sum(values)
+
+    def render(self, samples: Optional[Iterable[Tuple[str, Labels, float]]] = None) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        samples = self.samples() if samples is None else samples
+        lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for name, labels, value in samples)
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._labels(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in values.items():
+            yield self.name, labels, value
+
+
+class Gauge(_Metric):
+    """
+    값을 직접 설정하거나, 수집 시점에 콜백으로 읽어 오는 게이지.
+    merge_mode는 워커별 값을 합치는 방법 ("sum" | "max" | "mean")
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], Dict[Labels, float]]] = None, merge_mode: str = "sum"):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+        self.callback = callback
+        self.merge_mode = merge_mode
+
+    def merge(self, values: List[float]) -> float:
+        if self.merge_mode == "max":
+            return max(values)
+        if self.merge_mode == "mean":
+            return sum(values) / len(values)
+        return sum(values)
+
+    def set(self, value: float, **labels: str):
+        with self._lock:
+            self._values[self._labels(labels)] = value
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        if self.callback is not None:
+            try:
+                values.update(self.callback())
+            except Exception:
+                # 수집 실패가 /metrics 응답 전체를 깨뜨리지 않도록 무시
+                pass
+        for labels, value in values.items():
+            yield self.name, labels, value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # 라벨 -> (버킷별 누적 개수, 합계, 개수)
+        self._values: Dict[Labels, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._labels(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(self._labels(labels))
+        return entry[2] if entry else 0
+
+    def samples(self):
+        with self._lock:
+            values = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._values.items()}
+        for labels, (counts, total, count) in values.items():
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield f"{self.name}_bucket", labels + (("le", _format_value(bound)),), bucket_count
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              callback: Optional[Callable[[], Dict[Labels, float]]] = None, merge_mode: str = "sum") -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, callback, merge_mode))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> Snapshot:
+        """현재 워커의 모든 샘플 (JSON 직렬화 가능한 형태)"""
+        return {
+            metric.name: [[name, [list(label) for label in labels], value] for name, labels, value in metric.samples()]
+            for metric in self._metrics.values()
+        }
+
+    def render(self, snapshots: Optional[Iterable[Snapshot]] = None) -> str:
+        """snapshots가 있으면 (현재 워커 것 포함) 워커별 값을 메트릭 종류에 맞게 합쳐서 출력"""
+        if snapshots is None:
+            lines: List[str] = []
+            for metric in self._metrics.values():
+                lines.extend(metric.render())
+            return "\n".join(lines) + "\n"
+
+        # 메트릭 -> (샘플 이름, 라벨) -> 워커별 값 (처음 나온 순서 유지)
+        collected: Dict[str, Dict[Tuple[str, Labels], List[float]]] = {}
+        for snapshot in snapshots:
+            for metric_name, samples in snapshot.items():
+                merged = collected.setdefault(metric_name, {})
+                for name, labels, value in samples:
+                    merged.setdefault((name, tuple(tuple(label) for label in labels)), []).append(value)
+        lines = []
+        for metric in self._metrics.values():
+            merged = collected.get(metric.name, {})
+            lines.extend(metric.render(
+                (name, labels, metric.merge(values)) for (name, labels), values in merged.items()
+            ))
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter("ocr_http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_LATENCY = registry.histogram("ocr_http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+PROVIDER_LATENCY = registry.histogram("ocr_provider_latency_seconds", "OCR provider call latency", ("provider", "outcome"))
+PROVIDER_ERRORS = registry.counter("ocr_provider_errors_total", "OCR provider call failures", ("provider", "kind"))
+UPLOAD_BYTES = registry.histogram("ocr_upload_size_bytes", "Uploaded image size", buckets=SIZE_BUCKETS)
+STAGE_LATENCY = registry.histogram("ocr_stage_duration_seconds", "Time spent per request stage", ("stage",))
+RATE_LIMITED = registry.counter("ocr_rate_limited_total", "Requests rejected by admission control", ("reason",))
+
+
+# 요청별 단계 타이밍 (미들웨어가 요청마다 새 목록을 설정, 태스크/스레드에는 컨텍스트로 전파됨)
+_timings: ContextVar[Optional["Timings"]] = ContextVar("timings", default=None)
+
+
+class Timings:
+    def __init__(self):
+        self.spans: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.spans.append((name, seconds))
+
+    def server_timing(self) -> str:
+        """Server-Timing 헤더 값 (밀리초 단위)"""
+        with self._lock:
+            spans = list(self.spans)
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in spans)
+
+
+def start_timings() -> Timings:
+    timings = Timings()
+    _timings.set(timings)
+    return timings
+
+
+@contextmanager
+def span(stage: str, detail: Optional[str] = None):
+    """
+    단계 소요 시간을 히스토그램(stage 라벨)과 현재 요청의 타이밍 목록에 기록.
+    detail(제공자 이름 등)은 라벨 수가 늘지 않도록 타이밍 이름에만 붙인다.
+    """
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        elapsed = time.monotonic() - start
+        STAGE_LATENCY.observe(elapsed, stage=stage)
+        timings = _timings.get()
+        if timings is not None:
+            timings.add(f"{stage}.{detail}" if detail else stage, elapsed)
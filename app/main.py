@@ -16,12 +16,99 @@
 #         def ocr_function(request):
 #             return app(request)
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware # 추가
-from .api.ocr import router as ocr_router
+from fastapi.responses import JSONResponse, PlainTextResponse
+from .api.ocr import router as ocr_router, comparator, document_comparator, job_manager, sheet_sync, sheet_writer, sheets_service
+from .core.config import settings
+from .core.metrics import HTTP_LATENCY, HTTP_REQUESTS, registry as metrics_registry, start_timings
+from .core.log import begin_request, log_request, setup_logging, stop_logging
+from .services.shared import boot_id, get_shared_store, hold_lease, release_lease, worker_id
+import logging
+import time
+
+setup_logging()
+logger = logging.getLogger(__name__)
 import os
 
-app = FastAPI()
+async def warm_up():
+    """제공자 클라이언트와 시트 서비스를 백그라운드 스레드에서 미리 생성 (요청 수신은 막지 않음)"""
+    targets = {name: service.warm_up for name, service in comparator.registry.items()}
+    if settings.WARMUP_SHEETS:
+        targets["google_sheets"] = sheets_service.get
+    
+    async def run(name, warm):
+        try:
+            await asyncio.to_thread(warm)
+        except Exception as e:
+            logger.warning("warm-up failed", extra={"provider": name, "error": str(e)})
+    
+    await asyncio.gather(*(run(name, warm) for name, warm in targets.items()))
+
+def publish_metrics(store):
+    """이 워커의 메트릭 스냅숏을 공유 저장소에 올림 (종료된 워커 값은 TTL이 지나면 사라짐)"""
+    store.set(f"metrics:{worker_id()}", metrics_registry.snapshot(), settings.METRICS_SHARE_INTERVAL * 3)
+
+async def share_metrics(store):
+    while True:
+        try:
+            await asyncio.to_thread(publish_metrics, store)
+        except Exception as e:
+            logger.warning("metrics publish failed", extra={"error": str(e)})
+        await asyncio.sleep(settings.METRICS_SHARE_INTERVAL)
+
+async def keep_lease(name: str, ttl: float):
+    """잡은 리스를 TTL/3마다 갱신 (워커가 죽으면 TTL 뒤 다른 워커가 맡을 수 있음)"""
+    while True:
+        await asyncio.sleep(ttl / 3)
+        try:
+            if not await asyncio.to_thread(hold_lease, name, ttl):
+                logger.warning("lease lost", extra={"lease": name})
+        except Exception as e:
+            logger.warning("lease renewal failed", extra={"lease": name, "error": str(e)})
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()
+    warm_up_task = asyncio.create_task(warm_up()) if settings.WARMUP_ON_STARTUP else None
+    # 이전 실행에서 끝나지 않은 배치 작업 재개 (다중 워커에서는 이번 기동의 워커 중 하나만, 살아 있는 동안 리스 유지)
+    resume_lease = f"jobs_resume:{boot_id()}"
+    lease_task = None
+    if await asyncio.to_thread(hold_lease, resume_lease, settings.JOB_RESUME_LEASE_TTL):
+        await job_manager.resume()
+        if get_shared_store() is not None:
+            lease_task = asyncio.create_task(keep_lease(resume_lease, settings.JOB_RESUME_LEASE_TTL))
+    # 이전 실행이 스필 파일에 남긴 시트 행은 새 저장 요청을 기다리지 않고 바로 재시도
+    if sheet_writer._spill_pending():
+        sheet_writer.start()
+    # 결과 저장소 → 시트 주기적 내보내기 (선택)
+    sync_task = asyncio.create_task(sheet_sync.run()) if settings.SHEET_SYNC_INTERVAL > 0 else None
+    # 워커별 메트릭을 공유 저장소에 주기적으로 올림 (다중 워커일 때만)
+    store = get_shared_store()
+    metrics_task = asyncio.create_task(share_metrics(store)) if store is not None else None
+    yield
+    for task in (warm_up_task, sync_task, metrics_task, lease_task):
+        if task is not None:
+            task.cancel()
+    # 다른 워커가 바로 맡을 수 있도록 리스 반환
+    for lease in (resume_lease, "sheet_sync"):
+        try:
+            await asyncio.to_thread(release_lease, lease)
+        except Exception as e:
+            logger.warning("lease release failed", extra={"lease": lease, "error": str(e)})
+    # 종료 시 실행 중인 작업 중단 및 제공자 커넥션 풀/프로세스 풀 정리
+    await job_manager.shutdown()
+    await comparator.registry.aclose()
+    comparator.preprocessor.shutdown()
+    document_comparator.rasterizer.shutdown()
+    # 버퍼에 남은 시트 행 기록
+    await asyncio.to_thread(sheet_writer.stop)
+    # 큐에 남은 로그 기록
+    stop_logging()
+
+app = FastAPI(lifespan=lifespan)
 # CORS 설정 추가
 app.add_middleware(
     CORSMiddleware,
@@ -31,12 +118,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def metrics_middleware(request, call_next):
+    """
+    요청 ID 부여, 요청 수/지연 기록과 요청당 한 줄의 구조화 로그.
+    X-Debug-Timing 헤더가 있으면 단계별 소요 시간을 Server-Timing 헤더로 반환
+    """
+    request_id = begin_request(request.headers.get("x-request-id"))
+    timings = start_timings()
+    start_time = time.monotonic()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.monotonic() - start_time
+        # 경로 매개변수별로 라벨이 늘지 않도록 라우트 템플릿 사용
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        HTTP_REQUESTS.inc(method=request.method, route=path, status=str(status))
+        HTTP_LATENCY.observe(elapsed, method=request.method, route=path)
+        log_request(request.method, path, status, elapsed, timings.spans)
+    response.headers["X-Request-ID"] = request_id
+    if request.headers.get("x-debug-timing"):
+        timings.add("total", elapsed)
+        response.headers["Server-Timing"] = timings.server_timing()
+    return response
+
 app.include_router(ocr_router, prefix="/api", tags=["OCR"])
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus 텍스트 형식 메트릭 (다중 워커이면 모든 워커 값을 합산)"""
+    store = get_shared_store()
+    if store is None:
+        return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+    # 요청을 받은 워커 값은 최신으로 올린 뒤 다른 워커의 마지막 스냅숏과 합침
+    publish_metrics(store)
+    snapshots = store.scan("metrics:").values()
+    return PlainTextResponse(metrics_registry.render(snapshots), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 def health_check():
     return {"status": "OCR API Running"}
 
+@app.get("/health/ready")
+def readiness_check():
+    """제공자별 워밍업 상태 (OCR 제공자가 모두 준비되면 200, 아니면 503)"""
+    providers = {name: service.status() for name, service in comparator.registry.items()}
+    ready = all(status["ready"] for status in providers.values())
+    providers["google_sheets"] = sheets_service.status()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "providers": providers, "breakers": comparator.executor.breakers.status()}
+    )
+
 @app.post("/ocr")
 async def ocr_process():
     return {"text": "테스트"}
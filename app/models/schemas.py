@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Dict, Any, Optional
 
 class OCRResult(BaseModel):
@@ -7,24 +7,52 @@ class OCRResult(BaseModel):
     success: bool
     process_time: float
     error: Optional[str] = None
+    cached: bool = False
+    # 제공자가 알려 주는 평균 인식 신뢰도 (0~1, 제공하지 않으면 None)
+    confidence: Optional[float] = None
+    # 영수증 구조화 필드 (상품 목록, 총액)
+    fields: Optional[Dict[str, Any]] = None
+    # Google Vision 기능 유형 (TEXT_DETECTION | DOCUMENT_TEXT_DETECTION)
+    feature: Optional[str] = None
 
 class ComparisonResult(BaseModel):
     timestamp: int
     text_length_comparison: Dict[str, int]
     processing_time_comparison: Dict[str, float]
     similarity_score: float
+    # 편집 거리 기반 지표 (기준 제공자 대비 두 번째 제공자 결과, 둘 다 성공한 경우만)
+    word_similarity_score: Optional[float] = None
+    char_edit_distance: Optional[int] = None
+    word_edit_distance: Optional[int] = None
+    cer: Optional[float] = None
+    wer: Optional[float] = None
+    # 상품명/가격/총액 필드 일치도 (기준 제공자 대비)
+    field_agreement: Optional[Dict[str, Any]] = None
+    # 비교 기준 제공자와 나머지 제공자별 지표 (제공자가 셋 이상일 때 전체 비교)
+    baseline: Optional[str] = None
+    pairwise: Optional[Dict[str, Dict[str, Any]]] = None
+    # 모든 제공자가 성공했는지 여부
     both_successful: bool
     recommendation: str
 
 class SheetInfo(BaseModel):
     saved: bool
+    queued: bool = False
     spreadsheet_url: Optional[str] = None
     message: Optional[str] = None
     error: Optional[str] = None
 
 class OCRComparisonResponse(BaseModel):
+    # OCR_PROVIDERS에 추가한 제공자 결과도 제공자 이름 키로 그대로 포함
+    model_config = ConfigDict(extra="allow")
+    
     comparison: ComparisonResult
-    google_vision: OCRResult
-    naver_clova: OCRResult
+    google_vision: Optional[OCRResult] = None
+    naver_clova: Optional[OCRResult] = None
+    providers: List[str] = []
     timestamp: int
-    sheet_info: Optional[SheetInfo] = None
\ No newline at end of file
+    sheet_info: Optional[SheetInfo] = None
+    preprocess: Optional[Dict[str, Any]] = None
+    prescreen: Optional[Dict[str, Any]] = None
+    # 결과 저장소 기록 ID (/api/results 조회용, 저장소를 끄거나 기록에 실패하면 None)
+    result_id: Optional[int] = None
\ No newline at end of file
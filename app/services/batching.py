@@ -0,0 +1,100 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+class MicroBatcher:
+    """
+    동시에(또는 짧은 대기 시간 안에) 들어온 항목을 모아 요청 한 번으로 보내고 결과를 호출자별로 나눠 돌려주는 배처.
+    묶음은 항목 수/요청 크기 한도에 닿거나 첫 항목이 linger만큼 기다리면 전송한다.
+    가장 오래 기다린 호출자의 지연(대기 + 요청)이 예산을 넘으면 묶음 크기를 절반으로 줄이고, 예산 안이면 하나씩 늘린다.
+    send는 항목 목록을 받아 입력 순서대로 항목별 결과 dict를 반환해야 한다.
+    """
+
+    def __init__(self, send: Callable[[List[Any]], Awaitable[List[Dict[str, Any]]]],
+                 max_images: int, max_bytes: int, linger: float, latency_budget: float):
+        self._send = send
+        self.max_images = max_images
+        self.max_bytes = max_bytes
+        self.latency_budget = latency_budget
+        # 대기 시간도 지연 예산 안에 포함되므로 예산을 넘지 않게 제한
+        self.linger = min(linger, latency_budget)
+        self.limit = self.max_images
+        # (항목, 결과 Future, 제출 시각)
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []
+        self._pending_bytes = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.images = 0
+        self.over_budget = 0
+
+    def _size(self, item: Any) -> int:
+        """요청 크기 한도 계산에 쓰는 항목 크기 (바이트)"""
+        raise NotImplementedError
+
+    async def submit(self, item: Any) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        size = self._size(item)
+        # 이 항목을 더하면 요청 크기 한도를 넘으면 지금까지 모은 묶음을 먼저 전송
+        if self._pending and self._pending_bytes + size > self.max_bytes:
+            self._flush()
+        future = loop.create_future()
+        self._pending.append((item, future, time.monotonic()))
+        self._pending_bytes += size
+        if len(self._pending) >= self.limit or self._pending_bytes >= self.max_bytes:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_bytes = self._pending, [], 0
+        # 기다리는 동안 취소된 호출자의 항목은 보내지 않음
+        batch = [entry for entry in batch if not entry[1].done()]
+        if not batch:
+            return
+        task = asyncio.create_task(self._dispatch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future, float]]):
+        try:
+            results = await self._send([item for item, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        # 가장 오래 기다린 호출자 기준 지연 (대기 시간 + 요청 시간)
+        elapsed = time.monotonic() - batch[0][2]
+        self.batches += 1
+        self.images += len(batch)
+        if elapsed > self.latency_budget:
+            self.over_budget += 1
+            self.limit = max(1, len(batch) // 2)
+        elif len(batch) >= self.limit:
+            self.limit = min(self.max_images, self.limit + 1)
+
+        now = time.monotonic()
+        for (_, future, submitted), result in zip(batch, results):
+            # 호출자가 이미 포기(마감 시간 초과로 취소)한 항목은 결과를 버림
+            if not future.done():
+                future.set_result({
+                    **result,
+                    "process_time": round((now - submitted) * 1000, 2),
+                    "batch_size": len(batch)
+                })
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "images": self.images,
+            "avg_batch_size": round(self.images / self.batches, 2) if self.batches else None,
+            "batch_limit": self.limit,
+            "over_budget": self.over_budget,
+            "pending": len(self._pending)
+        }
@@ -0,0 +1,287 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from app.core.config import settings
+from app.services.ratelimit import before_provider_call
+from app.utils.payload import ImagePayload
+
+
+class CacheBackend:
+    """OCR 결과 캐시의 영속(디스크) 계층 인터페이스"""
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """(결과, 저장된 만료 시각), 없거나 만료됐으면 None"""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """SQLite 파일에 결과를 저장하는 디스크 계층 (재시작 후에도 유지)"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM ocr_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < time.time():
+                self._conn.execute("DELETE FROM ocr_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, data, expires_at)
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM ocr_cache")
+            self._conn.commit()
+
+
+class DirectoryCacheBackend(CacheBackend):
+    """키마다 JSON 파일 하나를 저장하는 디렉터리 기반 디스크 계층"""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key.replace(":", "_") + ".json")
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if entry["expires_at"] < time.time():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+        return entry["value"], entry["expires_at"]
+
+    def set(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"value": value, "expires_at": expires_at}, f, ensure_ascii=False)
+        # 원자적 교체로 다른 프로세스가 쓰다 만 파일을 읽지 않도록 함
+        os.replace(tmp_path, path)
+
+    def clear(self) -> None:
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.directory, name))
+
+
+class SharedCacheBackend(CacheBackend):
+    """워커 간 공유 상태 저장소(SQLite/Redis)의 키-값을 쓰는 계층 (다중 워커 실행 시 기본값)"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        entry = self.store.get(f"cache:{key}")
+        return (entry["value"], entry["expires_at"]) if entry is not None else None
+
+    def set(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        self.store.set(f"cache:{key}", {"value": value, "expires_at": expires_at}, expires_at - time.time())
+
+    def clear(self) -> None:
+        for key in self.store.scan("cache:"):
+            self.store.delete(key)
+
+
+def create_backend(kind: str, path: str) -> Optional[CacheBackend]:
+    """설정값으로 디스크 계층 생성 ("sqlite", "directory", "shared", "none")"""
+    if kind == "sqlite":
+        return SQLiteCacheBackend(os.path.join(path, "ocr_cache.sqlite3"))
+    if kind == "directory":
+        return DirectoryCacheBackend(path)
+    if kind == "shared":
+        from app.services.shared import get_shared_store
+
+        store = get_shared_store()
+        return SharedCacheBackend(store) if store is not None else None
+    return None
+
+
+class OCRResultCache:
+    """이미지 해시 + 제공자 이름을 키로 하는 OCR 결과 캐시 (메모리 LRU + 선택적 디스크 계층)"""
+
+    def __init__(self, enabled: bool = True, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024,
+                 ttl: float = 86400, backend: Optional[CacheBackend] = None):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.backend = backend
+        self._lock = threading.Lock()
+        # key -> (만료 시각, 크기, 결과)
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(provider: str, image_content: Union[ImagePayload, bytes]) -> str:
+        if isinstance(image_content, ImagePayload):
+            return f"{provider}:{image_content.digest}"
+        return f"{provider}:{hashlib.sha256(image_content).hexdigest()}"
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+
+    def _store_memory(self, key: str, value: Dict[str, Any], expires_at: float, size: int):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (expires_at, size, value)
+            self._size += size
+            self._evict()
+
+    def _get_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, size, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                self._size -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """메모리 → 디스크 순으로 조회, 디스크 적중 시 메모리로 승격"""
+        if not self.enabled:
+            return None
+        value = self._get_memory(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value
+        entry = self.backend.get(key) if self.backend is not None else None
+        if entry is not None:
+            # 디스크에 저장된 만료 시각을 그대로 사용 (승격할 때마다 수명이 늘어나지 않도록)
+            value, expires_at = entry
+            with self._lock:
+                self.hits += 1
+                self.disk_hits += 1
+            size = len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+            self._store_memory(key, value, expires_at, size)
+            return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        if not self.enabled:
+            return
+        data = json.dumps(value, ensure_ascii=False)
+        expires_at = time.time() + self.ttl
+        self._store_memory(key, value, expires_at, len(data.encode("utf-8")))
+        if self.backend is not None:
+            self.backend.set(key, value, expires_at)
+
+    async def get_or_fetch(self, provider: str, image_content: Union[ImagePayload, bytes],
+                           fetch: Callable[[Any], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        캐시 적중 시 네트워크 호출 없이 반환, 미적중 시 fetch 결과 중 성공한 것만 저장.
+        제공자 호출 예산은 실제로 fetch할 때만 사용한다
+        """
+        if not self.enabled:
+            await before_provider_call()
+            return await fetch(image_content)
+
+        key = self.make_key(provider, image_content)
+        if self.backend is None:
+            cached = self.get(key)
+        else:
+            cached = await asyncio.to_thread(self.get, key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        await before_provider_call()
+        result = await fetch(image_content)
+        if result.get("success"):
+            if self.backend is None:
+                self.set(key, result)
+            else:
+                await asyncio.to_thread(self.set, key, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = len(self._entries), self._size
+            hits, disk_hits, misses, evictions = self.hits, self.disk_hits, self.misses, self.evictions
+        lookups = hits + misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "entries": entries,
+            "size_bytes": size,
+            "hits": hits,
+            "disk_hits": disk_hits,
+            "misses": misses,
+            "evictions": evictions,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+        }
+
+
+result_cache = OCRResultCache(
+    enabled=settings.CACHE_ENABLED,
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    max_bytes=settings.CACHE_MAX_BYTES,
+    ttl=settings.CACHE_TTL,
+    backend=create_backend(settings.CACHE_BACKEND, settings.CACHE_DIR)
+)
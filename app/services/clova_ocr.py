@@ -1,102 +1,250 @@
-import requests
-import base64
+import asyncio
 import json
+import random
 import uuid
 import time
-from typing import Dict, Any
+from typing import AsyncIterator, Awaitable, Callable, Dict, Any, List, Optional, Tuple, Union
+import httpx
 from app.core.config import settings
+from app.core.metrics import span
+from app.services.batching import MicroBatcher
+from app.services.cache import OCRResultCache, result_cache
+from app.utils.payload import ImagePayload
+from app.services.layout import WordBoxes
+
+# 재시도 대상 HTTP 상태 코드 (요청 한도 초과, 서버 오류)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# 요청 본문을 보내기 전(연결 단계)에 난 오류만 재시도 (요청이 전달된 뒤의 읽기 시간 초과 등은 중복 과금될 수 있음)
+RETRYABLE_TRANSPORT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# 판별한 이미지 형식 → Clova images[].format 값 (알 수 없으면 기존처럼 png)
+CLOVA_FORMATS = {"jpeg": "jpg", "png": "png", "tiff": "tiff", "pdf": "pdf"}
 
 class ClovaOCRService:
-    def __init__(self):
-        self.secret_key = settings.NCP_SECRET_KEY
-        self.api_url = settings.NCP_OCR_URL
+    def __init__(self, secret_key: Optional[str] = None, api_url: Optional[str] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 cache: Optional[OCRResultCache] = None, batching: Optional[bool] = None):
+        self.secret_key = secret_key or settings.NCP_SECRET_KEY
+        self.api_url = api_url or settings.NCP_OCR_URL
+        self.max_retries = settings.CLOVA_MAX_RETRIES
+        self.backoff_base = settings.CLOVA_BACKOFF_BASE
+        self.backoff_max = settings.CLOVA_BACKOFF_MAX
+        # 테스트에서는 로컬 스텁 서버나 MockTransport를 주입할 수 있음
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self.cache = cache or result_cache
+        # 여러 이미지를 한 요청으로 묶는 배처 (CLOVA_BATCH_ENABLED)
+        batching = settings.CLOVA_BATCH_ENABLED if batching is None else batching
+        self.batcher = ClovaBatcher(self._send) if batching else None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """keep-alive 커넥션 풀을 공유하는 비동기 HTTP 클라이언트 (첫 사용 시 생성)"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                transport=self._transport,
+                timeout=httpx.Timeout(
+                    settings.PROVIDER_TIMEOUTS["naver_clova"],
+                    connect=settings.CLOVA_CONNECT_TIMEOUT
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.CLOVA_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.CLOVA_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.CLOVA_KEEPALIVE_EXPIRY
+                )
+            )
+        return self._client
+    
+    @property
+    def ready(self) -> bool:
+        return self._client is not None and not self._client.is_closed
+    
+    def warm_up(self):
+        """커넥션 풀을 미리 생성 (백그라운드 워밍업용)"""
+        self.client
+    
+    def status(self) -> Dict[str, Any]:
+        error = None if self.secret_key and self.api_url else "NCP_SECRET_KEY or NCP_OCR_URL not set"
+        status = {"ready": self.ready and error is None, "init_time": None, "error": error}
+        if self.batcher is not None:
+            status["batching"] = self.batcher.stats()
+        return status
+    
+    async def aclose(self):
+        """커넥션 풀 정리 (앱 종료 시 호출)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _backoff_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """지수 백오프 + full jitter, Retry-After 헤더가 있으면 우선 적용"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+    
+    @staticmethod
+    def _request_body(payloads: Union[ImagePayload, List[ImagePayload]]) -> Tuple[Callable[[], AsyncIterator[bytes]], int]:
+        """
+        요청 JSON을 스트리밍으로 생성 (base64 문자열/JSON 전체를 메모리에 만들지 않음).
+        이미지가 여러 장이면 images[]에 순서대로 담고 name으로 응답을 구분한다.
+        재시도마다 새로 순회할 수 있도록 생성 함수와 전체 길이를 반환
+        """
+        if isinstance(payloads, ImagePayload):
+            payloads = [payloads]
+        tail = {
+            'requestId': str(uuid.uuid4()),
+            'version': 'V2',
+            'timestamp': int(round(time.time() * 1000))
+        }
+        # {"images": [{..., "data": "<base64>"}, ...], ...} 형태를 이미지별 앞 조각과 마지막 뒤 조각으로 나눔
+        parts = []
+        for index, payload in enumerate(payloads):
+            head = {
+                'format': CLOVA_FORMATS.get(payload.format, 'png'),
+                'name': ClovaOCRService._image_name(index, len(payloads)),
+            }
+            opening = '{"images": [' if index == 0 else '"}, '
+            parts.append(((opening + json.dumps(head)[:-1] + ', "data": "').encode('utf-8'), payload))
+        suffix = ('"}], ' + json.dumps(tail)[1:]).encode('utf-8')
+        length = sum(len(prefix) + payload.base64_size for prefix, payload in parts) + len(suffix)
+        
+        async def body() -> AsyncIterator[bytes]:
+            for prefix, payload in parts:
+                yield prefix
+                for chunk in payload.base64_chunks():
+                    yield chunk
+            yield suffix
+        
+        return body, length
+    
+    @staticmethod
+    def _image_name(index: int, count: int) -> str:
+        return 'sample_image' if count == 1 else f'image_{index}'
+    
+    async def _post_with_retry(self, body: Callable[[], AsyncIterator[bytes]],
+                               headers: Dict[str, str]) -> httpx.Response:
+        """429/5xx 응답과 연결 단계 오류는 지터 백오프 후 재시도 (요청을 보낸 뒤의 전송 오류는 재시도하지 않음)"""
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.post(self.api_url, content=body(), headers=headers)
+            except RETRYABLE_TRANSPORT_ERRORS:
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff_delay(attempt))
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                await asyncio.sleep(self._backoff_delay(attempt, response))
+            attempt += 1
+    
+    async def extract_text(self, image_content: Union[ImagePayload, bytes]) -> Dict[str, Any]:
+        # 같은 이미지는 캐시된 결과를 반환 (네트워크 호출 생략)
+        payload = ImagePayload.wrap(image_content)
+        return await self.cache.get_or_fetch("naver_clova", payload, self._extract_text)
+    
+    async def _extract_text(self, payload: ImagePayload) -> Dict[str, Any]:
+        # 배치가 켜져 있으면 동시에 들어온 이미지와 묶어 한 번에 요청
+        if self.batcher is not None:
+            return await self.batcher.submit(payload)
+        return (await self._send([payload]))[0]
     
-    async def extract_text(self, image_content: bytes) -> Dict[str, Any]:
-        import time
-        start_time = time.time()
+    @staticmethod
+    def _failure(process_time: float, error: str) -> Dict[str, Any]:
+        return {
+            "provider": "naver_clova",
+            "success": False,
+            "full_text": "",
+            "process_time": process_time,
+            "error": error
+        }
+    
+    def _parse_image(self, image: Optional[Dict[str, Any]], process_time: float) -> Dict[str, Any]:
+        """응답 images[] 항목 하나를 결과 dict로 변환"""
+        if image is None:
+            return self._failure(process_time, "Image missing from batch response")
+        if not image.get('fields'):
+            if image.get('inferResult') == 'FAILURE':
+                return self._failure(process_time, f"Inference failed: {image.get('message', '')}")
+            return self._failure(process_time, "No text detected")
+        
+        full_text = ' '.join([
+            field.get('inferText', '') 
+            for field in image['fields']
+        ])
+        
+        # 필드별 인식 신뢰도 평균 (라우팅 모드의 저신뢰 판단에 사용)
+        confidences = [field['inferConfidence'] for field in image['fields'] if 'inferConfidence' in field]
+        
+        return {
+            "provider": "naver_clova",
+            "success": True,
+            "full_text": full_text,
+            "process_time": process_time,
+            "error": None,
+            "confidence": round(sum(confidences) / len(confidences), 4) if confidences else None,
+            "words": WordBoxes.from_clova(image['fields']).to_dict()
+        }
+    
+    async def _send(self, payloads: List[ImagePayload]) -> List[Dict[str, Any]]:
+        """이미지 한 장 이상을 한 번의 API 요청으로 보내고 입력 순서대로 이미지별 결과 반환"""
+        start_time = time.monotonic()
         
         try:
-            # 이미지를 base64로 인코딩
-            image_base64 = base64.b64encode(image_content).decode('utf-8')
+            with span("encode", "naver_clova"):
+                body, length = self._request_body(payloads)
             
-            # 요청 데이터 구성
-            request_json = {
-                'images': [
-                    {
-                        'format': 'png',
-                        'name': 'sample_image',
-                        'data': image_base64
-                    }
-                ],
-                'requestId': str(uuid.uuid4()),
-                'version': 'V2',
-                'timestamp': int(round(time.time() * 1000))
-            }
-            
-            # 헤더 설정
+            # 헤더 설정 (길이를 미리 계산해 chunked 전송 대신 Content-Length 사용)
             headers = {
                 'X-OCR-SECRET': self.secret_key,
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'Content-Length': str(length)
             }
             
-            # API 요청
-            response = requests.post(
-                self.api_url,
-                data=json.dumps(request_json),
-                headers=headers
-            )
+            # API 요청 (공유 커넥션 풀 사용, 실패 시 재시도)
+            response = await self._post_with_retry(body, headers)
+            process_time = round((time.monotonic() - start_time) * 1000, 2)  # ms 단위
             
-            if response.status_code == 200:
-                result = response.json()
-                images = result.get('images', [])
-                
-                if images and images[0].get('fields'):
-                    full_text = ' '.join([
-                        field.get('inferText', '') 
-                        for field in images[0]['fields']
-                    ])
-                    
-                    end_time = time.time()
-                    process_time = round((end_time - start_time) * 1000, 2)  # ms 단위
-                    
-                    return {
-                        "provider": "naver_clova",
-                        "success": True,
-                        "full_text": full_text,
-                        "process_time": process_time,
-                        "error": None
-                    }
-                else:
-                    end_time = time.time()
-                    process_time = round((end_time - start_time) * 1000, 2)
-                    
-                    return {
-                        "provider": "naver_clova",
-                        "success": False,
-                        "full_text": "",
-                        "process_time": process_time,
-                        "error": "No text detected"
-                    }
-            else:
-                end_time = time.time()
-                process_time = round((end_time - start_time) * 1000, 2)
-                
-                return {
-                    "provider": "naver_clova",
-                    "success": False,
-                    "full_text": "",
-                    "process_time": process_time,
-                    "error": f"API Error: {response.status_code} - {response.text}"
-                }
+            if response.status_code != 200:
+                return [self._failure(process_time, f"API Error: {response.status_code} - {response.text}")] * len(payloads)
+            
+            images = response.json().get('images', [])
+            if len(payloads) == 1:
+                return [self._parse_image(images[0] if images else {}, process_time)]
+            
+            # 여러 장이면 name으로 호출자별 결과를 찾고, name이 없는 응답은 요청 순서로 매칭
+            by_name = {image.get('name'): image for image in images}
+            matched = []
+            for index in range(len(payloads)):
+                image = by_name.get(self._image_name(index, len(payloads)))
+                if image is None and index < len(images) and not images[index].get('name'):
+                    image = images[index]
+                matched.append(self._parse_image(image, process_time))
+            return matched
                 
         except Exception as e:
-            end_time = time.time()
-            process_time = round((end_time - start_time) * 1000, 2)
-            
-            return {
-                "provider": "naver_clova",
-                "success": False,
-                "full_text": "",
-                "process_time": process_time,
-                "error": str(e)
-            }
\ No newline at end of file
+            process_time = round((time.monotonic() - start_time) * 1000, 2)
+            return [self._failure(process_time, str(e))] * len(payloads)
+
+
+class ClovaBatcher(MicroBatcher):
+    """
+    동시에 들어온 Clova 이미지를 images[] 여러 장을 담은 요청 한 번으로 보내고 응답을 호출자별로 나눠 돌려주는 배처.
+    요청 크기 한도는 base64 인코딩 후 크기 기준
+    """
+
+    def __init__(self, send: Callable[[List[ImagePayload]], Awaitable[List[Dict[str, Any]]]],
+                 max_images: Optional[int] = None, max_bytes: Optional[int] = None,
+                 linger: Optional[float] = None, latency_budget: Optional[float] = None):
+        super().__init__(
+            send,
+            max_images=max_images or settings.CLOVA_BATCH_MAX_IMAGES,
+            max_bytes=max_bytes or settings.CLOVA_BATCH_MAX_BYTES,
+            linger=settings.CLOVA_BATCH_LINGER if linger is None else linger,
+            latency_budget=latency_budget or settings.CLOVA_BATCH_LATENCY_BUDGET
+        )
+
+    def _size(self, payload: ImagePayload) -> int:
+        return payload.base64_size
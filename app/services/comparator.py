@@ -1,76 +1,206 @@
-from typing import Dict, Any, List
-from app.services.google_vision import GoogleVisionService
-from app.services.clova_ocr import ClovaOCRService
+import asyncio
+import logging
+from typing import Callable, Dict, Any, List, Optional, Union
+from app.services.executor import ProviderExecutor
+from app.services.preprocess import ImagePreprocessor
+from app.services.providers import ProviderRegistry, provider_label
+from app.services.text_metrics import compare_texts
+from app.services.receipt import extract_receipt_fields, field_accuracy
+from app.services.routing import ProviderStats, provider_stats
+from app.core.config import settings
+from app.core.metrics import span
+from app.utils.lazy import Lazy
+from app.utils.payload import ImagePayload
+
+logger = logging.getLogger(__name__)
 
 class OCRComparator:
-    def __init__(self):
-        self.google_service = GoogleVisionService()
-        self.clova_service = ClovaOCRService()
+    def __init__(self, executor: Optional[ProviderExecutor] = None,
+                 preprocessor: Optional[ImagePreprocessor] = None,
+                 registry: Optional[ProviderRegistry] = None,
+                 prescreen_provider: Optional[str] = None,
+                 stats: Optional[ProviderStats] = None,
+                 results: Optional[Lazy] = None):
+        self.registry = registry or ProviderRegistry()
+        self.executor = executor or ProviderExecutor()
+        self.preprocessor = preprocessor or ImagePreprocessor()
+        self.prescreen_provider = settings.PRESCREEN_PROVIDER if prescreen_provider is None else prescreen_provider
+        # 비교 결과(지연, 성공 여부, 제공자 간 유사도)는 라우팅 모드의 제공자 순위에 사용
+        self.stats = stats or provider_stats
+        # 비교 결과 저장소 (Lazy로 감싼 ResultStore, None이면 기록하지 않음)
+        self.results = results
+    
+    @property
+    def providers(self) -> List[str]:
+        return self.registry.names
+    
+    @property
+    def google_service(self):
+        return self.registry.get("google_vision")
+    
+    @property
+    def clova_service(self):
+        return self.registry.get("naver_clova")
     
-    async def compare_ocr_results(self, image_content: bytes) -> Dict[str, Any]:
-        # 두 OCR 서비스에서 결과 가져오기
-        google_result = await self.google_service.extract_text(image_content)
-        clova_result = await self.clova_service.extract_text(image_content)
+    async def compare_ocr_results(self, image_content: Union[ImagePayload, bytes], quorum: Optional[int] = None,
+                                  limits: Optional[Dict[str, asyncio.Semaphore]] = None,
+                                  preprocess: Optional[bool] = None,
+                                  on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        # 모든 제공자가 같은 버퍼(해시, base64 인코딩 포함)를 공유
+        payload = ImagePayload.wrap(image_content)
+        names = self.providers
+        payloads = {name: payload for name in names}
+        preprocess_report = None
+        
+        # 로컬 제공자로 사전 검사: 텍스트가 거의 없으면 클라우드 호출 생략
+        prescreen = None
+        if self.prescreen_provider:
+            with span("prescreen"):
+                prescreen = await self._prescreen(payload)
+        
+        # 선택적 전처리: 제공자별 최대 해상도로 축소/재인코딩
+        if settings.PREPROCESS_ENABLED if preprocess is None else preprocess:
+            with span("preprocess"):
+                payloads, preprocess_report = await self.preprocessor.prepare(payload, names)
+        
+        # 제공자를 동시에 호출 (제공자별 마감 시간, 쿼럼 적용)
+        calls = {
+            name: (lambda name=name: self.registry.get(name).extract_text(payloads[name]))
+            for name in names
+        }
+        if prescreen is not None and not prescreen["passed"]:
+            calls = {name: call for name, call in calls.items() if name == self.prescreen_provider}
+        # on_result: 제공자 결과를 도착 순서대로 먼저 받는 콜백 (비교 분석 전, 영수증 필드 포함)
+        notify = None
+        if on_result is not None:
+            notify = lambda name, result: on_result(name, self._with_fields(result))
+        results = await self.executor.run(calls, quorum=quorum, limits=limits, on_result=notify) if calls else {}
+        for name in names:
+            if name not in results:
+                results[name] = self._skipped(name, prescreen)
+        # 영수증 필드 추출 단계 (성공한 결과만, 캐시된 원본 dict는 변경하지 않음)
+        with span("extract_fields"):
+            results = {name: self._with_fields(results[name]) for name in names}
         
         # 결과 비교 분석
-        comparison = self._analyze_results(google_result, clova_result)
+        with span("analyze"):
+            comparison = self._analyze_results(results)
+        self.stats.record_comparison(results, comparison)
         
-        return {
+        result = {
             "comparison": comparison,
-            "google_vision": google_result,
-            "naver_clova": clova_result,
+            **results,
+            "providers": names,
             "timestamp": comparison.get("timestamp")
         }
+        if preprocess_report is not None:
+            result["preprocess"] = preprocess_report
+        if prescreen is not None:
+            result["prescreen"] = prescreen
+        if self.results is not None:
+            result["result_id"] = await self._store(payload, result)
+        return result
     
-    def _analyze_results(self, google_result: Dict, clova_result: Dict) -> Dict[str, Any]:
+    async def _store(self, payload: ImagePayload, result: Dict[str, Any]) -> Optional[int]:
+        """결과 저장소에 기록 (저장 실패가 비교 응답을 실패시키지 않도록 경고만 남김)"""
+        try:
+            with span("store_result"):
+                return await asyncio.to_thread(lambda: self.results.get().add(payload, result))
+        except Exception as e:
+            logger.warning("result store write failed", extra={"error": str(e)})
+            return None
+    
+    async def _prescreen(self, payload: ImagePayload) -> Dict[str, Any]:
+        """사전 검사 제공자 결과 (비교에도 포함된 제공자라면 결과 캐시로 재사용됨). 검사 자체가 실패하면 통과로 처리"""
+        result = await self.registry.get(self.prescreen_provider).extract_text(payload)
+        text_length = len(result.get("full_text", "").strip())
+        return {
+            "provider": self.prescreen_provider,
+            "success": result.get("success", False),
+            "text_length": text_length,
+            "min_chars": settings.PRESCREEN_MIN_CHARS,
+            "passed": not result.get("success") or text_length >= settings.PRESCREEN_MIN_CHARS,
+            "process_time": result.get("process_time")
+        }
+    
+    @staticmethod
+    def _skipped(name: str, prescreen: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "provider": name,
+            "success": False,
+            "full_text": "",
+            "process_time": 0.0,
+            "error": f"Skipped: prescreen found {prescreen['text_length'] if prescreen else 0} characters",
+            "skipped": True
+        }
+    
+    @staticmethod
+    def _with_fields(result: Dict[str, Any]) -> Dict[str, Any]:
+        if not result.get("success"):
+            return result
+        return {**result, "fields": extract_receipt_fields(result)}
+    
+    @staticmethod
+    def _pair_metrics(baseline: Dict, other: Dict) -> Dict[str, Any]:
+        """기준 제공자 대비 편집 거리 기반 유사도, CER/WER, 필드 일치도 (둘 다 텍스트가 있는 경우만)"""
+        baseline_text = baseline.get("full_text", "")
+        other_text = other.get("full_text", "")
+        similarity = 0.0
+        metrics = {}
+        if baseline_text and other_text:
+            metrics = compare_texts(baseline_text, other_text)
+            similarity = metrics["char_similarity"]
+        return {
+            "similarity_score": round(similarity * 100, 2),
+            "word_similarity_score": round(metrics["word_similarity"] * 100, 2) if metrics else None,
+            "char_edit_distance": metrics.get("char_edit_distance"),
+            "word_edit_distance": metrics.get("word_edit_distance"),
+            "cer": metrics.get("cer"),
+            "wer": metrics.get("wer"),
+            "field_agreement": field_accuracy(baseline["fields"], other["fields"])
+            if baseline.get("fields") and other.get("fields") else None
+        }
+    
+    def _analyze_results(self, results: Dict[str, Dict]) -> Dict[str, Any]:
         import time
         
-        google_text = google_result.get("full_text", "")
-        clova_text = clova_result.get("full_text", "")
-        
-        # 텍스트 길이 비교
-        google_length = len(google_text.strip())
-        clova_length = len(clova_text.strip())
-        
-        # 처리 시간 비교
-        google_time = google_result.get("process_time", 0)
-        clova_time = clova_result.get("process_time", 0)
+        names = list(results)
+        baseline = names[0]
         
-        # 유사도 계산 (간단한 문자열 비교)
-        similarity = 0.0
-        if google_text and clova_text:
-            common_chars = set(google_text.lower()) & set(clova_text.lower())
-            total_chars = set(google_text.lower()) | set(clova_text.lower())
-            similarity = len(common_chars) / len(total_chars) if total_chars else 0.0
+        # 기준 제공자(첫 번째) 대비 나머지 제공자 지표, 최상위 지표는 두 번째 제공자 기준
+        pairwise = {name: self._pair_metrics(results[baseline], results[name]) for name in names[1:]}
+        headline = pairwise[names[1]] if len(names) > 1 else self._pair_metrics({}, {})
         
         return {
             "timestamp": int(time.time()),
+            # 텍스트 길이 비교
             "text_length_comparison": {
-                "google_vision": google_length,
-                "naver_clova": clova_length
+                name: len(result.get("full_text", "").strip()) for name, result in results.items()
             },
+            # 처리 시간 비교
             "processing_time_comparison": {
-                "google_vision": google_time,
-                "naver_clova": clova_time
+                name: result.get("process_time", 0) for name, result in results.items()
             },
-            "similarity_score": round(similarity * 100, 2),
-            "both_successful": google_result.get("success", False) and clova_result.get("success", False),
-            "recommendation": self._get_recommendation(google_result, clova_result, similarity, google_time, clova_time)
+            **headline,
+            "baseline": baseline,
+            "pairwise": pairwise,
+            "both_successful": all(result.get("success", False) for result in results.values()),
+            "recommendation": self._get_recommendation(results, pairwise)
         }
     
-    def _get_recommendation(self, google_result: Dict, clova_result: Dict, similarity: float, google_time: float = 0, clova_time: float = 0) -> str:
-        google_success = google_result.get("success", False)
-        clova_success = clova_result.get("success", False)
+    def _get_recommendation(self, results: Dict[str, Dict], pairwise: Dict[str, Dict]) -> str:
+        successful = [name for name, result in results.items() if result.get("success", False)]
+        baseline = next(iter(results))
+        everyone = "Both" if len(results) == 2 else "All"
+        
+        if not successful:
+            return f"{everyone} OCR services failed. Please check the image quality."
+        elif len(successful) == 1:
+            return f"{provider_label(successful[0])} performed better for this image."
         
-        if not google_success and not clova_success:
-            return "Both OCR services failed. Please check the image quality."
-        elif not google_success:
-            return "Naver Clova OCR performed better for this image."
-        elif not clova_success:
-            return "Google Vision API performed better for this image."
-        elif similarity > 80:
-            return "Both services produced similar results. Either service would work well."
-        elif len(google_result.get("full_text", "")) > len(clova_result.get("full_text", "")):
-            return "Google Vision API extracted more text. Recommended for this image."
-        else:
-            return "Naver Clova OCR extracted more text. Recommended for this image."
\ No newline at end of file
+        similarities = [pairwise[name]["similarity_score"] for name in successful if name != baseline]
+        if baseline in successful and len(successful) == len(results) and min(similarities) > 80:
+            return f"{everyone} services produced similar results. {'Either' if everyone == 'Both' else 'Any'} service would work well."
+        # 텍스트 길이가 같으면 뒤쪽 제공자를 추천 (기존 두 제공자 비교 동작 유지)
+        best = max(reversed(successful), key=lambda name: len(results[name].get("full_text", "")))
+        return f"{provider_label(best)} extracted more text. Recommended for this image."
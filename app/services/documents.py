@@ -0,0 +1,195 @@
+import asyncio
+import io
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import span
+from app.services.scheduler import BatchItem, BatchScheduler
+from app.utils.lazy import Lazy
+from app.utils.payload import ImagePayload
+
+# 페이지 단위로 나눠 처리하는 문서 형식 (단일 프레임 TIFF는 일반 이미지처럼 처리)
+DOCUMENT_FORMATS = ("pdf", "tiff")
+
+
+def _page_count(path: str, document_format: str) -> int:
+    """(프로세스 풀에서 실행) 페이지/프레임 수"""
+    if document_format == "pdf":
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return getattr(image, "n_frames", 1)
+
+
+def _render_page(path: str, document_format: str, index: int, dpi: int, image_format: str, quality: int) -> bytes:
+    """(프로세스 풀에서 실행) 페이지 하나만 열어 래스터화하고 OCR 제공자가 받는 형식으로 인코딩"""
+    if document_format == "pdf":
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(path)
+        try:
+            image = pdf[index].render(scale=dpi / 72).to_pil()
+        finally:
+            pdf.close()
+    else:
+        from PIL import Image
+
+        with Image.open(path) as frames:
+            frames.seek(index)
+            image = frames.copy()
+
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    output = io.BytesIO()
+    image.save(output, format=image_format, quality=quality)
+    return output.getvalue()
+
+
+class PageDocument:
+    """래스터화 대기 중인 문서 (원본은 워커 프로세스가 경로로 열 수 있게 임시 파일에 한 번만 기록)"""
+
+    def __init__(self, path: str, document_format: str, pages: int, filename: Optional[str] = None):
+        self.path = path
+        self.format = document_format
+        self.pages = pages
+        self.filename = filename or "document"
+
+    def close(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class DocumentRasterizer:
+    """PDF/다중 프레임 TIFF를 페이지 단위로 필요할 때만 래스터화 (CPU 작업은 프로세스 풀에서 실행)"""
+
+    def __init__(self, dpi: Optional[int] = None, image_format: Optional[str] = None,
+                 quality: Optional[int] = None, workers: Optional[int] = None, max_pages: Optional[int] = None):
+        self.dpi = dpi or settings.DOCUMENT_DPI
+        self.image_format = image_format or settings.DOCUMENT_PAGE_FORMAT
+        self.quality = quality or settings.DOCUMENT_PAGE_QUALITY
+        self.max_pages = max_pages or settings.DOCUMENT_MAX_PAGES
+        self._pool = Lazy("document_pool", lambda: ProcessPoolExecutor(max_workers=workers or settings.DOCUMENT_WORKERS))
+
+    def shutdown(self):
+        if self._pool.ready:
+            self._pool.get().shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _spool(payload: ImagePayload) -> str:
+        fd, path = tempfile.mkstemp(prefix="ocr-document-")
+        with os.fdopen(fd, "wb") as f:
+            with payload.view as view:
+                f.write(view)
+        return path
+
+    async def open(self, payload: ImagePayload) -> PageDocument:
+        """문서를 임시 파일로 옮기고 페이지 수 확인 (지원하지 않거나 손상된 문서는 ValueError)"""
+        document_format = payload.format
+        if document_format not in DOCUMENT_FORMATS:
+            raise ValueError("File must be a PDF or TIFF document")
+        path = await asyncio.to_thread(self._spool, payload)
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                pages = await loop.run_in_executor(self._pool.get(), _page_count, path, document_format)
+            except ImportError:
+                raise
+            except Exception as e:
+                raise ValueError(f"Invalid {document_format.upper()} document: {e}")
+            if pages > self.max_pages:
+                raise ValueError(f"Too many pages ({pages}, max {self.max_pages})")
+        except BaseException:
+            os.remove(path)
+            raise
+        return PageDocument(path, document_format, pages, payload.filename)
+
+    async def render(self, document: PageDocument, index: int) -> bytes:
+        with span("rasterize"):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._pool.get(), _render_page, document.path, document.format, index,
+                self.dpi, self.image_format, self.quality
+            )
+
+
+class DocumentComparator:
+    """
+    문서의 각 페이지를 배치 스케줄러(워커 수, 제공자별 동시 호출 제한 공유)로 비교하고,
+    페이지 결과를 완료 순서대로 내보낸 뒤 마지막에 문서 단위로 병합한 결과를 내보낸다.
+    페이지 이미지는 워커가 처리할 때 래스터화되고 처리 후 바로 버려진다.
+    """
+
+    def __init__(self, scheduler: BatchScheduler, rasterizer: Optional[DocumentRasterizer] = None):
+        self.scheduler = scheduler
+        self.rasterizer = rasterizer or DocumentRasterizer()
+
+    def _items(self, document: PageDocument) -> List[BatchItem]:
+        return [
+            BatchItem(index, f"{document.filename}#page={index + 1}",
+                      lambda index=index: self.rasterizer.render(document, index))
+            for index in range(document.pages)
+        ]
+
+    async def run(self, document: PageDocument) -> AsyncIterator[Dict[str, Any]]:
+        start_time = time.monotonic()
+        providers = self.scheduler.comparator.providers
+        # 병합용으로 페이지별 텍스트/성공 여부/처리 시간만 보관 (단어 상자 등 큰 필드는 버림)
+        pages: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        async for line in self.scheduler.run(self._items(document)):
+            index = line.pop("index")
+            line = {"page": index + 1, **line}
+            result = line.get("result") or {}
+            pages[index] = {
+                name: {
+                    "success": result.get(name, {}).get("success", False),
+                    "full_text": result.get(name, {}).get("full_text", ""),
+                    "process_time": result.get(name, {}).get("process_time") or 0.0
+                }
+                for name in providers
+            }
+            yield line
+
+        yield {"document": self.merge(document, providers, pages, time.monotonic() - start_time)}
+
+    def merge(self, document: PageDocument, providers: List[str],
+              pages: Dict[int, Dict[str, Dict[str, Any]]], elapsed: float) -> Dict[str, Any]:
+        """페이지 순서대로 제공자별 텍스트를 이어 붙이고 문서 전체 텍스트로 다시 비교"""
+        ordered = [pages[index] for index in sorted(pages)]
+        merged = {}
+        for name in providers:
+            page_results = [page[name] for page in ordered]
+            failed = [index + 1 for index, result in zip(sorted(pages), page_results) if not result["success"]]
+            merged[name] = {
+                "provider": name,
+                "success": bool(page_results) and not failed,
+                "full_text": "\n\n".join(result["full_text"] for result in page_results),
+                "process_time": round(sum(result["process_time"] for result in page_results), 2),
+                "failed_pages": failed
+            }
+        succeeded = sum(all(page[name]["success"] for name in providers) for page in ordered)
+        return {
+            "filename": document.filename,
+            "format": document.format,
+            "pages": document.pages,
+            "succeeded_pages": succeeded,
+            "failed_pages": document.pages - succeeded,
+            "comparison": self.scheduler.comparator._analyze_results(merged),
+            **merged,
+            "providers": providers,
+            "elapsed": round(elapsed * 1000, 2),
+            "pages_per_second": round(document.pages / elapsed, 2) if elapsed > 0 else 0.0
+        }
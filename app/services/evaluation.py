@@ -0,0 +1,170 @@
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.services.receipt import extract_receipt_fields, field_accuracy
+from app.services.scheduler import BatchItem, BatchScheduler
+from app.services.text_metrics import levenshtein, normalize_text
+
+PROVIDERS = ("google_vision", "naver_clova")
+PERCENTILES = (50, 90, 95, 99)
+
+
+def load_ground_truth(path: str) -> List[Dict[str, Any]]:
+    """
+    Ground Truth JSON 로드. 형식:
+    {"images": [{"image": "receipts/001.jpg", "text": "...", "fields": {...}}, ...]}
+    (최상위가 목록이어도 허용, image 경로는 JSON 파일 기준 상대 경로)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    items = data["images"] if isinstance(data, dict) else data
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for item in items:
+        item.setdefault("fields", {})
+        item["path"] = os.path.join(base_dir, item["image"])
+    return items
+
+
+def load_outputs(path: str) -> Dict[str, Dict[str, Any]]:
+    """기록해 둔 제공자 출력(JSONL, 한 줄에 이미지 하나) 로드"""
+    outputs = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                outputs[record["image"]] = record
+    return outputs
+
+
+def save_outputs(path: str, outputs: Dict[str, Dict[str, Any]]):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in outputs.values():
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+async def collect_outputs(scheduler: BatchScheduler, items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """OCRComparator로 실제 제공자를 호출해 이미지별 출력 수집 (결과 캐시가 있으면 재사용됨)"""
+    def loader(path: str):
+        async def load() -> bytes:
+            with open(path, "rb") as f:
+                return f.read()
+        return load
+
+    batch = [BatchItem(i, item["image"], loader(item["path"])) for i, item in enumerate(items)]
+    outputs = {}
+    async for line in scheduler.run(batch):
+        record = {"image": line["filename"]}
+        if line["success"]:
+            record.update({provider: line["result"][provider] for provider in line["result"].get("providers", PROVIDERS)})
+        else:
+            record["error"] = line["error"]
+        outputs[line["filename"]] = record
+    return outputs
+
+
+def _summary(values: np.ndarray) -> Dict[str, Optional[float]]:
+    if values.size == 0:
+        return {"mean": None, **{f"p{p}": None for p in PERCENTILES}}
+    quantiles = np.percentile(values, PERCENTILES)
+    return {
+        "mean": round(float(values.mean()), 4),
+        **{f"p{p}": round(float(q), 4) for p, q in zip(PERCENTILES, quantiles)}
+    }
+
+
+def score(items: List[Dict[str, Any]], outputs: Dict[str, Dict[str, Any]],
+          providers: Iterable[str] = PROVIDERS) -> Dict[str, Any]:
+    """
+    이미지별 CER/WER/처리 시간을 계산하고 제공자별로 NumPy 배열에 모아 한 번에 집계.
+    출력이 없거나 실패한 이미지는 CER/WER 1.0(전부 오류)으로 계산한다.
+    """
+    providers = list(providers)
+    n = len(items)
+    ref_chars = np.zeros(n)
+    ref_words = np.zeros(n)
+    references = []
+    for i, item in enumerate(items):
+        text = normalize_text(item.get("text", ""))
+        words = text.split()
+        references.append((text, words))
+        ref_chars[i] = len(text)
+        ref_words[i] = len(words)
+
+    per_image = [{"image": item["image"]} for item in items]
+    aggregate = {}
+    for provider in providers:
+        char_dist = np.zeros(n)
+        word_dist = np.zeros(n)
+        latency = np.full(n, np.nan)
+        success = np.zeros(n, dtype=bool)
+        # 필드 정확도는 Ground Truth에 fields가 있는 이미지만 계산 (없으면 NaN)
+        item_f1 = np.full(n, np.nan)
+        total_match = np.full(n, np.nan)
+        for i, item in enumerate(items):
+            result = outputs.get(item["image"], {}).get(provider) or {}
+            text, words = references[i]
+            if result.get("success"):
+                hypothesis = normalize_text(result.get("full_text", ""))
+                success[i] = True
+                char_dist[i] = levenshtein(text, hypothesis)
+                word_dist[i] = levenshtein(words, hypothesis.split())
+            else:
+                char_dist[i] = len(text)
+                word_dist[i] = len(words)
+            if result.get("process_time") is not None:
+                latency[i] = result["process_time"]
+            if item["fields"]:
+                fields = result.get("fields") or (extract_receipt_fields(result) if result.get("success") else {})
+                accuracy = field_accuracy(item["fields"], fields)
+                item_f1[i] = accuracy["item_f1"]
+                if accuracy["total_match"] is not None:
+                    total_match[i] = accuracy["total_match"]
+
+        # 기준 텍스트가 비어 있는 이미지는 0으로 나누지 않도록 1로 대체
+        cer = char_dist / np.maximum(ref_chars, 1)
+        wer = word_dist / np.maximum(ref_words, 1)
+        for i in range(n):
+            per_image[i][provider] = {
+                "success": bool(success[i]),
+                "cer": round(float(cer[i]), 4),
+                "wer": round(float(wer[i]), 4),
+                "process_time": None if np.isnan(latency[i]) else float(latency[i]),
+                "item_f1": None if np.isnan(item_f1[i]) else float(item_f1[i])
+            }
+
+        aggregate[provider] = {
+            "images": n,
+            "success_rate": round(float(success.mean()), 4) if n else None,
+            # 전체 문자 기준 CER (이미지 길이 가중)
+            "corpus_cer": round(float(char_dist.sum() / max(ref_chars.sum(), 1)), 4),
+            "corpus_wer": round(float(word_dist.sum() / max(ref_words.sum(), 1)), 4),
+            "cer": _summary(cer),
+            "wer": _summary(wer),
+            "latency": _summary(latency[~np.isnan(latency)]),
+            "field_item_f1": None if np.isnan(item_f1).all() else round(float(np.nanmean(item_f1)), 4),
+            "field_total_accuracy": None if np.isnan(total_match).all() else round(float(np.nanmean(total_match)), 4)
+        }
+
+    return {"images": n, "providers": aggregate, "per_image": per_image}
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """집계 결과를 사람이 읽기 쉬운 표로 변환"""
+    lines = [f"images: {report['images']}", ""]
+    header = (f"{'provider':<15}{'success':>9}{'CER':>8}{'CER p95':>9}{'WER':>8}{'WER p95':>9}"
+              f"{'lat p50':>10}{'lat p95':>10}{'item F1':>9}{'total':>7}")
+    lines.append(header)
+    lines.append("-" * len(header))
+    for provider, stats in report["providers"].items():
+        def fmt(value, digits=4):
+            return "-" if value is None else f"{value:.{digits}f}"
+        lines.append(
+            f"{provider:<15}{fmt(stats['success_rate'], 2):>9}{fmt(stats['corpus_cer']):>8}"
+            f"{fmt(stats['cer']['p95']):>9}{fmt(stats['corpus_wer']):>8}{fmt(stats['wer']['p95']):>9}"
+            f"{fmt(stats['latency']['p50'], 1):>10}{fmt(stats['latency']['p95'], 1):>10}"
+            f"{fmt(stats['field_item_f1'], 2):>9}{fmt(stats['field_total_accuracy'], 2):>7}"
+        )
+    return "\n".join(lines)
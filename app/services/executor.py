@@ -0,0 +1,260 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import PROVIDER_ERRORS, PROVIDER_LATENCY, span
+from app.services.ratelimit import (
+    ProviderQuotas, QuotaExhausted, provider_quotas, reset_provider_call_gate, set_provider_call_gate
+)
+from app.services.resilience import CircuitBreakers, circuit_breakers
+
+logger = logging.getLogger(__name__)
+
+ProviderCall = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+def failed_result(provider: str, error: str, start_time: float) -> Dict[str, Any]:
+    """제공자 호출 실패 시 결과 형식을 맞춘 에러 결과 생성"""
+    return {
+        "provider": provider,
+        "success": False,
+        "full_text": "",
+        "process_time": round((time.monotonic() - start_time) * 1000, 2),
+        "error": error
+    }
+
+
+class ProviderExecutor:
+    """여러 OCR 제공자를 동시에 실행하고 제공자별 마감 시간, 쿼럼, 서킷 브레이커, 헤지 요청, 호출 예산을 적용"""
+
+    def __init__(self, timeouts: Optional[Dict[str, float]] = None,
+                 default_timeout: Optional[float] = None, quorum: Optional[int] = None,
+                 breakers: Optional[CircuitBreakers] = None, hedge_providers: Optional[Iterable[str]] = None,
+                 hedge_delay: Optional[float] = None, quotas: Optional[ProviderQuotas] = None):
+        self.timeouts = timeouts if timeouts is not None else settings.PROVIDER_TIMEOUTS
+        self.default_timeout = default_timeout if default_timeout is not None else settings.PROVIDER_TIMEOUT
+        self.quorum = quorum if quorum is not None else settings.COMPARE_QUORUM
+        self.breakers = breakers or circuit_breakers
+        self.hedge_providers = set(hedge_providers if hedge_providers is not None else settings.HEDGE_PROVIDERS)
+        self.hedge_delay = settings.HEDGE_DELAY if hedge_delay is None else hedge_delay
+        self.quotas = quotas or provider_quotas
+
+    def timeout_for(self, provider: str) -> float:
+        return self.timeouts.get(provider, self.default_timeout)
+
+    def hedge_delay_for(self, provider: str) -> Optional[float]:
+        """중복 요청까지 기다릴 시간 (초, 헤지 대상이 아니거나 지연 표본이 부족하면 None)"""
+        if provider not in self.hedge_providers:
+            return None
+        if self.hedge_delay > 0:
+            return self.hedge_delay
+        return self.breakers.get(provider).latency_p95()
+
+    def _quota_gate(self, provider: str, deadline: Optional[asyncio.Timeout], waited: List[float],
+                    wait: bool = True) -> Callable[[], Awaitable[None]]:
+        """
+        실제 제공자 요청 직전에 호출 예산 토큰을 가져오는 함수 (캐시 적중이면 호출되지 않아 예산을 쓰지 않음).
+        기다린 시간만큼 마감 시간을 늦추고, 기다리는 중에 취소되면 (쿼럼 도달 등) 토큰을 돌려준다.
+        wait=False이면 바로 쓸 수 있는 토큰만 사용 (헤지 요청 같은 선택적 호출용)
+        """
+        async def gate():
+            if not wait:
+                if not await self.quotas.atry_acquire(provider):
+                    raise QuotaExhausted(provider)
+                return
+            reservation = asyncio.ensure_future(self.quotas.areserve(provider))
+            try:
+                delay = await asyncio.shield(reservation)
+            except asyncio.CancelledError:
+                # 저장소 호출은 스레드에서 끝까지 실행되므로 예약이 끝나면 토큰 반환
+                def refund(done: asyncio.Future):
+                    if not done.cancelled() and done.exception() is None and done.result() is not None:
+                        self.quotas.refund_later(provider)
+                reservation.add_done_callback(refund)
+                raise
+            if delay is None:
+                raise QuotaExhausted(provider)
+            if delay > 0:
+                waited.append(delay)
+                if deadline is not None and deadline.when() is not None:
+                    deadline.reschedule(deadline.when() + delay)
+                try:
+                    with span("quota_wait", provider):
+                        await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    self.quotas.refund_later(provider)
+                    raise
+        return gate
+
+    async def _hedged(self, provider: str, call: ProviderCall, deadline: Optional[asyncio.Timeout] = None,
+                      waited: Optional[List[float]] = None) -> Dict[str, Any]:
+        """
+        첫 요청이 헤지 지연 안에 끝나지 않으면 같은 요청을 한 번 더 보내고 먼저 성공한 응답을 사용.
+        남은 요청은 취소한다. 중복 요청은 기다리지 않고 쓸 수 있는 호출 예산이 있을 때만 제공자로 나간다.
+        """
+        waited = waited if waited is not None else []
+        delay = self.hedge_delay_for(provider)
+        gate = set_provider_call_gate(self._quota_gate(provider, deadline, waited))
+        try:
+            first = asyncio.ensure_future(call())
+        finally:
+            reset_provider_call_gate(gate)
+        pending = {first}
+        try:
+            if delay is None:
+                return await first
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return await first
+
+            gate = set_provider_call_gate(self._quota_gate(provider, None, waited, wait=False))
+            try:
+                hedge = asyncio.ensure_future(call())
+            finally:
+                reset_provider_call_gate(gate)
+            pending = {first, hedge}
+            hedged = True
+            result: Optional[Dict[str, Any]] = None
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        result = task.result()
+                    except QuotaExhausted:
+                        if task is hedge:
+                            # 예산이 없어 중복 요청을 보내지 않음, 첫 요청 결과를 기다림
+                            hedged = False
+                            continue
+                        raise
+                    except Exception as e:
+                        error = e
+                        continue
+                    if result.get("success"):
+                        return {**result, "hedged": True} if hedged else result
+            if result is None:
+                raise error
+            return {**result, "hedged": True} if hedged else result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _call(self, provider: str, call: ProviderCall,
+                    limit: Optional[asyncio.Semaphore] = None) -> Dict[str, Any]:
+        if limit is not None:
+            # 동시성 제한 대기 시간은 제공자 마감 시간에 포함하지 않음
+            async with limit:
+                return await self._call(provider, call)
+
+        start_time = time.monotonic()
+        breaker = self.breakers.get(provider) if self.breakers.enabled else None
+        if breaker is not None and not breaker.allow():
+            # 열린 브레이커는 제공자를 호출하지 않고 바로 실패 처리 (통계에서는 제외)
+            PROVIDER_ERRORS.inc(provider=provider, kind="circuit_open")
+            # 반열림 상태에서 시험 호출이 진행 중이면 남은 시간이 없음
+            retry_in = breaker.status()["retry_in"]
+            detail = f"retry in {retry_in}s" if retry_in is not None else "trial call in progress"
+            return {
+                **failed_result(provider, f"Circuit open: {provider} is failing, {detail}", start_time),
+                "skipped": True,
+                "circuit_open": True
+            }
+
+        timeout = self.timeout_for(provider)
+        # 호출 예산 대기 시간 (마감 시간과 지연 통계에 포함하지 않음)
+        waited: List[float] = []
+        result = None
+        outcome = "error"
+        try:
+            with span("provider_call", provider):
+                async with asyncio.timeout(timeout) as deadline:
+                    result = await self._hedged(provider, call, deadline, waited)
+            outcome = "cached" if result.get("cached") else "success" if result.get("success") else "error"
+        except QuotaExhausted:
+            # 예산 대기가 너무 길어 제공자를 호출하지 않음 (통계/브레이커에 기록하지 않음)
+            outcome = "rate_limited"
+            result = {
+                **failed_result(provider, f"Rate limited: {provider} call budget exhausted", start_time),
+                "skipped": True,
+                "rate_limited": True
+            }
+        except TimeoutError:
+            outcome = "timeout"
+            result = failed_result(provider, f"Timeout: no response within {timeout}s", start_time + sum(waited))
+        except Exception as e:
+            result = failed_result(provider, str(e), start_time + sum(waited))
+        finally:
+            start_time += sum(waited)
+            if outcome == "rate_limited":
+                PROVIDER_ERRORS.inc(provider=provider, kind="rate_limited")
+            elif result is not None:
+                PROVIDER_LATENCY.observe(time.monotonic() - start_time, provider=provider, outcome=outcome)
+                if outcome in ("error", "timeout"):
+                    PROVIDER_ERRORS.inc(provider=provider, kind=outcome)
+                    logger.warning("provider call failed", extra={
+                        "provider": provider,
+                        "kind": outcome,
+                        "error": result.get("error"),
+                        "duration_ms": round((time.monotonic() - start_time) * 1000, 2)
+                    })
+            if breaker is not None:
+                if result is None or result.get("cached") or outcome == "rate_limited":
+                    # 쿼럼 도달 등으로 취소된 호출, 캐시 응답, 예산 부족으로 보내지 않은 호출은
+                    # 성공/실패로 기록하지 않고 시험 호출 권한만 반환
+                    breaker.release()
+                else:
+                    breaker.record(result.get("success", False), time.monotonic() - start_time)
+        return result
+
+    async def run(self, calls: Dict[str, ProviderCall], quorum: Optional[int] = None,
+                  limits: Optional[Dict[str, asyncio.Semaphore]] = None,
+                  on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        모든 제공자를 병렬로 실행하고 결과를 제공자 이름별로 반환.
+        quorum 개수만큼 성공 응답이 모이면 나머지 호출은 취소하고 부분 결과를 반환한다.
+        (quorum이 0 이하이면 모든 제공자를 기다림)
+        limits에 제공자별 세마포어를 주면 해당 제공자의 동시 호출 수를 제한한다.
+        on_result를 주면 제공자 결과가 도착하는 즉시 (제공자 이름, 결과)로 호출한다 (스트리밍 응답용).
+        """
+        limits = limits or {}
+        quorum = self.quorum if quorum is None else quorum
+        if quorum <= 0 or quorum > len(calls):
+            quorum = len(calls)
+
+        start_time = time.monotonic()
+        tasks = {
+            asyncio.create_task(self._call(provider, call, limits.get(provider))): provider
+            for provider, call in calls.items()
+        }
+        results: Dict[str, Dict[str, Any]] = {}
+        succeeded = 0
+        pending = set(tasks)
+
+        try:
+            while pending and succeeded < quorum:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    results[tasks[task]] = result
+                    if on_result is not None:
+                        on_result(tasks[task], result)
+                    if result.get("success"):
+                        succeeded += 1
+        finally:
+            # 쿼럼 도달 후 남은 호출(또는 상위 취소 시 전체)은 취소
+            for task in pending:
+                task.cancel()
+
+        # 취소된 호출이 정리될 때까지 대기 (스레드 작업은 백그라운드에서 마무리됨)
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in pending:
+            results[tasks[task]] = {
+                **failed_result(tasks[task], f"Cancelled: quorum of {quorum} reached", start_time),
+                # 제공자 오류가 아니므로 통계에서 제외
+                "skipped": True
+            }
+
+        # 호출 순서대로 정렬해 반환
+        return {provider: results[provider] for provider in calls}
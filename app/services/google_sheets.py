@@ -1,13 +1,18 @@
+import logging
 import os
-import gspread
-from google.oauth2.service_account import Credentials
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from app.core.config import settings
 import json
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 class GoogleSheetsService:
     def __init__(self):
+        # gspread/google-auth는 무거우므로 서비스 생성 시점에 import
+        import gspread
+        from google.oauth2.service_account import Credentials
+        
         self.scope = [
             'https://www.googleapis.com/auth/spreadsheets',
             'https://www.googleapis.com/auth/drive'
@@ -30,8 +35,10 @@ class GoogleSheetsService:
         
         self.gc = gspread.authorize(self.credentials)
         self.spreadsheet = None
+        self._worksheets: Dict[str, Any] = {}
     
     def get_or_create_spreadsheet(self, name: str = None, spreadsheet_url: str = None):
+        import gspread
         spreadsheet_name = name or settings.SPREADSHEET_NAME
         
         try:
@@ -42,14 +49,16 @@ class GoogleSheetsService:
                 if match:
                     spreadsheet_id = match.group(1)
                     self.spreadsheet = self.gc.open_by_key(spreadsheet_id)
-                    print(f"스프레드시트 '{spreadsheet_name}'에 성공적으로 연결되었습니다.")
+                    self._worksheets = {}
+                    logger.info("spreadsheet connected", extra={"spreadsheet": spreadsheet_name})
                     return self.spreadsheet
                 else:
                     raise ValueError("Invalid spreadsheet URL format")
             else:
                 # 기존 스프레드시트 찾기
                 self.spreadsheet = self.gc.open(spreadsheet_name)
-                print(f"기존 스프레드시트 '{spreadsheet_name}'을 찾았습니다.")
+                self._worksheets = {}
+                logger.info("spreadsheet found", extra={"spreadsheet": spreadsheet_name})
         except gspread.exceptions.SpreadsheetNotFound:
             raise ValueError(
                 f"스프레드시트 '{spreadsheet_name}'을 찾을 수 없습니다.\n"
@@ -63,20 +72,24 @@ class GoogleSheetsService:
         return self.spreadsheet
     
     def setup_comparison_sheet(self, sheet_name: str = "OCR Comparison"):
-        """OCR 비교 결과를 위한 워크시트 설정"""
+        """OCR 비교 결과를 위한 워크시트 설정 (워크시트 핸들과 헤더 상태는 캐시)"""
+        import gspread
+        if sheet_name in self._worksheets:
+            return self._worksheets[sheet_name]
+        
         if not self.spreadsheet:
-            self.get_or_create_spreadsheet()
+            self.get_or_create_spreadsheet(spreadsheet_url=settings.SPREADSHEET_URL or None)
         
         try:
             worksheet = self.spreadsheet.worksheet(sheet_name)
-            # 기존 워크시트의 경우 헤더 확인
-            all_values = worksheet.get_all_values()
-            if not all_values:  # 비어있으면 헤더 추가
+            # 기존 워크시트의 경우 첫 행만 읽어 헤더 확인
+            if not worksheet.row_values(1):  # 비어있으면 헤더 추가
                 self._add_headers(worksheet)
         except gspread.exceptions.WorksheetNotFound:
             worksheet = self.spreadsheet.add_worksheet(sheet_name, 1000, 20)
             self._add_headers(worksheet)
         
+        self._worksheets[sheet_name] = worksheet
         return worksheet
     
     def _add_headers(self, worksheet):
@@ -93,75 +106,49 @@ class GoogleSheetsService:
             'textFormat': {'bold': True}
         })
     
+    @staticmethod
+    def build_row(image_name: str, image_size: int, 
+                  google_result: Dict, naver_result: Dict, 
+                  comparison_result: Dict, timestamp: Optional[datetime] = None) -> List[Any]:
+        """시트에 기록할 한 행 데이터 구성 (헤더 순서와 동일, timestamp가 없으면 현재 시각)"""
+        return [
+            (timestamp or datetime.now()).strftime("%Y-%m-%d %H:%M:%S"),  # Timestamp
+            image_name,  # Image_Name
+            f"{image_size/1024:.2f} KB",  # Image_Size
+            
+            # Google Results
+            google_result.get("success", False),  # Google_Success
+            len(google_result.get("full_text", "")),  # Google_Text_Length
+            google_result.get("full_text", ""),  # Google_Full_Text
+            f"{google_result.get('process_time', 0)} ms",  # Google_Processing_Time
+            
+            # Naver Results
+            naver_result.get("success", False),  # Naver_Success
+            len(naver_result.get("full_text", "")),  # Naver_Text_Length
+            naver_result.get("full_text", ""),  # Naver_Full_Text
+            f"{naver_result.get('process_time', 0)} ms",  # Naver_Processing_Time
+            
+            # Comparison Results
+            comparison_result.get("similarity_score", 0),  # Similarity_Score
+            comparison_result.get("both_successful", False),  # Both_Successful
+            comparison_result.get("recommendation", "")  # Recommendation
+        ]
+    
+    def append_rows(self, sheet_name: str, rows: List[List[Any]]):
+        """여러 행을 한 번의 append 호출로 추가 (행 번호 계산을 위한 전체 조회 없음)"""
+        worksheet = self.setup_comparison_sheet(sheet_name)
+        worksheet.append_rows(rows, value_input_option="RAW")
+    
     def save_ocr_results(self, image_name: str, image_size: int, 
                        google_result: Dict, naver_result: Dict, 
                        comparison_result: Dict, sheet_name: str = "OCR Comparison") -> str:
-        """OCR 결과 저장"""
-        print(f"🔧 [SHEETS SERVICE] save_ocr_results 시작")
-        print(f"   - sheet_name: {sheet_name}")
-        print(f"   - image_name: {image_name}")
-        print(f"   - google_success: {google_result.get('success')}")
-        print(f"   - naver_success: {naver_result.get('success')}")
-        
+        """OCR 결과 한 건을 즉시 저장 (일반 요청 경로는 SheetWriter를 통해 일괄 저장)"""
         try:
-            worksheet = self.setup_comparison_sheet(sheet_name)
-            print(f"✅ [SHEETS SERVICE] 워크시트 준비 완료")
-            
-            # 데이터 준비
-            all_values = worksheet.get_all_values()
-            current_row_count = len(all_values)
-            print(f"📊 [SHEETS SERVICE] 현재 행 수: {current_row_count}")
-            
-            # 데이터 준비
-            row_data = [
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),  # Timestamp
-                image_name,  # Image_Name
-                f"{image_size/1024:.2f} KB",  # Image_Size
-                
-                # Google Results
-                google_result.get("success", False),  # Google_Success
-                len(google_result.get("full_text", "")),  # Google_Text_Length
-                google_result.get("full_text", ""),  # Google_Full_Text
-                f"{google_result.get('process_time', 0)} ms",  # Google_Processing_Time
-                
-                # Naver Results
-                naver_result.get("success", False),  # Naver_Success
-                len(naver_result.get("full_text", "")),  # Naver_Text_Length
-                naver_result.get("full_text", ""),  # Naver_Full_Text
-                f"{naver_result.get('process_time', 0)} ms",  # Naver_Processing_Time
-                
-                # Comparison Results
-                comparison_result.get("similarity_score", 0),  # Similarity_Score
-                comparison_result.get("both_successful", False),  # Both_Successful
-                comparison_result.get("recommendation", "")  # Recommendation
-            ]
-            
-            print(f"📝 [SHEETS SERVICE] 데이터 길이: {len(row_data)}개 항목")
-            
-            # 데이터 추가
-            if current_row_count == 0:
-                # 비어있으면 첫 번째 행에 추가
-                worksheet.update('A1', [row_data])
-                final_row = 1
-                print(f"🎯 [SHEETS SERVICE] 첫 번째 행에 추가 (A1)")
-            else:
-                # 항상 다음 행에 추가
-                next_row = current_row_count + 1
-                range_str = f'A{next_row}'
-                worksheet.update(range_str, [row_data])
-                final_row = next_row
-                print(f"🎯 [SHEETS SERVICE] {range_str}에 추가")
-            
-            # 확인
-            final_count = len(worksheet.get_all_values())
-            print(f"✅ [SHEETS SERVICE] 저장 완료: {final_row}행 / 총 {final_count}행")
-            
-            return f"Data added to row {final_row}"
-            
+            row_data = self.build_row(image_name, image_size, google_result, naver_result, comparison_result)
+            self.append_rows(sheet_name, [row_data])
+            return "Data appended"
         except Exception as e:
-            print(f"❌ [SHEETS SERVICE] 저장 실패: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("sheet save failed", extra={"sheet_name": sheet_name})
             return f"Error: {str(e)}"
     
     def get_spreadsheet_url(self):
@@ -171,7 +158,7 @@ class GoogleSheetsService:
         return None
     
     def get_analysis_data(self) -> List[Dict]:
-        """분석을 위한 데이터 가져오기"""
+        """분석을 위한 데이터 가져오기 (시트 전체 조회, 이력 조회/집계는 ResultStore.query/stats 사용)"""
         worksheet = self.setup_comparison_sheet()
         all_data = worksheet.get_all_records()
         return all_data
\ No newline at end of file
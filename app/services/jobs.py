@@ -0,0 +1,348 @@
+import asyncio
+import ipaddress
+import json
+import logging
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import aiofiles
+import httpx
+
+from app.core.config import settings
+from app.services.scheduler import BatchItem, BatchScheduler
+
+logger = logging.getLogger(__name__)
+
+
+def validate_callback_url(url: str, allowed_hosts: Optional[Iterable[str]] = None) -> None:
+    """
+    작업 완료 콜백 URL 검사 (서버가 내부망/메타데이터 주소로 요청을 보내지 않도록).
+    http/https만 허용하고, 허용 호스트 목록이 있으면 그 호스트만, 없으면 모든 주소가 공인 IP로 확인되는 호스트만 허용.
+    허용되지 않으면 ValueError
+    """
+    allowed_hosts = settings.JOB_CALLBACK_ALLOWED_HOSTS if allowed_hosts is None else list(allowed_hosts)
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callback_url must be an http(s) URL")
+    host = parts.hostname.lower()
+    if allowed_hosts:
+        if host not in allowed_hosts:
+            raise ValueError(f"callback_url host is not allowed: {host}")
+        return
+    try:
+        infos = socket.getaddrinfo(host, parts.port or (443 if parts.scheme == "https" else 80), proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError, ValueError):
+        raise ValueError(f"callback_url host cannot be resolved: {host}")
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if not address.is_global or address.is_multicast:
+            raise ValueError(f"callback_url must not point to a private or local address: {host}")
+
+
+class JobStore:
+    """배치 작업과 이미지별 진행 상태를 저장하는 SQLite 저장소"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                callback_url TEXT,
+                total INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                resumed_at REAL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS job_items (
+                job_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                filename TEXT NOT NULL,
+                path TEXT,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                elapsed REAL,
+                finished_at REAL,
+                PRIMARY KEY (job_id, idx)
+            );
+            CREATE INDEX IF NOT EXISTS idx_job_items_status ON job_items (job_id, status);
+            """
+        )
+        # 이전 버전에서 만든 파일에는 error 열이 없음
+        columns = [row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+        if "error" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN error TEXT")
+        self._conn.commit()
+
+    def create_job(self, job_id: str, callback_url: Optional[str], items: List[Dict[str, Any]]):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, callback_url, total, created_at) VALUES (?, 'pending', ?, ?, ?)",
+                (job_id, callback_url, len(items), now)
+            )
+            self._conn.executemany(
+                "INSERT INTO job_items (job_id, idx, filename, path, status, error, finished_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (job_id, item["index"], item["filename"], item["path"],
+                     "failed" if item["error"] else "pending", item["error"],
+                     now if item["error"] else None)
+                    for item in items
+                ]
+            )
+            self._conn.commit()
+
+    def mark_running(self, job_id: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', resumed_at = ? WHERE id = ?", (time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def mark_finished(self, job_id: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'completed', finished_at = ? WHERE id = ?", (time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def mark_failed(self, job_id: str, error: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                (error, time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def save_item_result(self, job_id: str, line: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE job_items SET status = ?, result = ?, error = ?, elapsed = ?, finished_at = ?"
+                " WHERE job_id = ? AND idx = ?",
+                (
+                    "done" if line["success"] else "failed",
+                    json.dumps(line["result"], ensure_ascii=False) if line.get("result") else None,
+                    line.get("error"),
+                    line.get("elapsed"),
+                    time.time(),
+                    job_id,
+                    line["index"]
+                )
+            )
+            self._conn.commit()
+
+    def pending_items(self, job_id: str) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT idx, filename, path FROM job_items WHERE job_id = ? AND status = 'pending' ORDER BY idx",
+                (job_id,)
+            ).fetchall()
+
+    def unfinished_jobs(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('pending', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+            processed_since_resume = 0
+            if job["resumed_at"]:
+                processed_since_resume = self._conn.execute(
+                    "SELECT COUNT(*) FROM job_items WHERE job_id = ? AND status != 'pending'"
+                    " AND finished_at >= ?",
+                    (job_id, job["resumed_at"])
+                ).fetchone()[0]
+        return {**dict(job), "counts": counts, "processed_since_resume": processed_since_resume}
+
+    def get_results(self, job_id: str, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx, filename, status, result, error, elapsed FROM job_items"
+                " WHERE job_id = ? AND status != 'pending' ORDER BY idx LIMIT ? OFFSET ?",
+                (job_id, limit, offset)
+            ).fetchall()
+        return [
+            {
+                "index": row["idx"],
+                "filename": row["filename"],
+                "success": row["status"] == "done",
+                "elapsed": row["elapsed"],
+                "result": json.loads(row["result"]) if row["result"] else None,
+                "error": row["error"]
+            }
+            for row in rows
+        ]
+
+
+class JobManager:
+    """배치 작업을 백그라운드에서 실행하고, 재시작 시 남은 이미지만 이어서 처리"""
+
+    def __init__(self, scheduler: BatchScheduler, store: Optional[JobStore] = None,
+                 image_dir: Optional[str] = None):
+        self.scheduler = scheduler
+        self._store = store
+        self.image_dir = image_dir or settings.JOB_IMAGE_DIR
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def store(self) -> JobStore:
+        """SQLite 저장소는 첫 사용 시 연결 (import 시점 파일 I/O 방지)"""
+        if self._store is None:
+            self._store = JobStore(settings.JOB_DB_PATH)
+        return self._store
+
+    async def submit(self, items: List[BatchItem], callback_url: Optional[str] = None) -> str:
+        """이미지를 디스크에 저장하고 작업을 등록한 뒤 백그라운드 실행 시작 (허용되지 않는 callback_url이면 ValueError)"""
+        if callback_url:
+            await asyncio.to_thread(validate_callback_url, callback_url)
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(self.image_dir, job_id)
+        os.makedirs(job_dir, exist_ok=True)
+
+        stored = []
+        for item in items:
+            path = None
+            if not item.error:
+                path = os.path.join(job_dir, str(item.index))
+                async with aiofiles.open(path, "wb") as f:
+                    await f.write(await item.load())
+            stored.append({"index": item.index, "filename": item.filename, "path": path, "error": item.error})
+
+        await asyncio.to_thread(self.store.create_job, job_id, callback_url, stored)
+        self._start(job_id)
+        return job_id
+
+    async def resume(self):
+        """앱 시작 시 완료되지 않은 작업을 다시 실행 (이미 처리된 이미지는 건너뜀)"""
+        for job_id in await asyncio.to_thread(self.store.unfinished_jobs):
+            self._start(job_id)
+
+    async def shutdown(self):
+        """실행 중인 작업 중단 (남은 이미지는 다음 시작 시 재개)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _start(self, job_id: str):
+        if job_id in self._tasks:
+            return
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    @staticmethod
+    def _file_loader(path: str):
+        async def load() -> bytes:
+            async with aiofiles.open(path, "rb") as f:
+                return await f.read()
+        return load
+
+    async def _run(self, job_id: str):
+        await asyncio.to_thread(self.store.mark_running, job_id)
+        rows = await asyncio.to_thread(self.store.pending_items, job_id)
+        items = [
+            BatchItem(row["idx"], row["filename"], self._file_loader(row["path"]))
+            for row in rows
+        ]
+        try:
+            async for line in self.scheduler.run(items):
+                await asyncio.to_thread(self.store.save_item_result, job_id, line)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 실패 상태와 오류를 기록하고 완료와 같이 콜백 전송 (이미지는 원인 확인을 위해 남겨 둠)
+            logger.exception("job failed", extra={"job_id": job_id})
+            await asyncio.to_thread(self.store.mark_failed, job_id, str(e) or type(e).__name__)
+        else:
+            await asyncio.to_thread(self.store.mark_finished, job_id)
+            shutil.rmtree(os.path.join(self.image_dir, job_id), ignore_errors=True)
+
+        status = await self.get_status(job_id)
+        if status and status.get("callback_url"):
+            await self._send_callback(status)
+
+    async def _send_callback(self, status: Dict[str, Any]):
+        """작업 완료 시 callback_url로 상태 전송 (실패 시 지수 백오프로 재시도)"""
+        # 등록 후 DNS가 바뀌었을 수 있으므로 보내기 직전에 다시 검사 (리다이렉트는 따라가지 않음)
+        try:
+            await asyncio.to_thread(validate_callback_url, status["callback_url"])
+        except ValueError as e:
+            logger.warning("job callback rejected", extra={"job_id": status.get("job_id"), "error": str(e)})
+            return
+        async with httpx.AsyncClient(timeout=settings.JOB_CALLBACK_TIMEOUT) as client:
+            for attempt in range(settings.JOB_CALLBACK_RETRIES + 1):
+                try:
+                    response = await client.post(status["callback_url"], json=status)
+                    if response.status_code < 500:
+                        return
+                except httpx.HTTPError as e:
+                    logger.warning("job callback failed", extra={"job_id": status.get("job_id"), "attempt": attempt + 1, "error": str(e)})
+                if attempt < settings.JOB_CALLBACK_RETRIES:
+                    await asyncio.sleep(2 ** attempt)
+
+    async def get_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """진행률, 처리량(이미지/초), 예상 남은 시간 계산"""
+        job = await asyncio.to_thread(self.store.get_job, job_id)
+        if job is None:
+            return None
+
+        counts = job["counts"]
+        done = counts.get("done", 0)
+        failed = counts.get("failed", 0)
+        pending = counts.get("pending", 0)
+        total = job["total"]
+
+        throughput = 0.0
+        eta = None
+        if job["resumed_at"] and job["processed_since_resume"]:
+            end = job["finished_at"] or time.time()
+            elapsed = end - job["resumed_at"]
+            if elapsed > 0:
+                throughput = job["processed_since_resume"] / elapsed
+        if not pending:
+            eta = 0.0
+        elif throughput:
+            eta = round(pending / throughput, 1)
+
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "callback_url": job["callback_url"],
+            "total": total,
+            "completed": done,
+            "failed": failed,
+            "pending": pending,
+            "progress": round((done + failed) / total * 100, 2) if total else 100.0,
+            "throughput": round(throughput, 3),
+            "eta_seconds": eta,
+            "error": job["error"],
+            "created_at": job["created_at"],
+            "finished_at": job["finished_at"]
+        }
+
+    async def get_results(self, job_id: str, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.get_results, job_id, offset, limit)
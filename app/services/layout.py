@@ -0,0 +1,70 @@
+import base64
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class WordBoxes:
+    """
+    단어 텍스트와 축 정렬 경계 상자(x0, y0, x1, y1)를 float32 array 하나에 연속으로 보관하는 압축 표현.
+    결과 dict/캐시/JSON에는 to_dict()의 base64 문자열 형태로 저장한다.
+    """
+
+    __slots__ = ("texts", "coords")
+
+    def __init__(self, texts: Optional[List[str]] = None, coords: Optional[array] = None):
+        self.texts: List[str] = texts if texts is not None else []
+        self.coords: array = coords if coords is not None else array("f")
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def append(self, text: str, vertices: Iterable[Tuple[float, float]]):
+        xs, ys = [], []
+        for x, y in vertices:
+            xs.append(x)
+            ys.append(y)
+        if not xs:
+            xs = ys = [0.0]
+        self.texts.append(text)
+        self.coords.extend((min(xs), min(ys), max(xs), max(ys)))
+
+    def box(self, index: int) -> Tuple[float, float, float, float]:
+        offset = index * 4
+        return tuple(self.coords[offset:offset + 4])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"texts": self.texts, "boxes": base64.b64encode(self.coords.tobytes()).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "WordBoxes":
+        if not data:
+            return cls()
+        coords = array("f")
+        coords.frombytes(base64.b64decode(data["boxes"]))
+        return cls(list(data["texts"]), coords)
+
+    @classmethod
+    def from_vision(cls, annotations) -> "WordBoxes":
+        """Google Vision text_annotations[1:] (단어 단위) 변환"""
+        words = cls()
+        for annotation in annotations:
+            words.append(annotation.description, ((v.x, v.y) for v in annotation.bounding_poly.vertices))
+        return words
+
+    @classmethod
+    def from_clova(cls, fields: List[Dict[str, Any]]) -> "WordBoxes":
+        """Naver Clova images[0].fields 변환"""
+        words = cls()
+        for field in fields:
+            vertices = field.get("boundingPoly", {}).get("vertices", [])
+            words.append(field.get("inferText", ""), ((v.get("x", 0), v.get("y", 0)) for v in vertices))
+        return words
+
+    @classmethod
+    def from_tesseract(cls, data: Dict[str, List[Any]]) -> "WordBoxes":
+        """pytesseract image_to_data(Output.DICT) 변환 (빈 텍스트/비단어 항목 제외)"""
+        words = cls()
+        for text, left, top, width, height in zip(data["text"], data["left"], data["top"], data["width"], data["height"]):
+            if text and text.strip():
+                words.append(text.strip(), ((left, top), (left + width, top + height)))
+        return words
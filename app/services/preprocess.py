@@ -0,0 +1,96 @@
+import asyncio
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.lazy import Lazy
+from app.utils.payload import ImagePayload
+
+
+def _process_image(data: bytes, max_side: int, image_format: str, quality: int) -> Tuple[bytes, Tuple[int, int], Tuple[int, int]]:
+    """
+    (프로세스 풀에서 실행) EXIF 방향을 반영한 뒤 긴 변을 max_side 이하로 축소하고,
+    메타데이터 없이 지정 형식으로 다시 인코딩
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as source:
+        original_size = source.size
+        image = ImageOps.exif_transpose(source)
+        if max(image.size) > max_side:
+            image.thumbnail((max_side, max_side), Image.LANCZOS)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        output = io.BytesIO()
+        image.save(output, format=image_format, quality=quality, optimize=True)
+        return output.getvalue(), original_size, image.size
+
+
+class ImagePreprocessor:
+    """OCR 전에 이미지를 제공자별 최대 해상도로 축소·재인코딩하는 전처리 단계 (CPU 작업은 프로세스 풀에서 실행)"""
+
+    def __init__(self, max_sides: Optional[Dict[str, int]] = None, image_format: Optional[str] = None,
+                 quality: Optional[int] = None, workers: Optional[int] = None):
+        self.max_sides = max_sides if max_sides is not None else settings.PREPROCESS_MAX_SIDE
+        self.image_format = image_format or settings.PREPROCESS_FORMAT
+        self.quality = quality or settings.PREPROCESS_QUALITY
+        self._pool = Lazy("preprocess_pool", lambda: ProcessPoolExecutor(max_workers=workers or settings.PREPROCESS_WORKERS))
+
+    def shutdown(self):
+        if self._pool.ready:
+            self._pool.get().shutdown(wait=False, cancel_futures=True)
+
+    async def prepare(self, payload: ImagePayload, providers: Iterable[str]) -> Tuple[Dict[str, ImagePayload], Dict[str, Any]]:
+        """
+        제공자별 전처리 결과와 이미지별 절감 보고서를 반환.
+        같은 최대 해상도를 쓰는 제공자끼리는 한 번만 처리하고, 결과가 원본보다 크면 원본을 그대로 사용
+        """
+        start_time = time.monotonic()
+        providers = list(providers)
+        report: Dict[str, Any] = {
+            "original_format": payload.format,
+            "original_bytes": payload.size,
+            "providers": {}
+        }
+
+        # 최대 해상도별로 묶어 중복 처리 제거
+        by_side: Dict[int, list] = {}
+        for provider in providers:
+            by_side.setdefault(self.max_sides.get(provider, settings.PREPROCESS_DEFAULT_MAX_SIDE), []).append(provider)
+
+        loop = asyncio.get_running_loop()
+        data = payload.tobytes()
+        jobs = {
+            max_side: loop.run_in_executor(self._pool.get(), _process_image, data, max_side, self.image_format, self.quality)
+            for max_side in by_side
+        }
+
+        payloads: Dict[str, ImagePayload] = {}
+        for max_side, job in jobs.items():
+            try:
+                processed, original_size, size = await job
+            except Exception as e:
+                # 디코딩 불가 등은 원본 그대로 전달
+                for provider in by_side[max_side]:
+                    payloads[provider] = payload
+                    report["providers"][provider] = {"applied": False, "error": str(e)}
+                continue
+
+            report["original_size"] = list(original_size)
+            use_processed = len(processed) < payload.size or max(original_size) > max_side
+            processed_payload = ImagePayload(processed, filename=payload.filename) if use_processed else payload
+            for provider in by_side[max_side]:
+                payloads[provider] = processed_payload
+                report["providers"][provider] = {
+                    "applied": use_processed,
+                    "max_side": max_side,
+                    "size": list(size) if use_processed else list(original_size),
+                    "bytes": processed_payload.size,
+                    "saved_bytes": payload.size - processed_payload.size,
+                    "saved_ratio": round(1 - processed_payload.size / payload.size, 4) if payload.size else 0.0
+                }
+
+        report["preprocess_time"] = round((time.monotonic() - start_time) * 1000, 2)
+        return payloads, report
@@ -0,0 +1,76 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.clova_ocr import ClovaOCRService
+from app.services.google_vision import GoogleVisionService
+from app.services.tesseract_ocr import TesseractOCRService
+
+# 제공자 이름 → (서비스 생성 함수, 표시 이름, 설명)
+# 서비스는 extract_text(payload), warm_up(), status()를 구현하고, 필요하면 aclose()/shutdown()으로 자원을 정리
+PROVIDERS: Dict[str, Tuple[Callable[[], Any], str, str]] = {
+    "google_vision": (GoogleVisionService, "Google Vision API", "Google Cloud Vision API - 강력한 다국어 OCR 지원"),
+    "naver_clova": (ClovaOCRService, "Naver Clova OCR", "Naver Clova OCR - 한글 인식에 최적화"),
+    "tesseract": (TesseractOCRService, "Tesseract OCR", "Tesseract 로컬 OCR - 네트워크 호출/비용 없음"),
+}
+
+
+def register_provider(name: str, factory: Callable[[], Any], label: Optional[str] = None, description: str = ""):
+    """새 OCR 제공자 등록 (OCR_PROVIDERS 설정에 이름을 추가하면 비교에 포함됨)"""
+    PROVIDERS[name] = (factory, label or name, description)
+
+
+def provider_label(name: str) -> str:
+    return PROVIDERS[name][1] if name in PROVIDERS else name
+
+
+class ProviderRegistry:
+    """
+    설정에 선언된 OCR 제공자 모음. names 순서가 비교 순서이며 첫 번째 제공자가 비교 기준이 된다.
+    서비스 인스턴스는 처음 조회할 때 생성한다 (비교에 포함되지 않은 제공자도 단독 호출 가능).
+    """
+
+    def __init__(self, names: Optional[Iterable[str]] = None, services: Optional[Dict[str, Any]] = None):
+        self.names: List[str] = list(names if names is not None else settings.OCR_PROVIDERS)
+        self._services: Dict[str, Any] = dict(services or {})
+        unknown = [name for name in self.names if name not in PROVIDERS and name not in self._services]
+        if unknown:
+            raise ValueError(f"Unknown OCR provider(s): {', '.join(unknown)} (available: {', '.join(PROVIDERS)})")
+        if not self.names:
+            raise ValueError("At least one OCR provider must be configured")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._services or name in PROVIDERS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def get(self, name: str) -> Any:
+        if name not in self._services:
+            if name not in PROVIDERS:
+                raise KeyError(f"Unknown OCR provider: {name}")
+            self._services[name] = PROVIDERS[name][0]()
+        return self._services[name]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(name, self.get(name)) for name in self.names]
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """모든 등록 제공자 목록 (비교 포함 여부, 준비 상태)"""
+        return [
+            {
+                "name": name,
+                "label": provider_label(name),
+                "description": PROVIDERS[name][2] if name in PROVIDERS else "",
+                "enabled": name in self.names,
+                "ready": getattr(self._services[name], "ready", False) if name in self._services else False
+            }
+            for name in dict.fromkeys([*self.names, *PROVIDERS])
+        ]
+
+    async def aclose(self):
+        """생성된 서비스의 커넥션 풀/프로세스 풀 정리"""
+        for service in self._services.values():
+            if hasattr(service, "aclose"):
+                await service.aclose()
+            if hasattr(service, "shutdown"):
+                service.shutdown()
@@ -0,0 +1,324 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.services.shared import SharedStore, get_shared_store
+
+
+class TokenBucket:
+    """
+    초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷.
+    reserve는 토큰을 미리 빌려(음수 잔량) 몇 초 뒤에 사용할 수 있는지 알려 주므로
+    호출자는 거절 대신 그만큼 기다렸다가 진행할 수 있다 (max_wait을 넘는 예약은 하지 않음)
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = max(1.0, burst if burst else rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """지금 tokens개를 쓰려면 기다려야 하는 시간 (초, 0이면 바로 가능)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, (tokens - self._tokens) / self.rate)
+
+    def acquire(self, tokens: float = 1.0) -> Tuple[bool, float]:
+        """토큰이 있으면 바로 사용하고 (True, 0), 없으면 사용하지 않고 (False, 기다릴 시간)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True, 0.0
+            return False, (tokens - self._tokens) / self.rate
+
+    def reserve(self, max_wait: float, tokens: float = 1.0) -> Optional[float]:
+        """토큰을 예약하고 사용 가능할 때까지 기다릴 시간 반환 (max_wait을 넘으면 예약하지 않고 None)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = max(0.0, (tokens - self._tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            self._tokens -= tokens
+            return wait
+
+    def refund(self, tokens: float = 1.0):
+        """예약했지만 쓰지 않은 토큰 반환"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.burst, self._tokens + tokens)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {"rate": self.rate, "burst": self.burst, "tokens": round(self._tokens, 2)}
+
+
+class SharedTokenBucket:
+    """공유 상태 저장소에 잔량을 두는 토큰 버킷 (TokenBucket과 같은 인터페이스, 모든 워커가 같은 버킷을 나눠 씀)"""
+
+    def __init__(self, store: SharedStore, key: str, rate: float, burst: Optional[float] = None):
+        self._store = store
+        self.key = key
+        self.rate = rate
+        self.burst = max(1.0, burst if burst else rate)
+
+    def _take(self, tokens: float, max_wait: float) -> Tuple[float, float]:
+        return self._store.take(self.key, self.rate, self.burst, tokens, max_wait)
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        return self._take(tokens, -1.0)[0]
+
+    def acquire(self, tokens: float = 1.0) -> Tuple[bool, float]:
+        wait, _ = self._take(tokens, 0.0)
+        return (True, 0.0) if wait <= 0 else (False, wait)
+
+    def reserve(self, max_wait: float, tokens: float = 1.0) -> Optional[float]:
+        wait, _ = self._take(tokens, max_wait)
+        return wait if wait <= max_wait else None
+
+    def refund(self, tokens: float = 1.0):
+        # 음수만큼 가져가면 잔량이 늘어남 (burst 초과분은 다음 갱신 때 잘림)
+        self._take(-tokens, float("inf"))
+
+    def status(self) -> Dict[str, Any]:
+        _, level = self._take(0.0, -1.0)
+        return {"rate": self.rate, "burst": self.burst, "tokens": round(level, 2), "shared": True}
+
+
+def make_bucket(store: Optional[SharedStore], key: str, rate: float, burst: Optional[float] = None):
+    """공유 상태 저장소가 있으면 워커 간 공유 버킷, 없으면 프로세스 내부 버킷"""
+    if store is None:
+        return TokenBucket(rate, burst)
+    return SharedTokenBucket(store, key, rate, burst)
+
+
+def parse_tenant_limits(value: str) -> Dict[str, Tuple[float, float]]:
+    """'키=초당요청/버스트,키2=초당요청/버스트' 형식의 API 키별 한도 (버스트 생략 시 초당 요청 수)"""
+    limits = {}
+    for entry in value.split(","):
+        if "=" not in entry:
+            continue
+        key, spec = entry.split("=", 1)
+        rate, _, burst = spec.partition("/")
+        limits[key.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+
+class ClientRateLimiter:
+    """
+    API 키(없으면 클라이언트 IP)별 토큰 버킷으로 요청 수 제한.
+    최근 사용한 max_clients개 버킷만 유지하고, 등록된 API 키는 tenant_limits의 한도를 사용한다.
+    등록되지 않은 API 키는 키를 바꿔 가며 한도를 피할 수 없도록 익명 요청과 같이 IP별로 제한.
+    공유 상태 저장소가 있으면 버킷 잔량을 모든 워커가 함께 씀
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, rate: Optional[float] = None, burst: Optional[float] = None,
+                 tenant_limits: Optional[Dict[str, Tuple[float, float]]] = None, max_clients: Optional[int] = None,
+                 store: Optional[SharedStore] = None, api_keys: Optional[Iterable[str]] = None,
+                 trusted_proxies: Optional[int] = None):
+        self.enabled = settings.RATE_LIMIT_ENABLED if enabled is None else enabled
+        self.rate = rate or settings.RATE_LIMIT_RATE
+        self.burst = burst or settings.RATE_LIMIT_BURST
+        self.tenant_limits = tenant_limits if tenant_limits is not None else parse_tenant_limits(settings.RATE_LIMIT_TENANTS)
+        if api_keys is None:
+            api_keys = [key.strip() for key in settings.RATE_LIMIT_API_KEYS.split(",") if key.strip()]
+        self.api_keys = set(api_keys) | set(self.tenant_limits)
+        self.trusted_proxies = settings.RATE_LIMIT_TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies
+        self.max_clients = max_clients or settings.RATE_LIMIT_MAX_CLIENTS
+        self._store = store if store is not None else (get_shared_store() if self.enabled else None)
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, Any]" = OrderedDict()
+        self.rejected = 0
+
+    def _bucket(self, client: str):
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                rate, burst = self.tenant_limits.get(client, (self.rate, self.burst))
+                bucket = self._buckets[client] = make_bucket(self._store, f"client:{client}", rate, burst)
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+            return bucket
+
+    def client_key(self, api_key: Optional[str], peer: Optional[str], forwarded: Optional[str] = None) -> str:
+        """
+        요청 수 제한 키: 등록된 API 키이면 키, 아니면 클라이언트 IP.
+        X-Forwarded-For는 신뢰하는 프록시 수(trusted_proxies)만큼만 오른쪽에서 거슬러 올라가 사용
+        (그보다 왼쪽 항목은 클라이언트가 임의로 넣을 수 있으므로 무시)
+        """
+        if api_key and api_key in self.api_keys:
+            return api_key
+        chain = [hop.strip() for hop in (forwarded or "").split(",") if hop.strip()] if self.trusted_proxies > 0 else []
+        chain.append(peer or "unknown")
+        return "ip:" + chain[max(0, len(chain) - 1 - self.trusted_proxies)]
+
+    def check(self, client: str, cost: float = 1.0) -> Optional[float]:
+        """허용되면 None, 한도를 넘으면 다시 시도할 때까지 기다릴 시간 (초)"""
+        if not self.enabled:
+            return None
+        allowed, retry_after = self._bucket(client).acquire(cost)
+        if allowed:
+            return None
+        self.rejected += 1
+        return retry_after
+
+    async def acheck(self, client: str, cost: float = 1.0) -> Optional[float]:
+        """이벤트 루프용 check (공유 상태 저장소를 쓰면 저장소 호출을 스레드에서 실행)"""
+        if self.enabled and self._store is not None:
+            return await asyncio.to_thread(self.check, client, cost)
+        return self.check(client, cost)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            clients = len(self._buckets)
+        return {
+            "enabled": self.enabled,
+            "rate": self.rate,
+            "burst": self.burst,
+            "tenants": len(self.tenant_limits),
+            "clients": clients,
+            "shared": self._store is not None,
+            "rejected": self.rejected
+        }
+
+
+class ProviderQuotas:
+    """
+    제공자별 초당 호출 예산 (워커 프로세스당 하나를 비교/라우팅/배치/단독 호출이 공유).
+    예산을 넘은 호출은 실패시키지 않고 토큰이 생길 때까지 최대 max_wait초 기다리게 해 처리량이 완만하게 줄어들게 한다.
+    qps가 0 이하인 제공자는 제한하지 않음. 공유 상태 저장소가 있으면 예산은 모든 워커 합계
+    """
+
+    def __init__(self, qps: Optional[Dict[str, float]] = None, burst: Optional[Dict[str, float]] = None,
+                 max_wait: Optional[float] = None, store: Optional[SharedStore] = None):
+        qps = qps if qps is not None else settings.PROVIDER_QPS
+        burst = burst if burst is not None else settings.PROVIDER_QPS_BURST
+        self.max_wait = settings.PROVIDER_QUOTA_MAX_WAIT if max_wait is None else max_wait
+        limited = {provider: rate for provider, rate in qps.items() if rate > 0}
+        if store is None and limited:
+            store = get_shared_store()
+        self._buckets = {
+            provider: make_bucket(store, f"provider:{provider}", rate, burst.get(provider))
+            for provider, rate in limited.items()
+        }
+        self.shared = store is not None and bool(self._buckets)
+        self._lock = threading.Lock()
+        self.waits: Dict[str, int] = {}
+        self.rejected: Dict[str, int] = {}
+
+    def _count(self, counter: Dict[str, int], provider: str):
+        with self._lock:
+            counter[provider] = counter.get(provider, 0) + 1
+
+    def reserve(self, provider: str) -> Optional[float]:
+        """호출 한 번을 예약하고 기다릴 시간 반환 (제한 없는 제공자는 0, 대기가 max_wait을 넘으면 None)"""
+        bucket = self._buckets.get(provider)
+        if bucket is None:
+            return 0.0
+        wait = bucket.reserve(self.max_wait)
+        if wait is None:
+            self._count(self.rejected, provider)
+        elif wait > 0:
+            self._count(self.waits, provider)
+        return wait
+
+    def refund(self, provider: str):
+        """제공자를 호출하지 않고 끝난 예약(예산 대기 중 쿼럼 도달로 취소 등)의 토큰 반환"""
+        bucket = self._buckets.get(provider)
+        if bucket is not None:
+            bucket.refund()
+
+    def try_acquire(self, provider: str) -> bool:
+        """기다리지 않고 쓸 수 있는 토큰이 있을 때만 사용 (헤지 요청 같은 선택적 호출용)"""
+        bucket = self._buckets.get(provider)
+        return bucket is None or bucket.acquire()[0]
+
+    def retry_after(self, providers: Iterable[str]) -> Optional[float]:
+        """새 요청을 받아도 되는지 확인 (제공자 대기가 max_wait을 넘으면 다시 시도할 때까지 기다릴 시간)"""
+        waits = [self._buckets[name].wait_time() for name in providers if name in self._buckets]
+        longest = max(waits, default=0.0)
+        return longest - self.max_wait if longest > self.max_wait else None
+
+    # 이벤트 루프용 (공유 상태 저장소를 쓰면 저장소 호출이 루프를 막지 않도록 스레드에서 실행)
+    async def _run(self, method, *args):
+        if self.shared:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def areserve(self, provider: str) -> Optional[float]:
+        return await self._run(self.reserve, provider)
+
+    async def atry_acquire(self, provider: str) -> bool:
+        return await self._run(self.try_acquire, provider)
+
+    async def aretry_after(self, providers: Iterable[str]) -> Optional[float]:
+        return await self._run(self.retry_after, list(providers))
+
+    def refund_later(self, provider: str):
+        """기다리지 않고 토큰 반환 (취소 처리 중에도 쓸 수 있도록 결과를 기다리지 않음)"""
+        if self.shared:
+            asyncio.get_running_loop().run_in_executor(None, self.refund, provider)
+        else:
+            self.refund(provider)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            waits, rejected = dict(self.waits), dict(self.rejected)
+        return {
+            "max_wait": self.max_wait,
+            "providers": {
+                name: {**bucket.status(), "waited": waits.get(name, 0), "rejected": rejected.get(name, 0)}
+                for name, bucket in self._buckets.items()
+            }
+        }
+
+
+class QuotaExhausted(Exception):
+    """제공자 호출 예산을 기다릴 수 있는 한도 안에 얻지 못함"""
+
+
+# 실제 제공자 요청 직전에 호출 예산을 확인하는 함수 (실행기가 호출마다 설정, 캐시 적중 시에는 호출되지 않음)
+_provider_call_gate: ContextVar[Optional[Callable[[], Awaitable[None]]]] = ContextVar("provider_call_gate", default=None)
+
+
+def set_provider_call_gate(gate: Optional[Callable[[], Awaitable[None]]]):
+    """현재 태스크(와 이후 만드는 태스크)의 호출 예산 확인 함수 설정, 되돌릴 때 쓰는 토큰 반환"""
+    return _provider_call_gate.set(gate)
+
+
+def reset_provider_call_gate(token):
+    _provider_call_gate.reset(token)
+
+
+async def before_provider_call():
+    """
+    제공자 서비스가 네트워크(또는 로컬 OCR) 호출을 보내기 직전에 기다림 (결과 캐시가 미적중 경로에서 호출).
+    예산이 생길 때까지 기다리고, 한도 안에 얻지 못하면 QuotaExhausted
+    """
+    gate = _provider_call_gate.get()
+    if gate is not None:
+        await gate()
+
+
+def retry_after_header(seconds: float) -> str:
+    """Retry-After 헤더 값 (정수 초, 최소 1초)"""
+    return str(max(1, math.ceil(seconds)))
+
+
+# 워커 프로세스당 하나 (모든 엔드포인트와 배치 스케줄러가 같은 예산을 공유)
+client_limiter = ClientRateLimiter()
+provider_quotas = ProviderQuotas()
@@ -0,0 +1,151 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from app.services.layout import WordBoxes
+
+# 같은 줄로 볼 세로 중심 차이 (단어 높이 대비 비율)
+LINE_TOLERANCE = 0.5
+
+# 금액: 4,500 / 4.500 / 4500원 / ₩12,000 / -1,000
+_AMOUNT = re.compile(r"[-−]?₩?\s?(?:\d{1,3}(?:\s?[,.]\s?\d{3})+|\d+)\s?원?")
+_HAS_LETTER = re.compile(r"[A-Za-z가-힣]")
+
+TOTAL_KEYWORDS = ("합계", "총액", "총합계", "총금액", "결제금액", "받을금액", "청구금액", "판매금액", "total")
+NON_ITEM_KEYWORDS = (
+    "부가세", "부가가치세", "과세", "면세", "공급가", "세액", "카드", "승인", "거스름", "받은금액",
+    "현금", "할인", "포인트", "사업자", "전화", "tel", "대표", "주소", "일시", "번호", "vat",
+)
+
+
+def group_lines(words: WordBoxes) -> List[List[int]]:
+    """
+    단어 경계 상자를 세로 중심 기준으로 정렬한 뒤 한 번 훑으며 줄 단위로 묶고,
+    각 줄은 왼쪽부터 정렬 (정렬 이후 단어 수에 선형)
+    """
+    n = len(words)
+    if not n:
+        return []
+    coords = words.coords
+    centers = [(coords[i * 4 + 1] + coords[i * 4 + 3]) / 2 for i in range(n)]
+    heights = [max(coords[i * 4 + 3] - coords[i * 4 + 1], 1.0) for i in range(n)]
+
+    order = sorted(range(n), key=centers.__getitem__)
+    lines = []
+    current = [order[0]]
+    line_center = centers[order[0]]
+    line_height = heights[order[0]]
+    for i in order[1:]:
+        if abs(centers[i] - line_center) <= max(line_height, heights[i]) * LINE_TOLERANCE:
+            current.append(i)
+            # 줄 중심/높이는 누적 평균으로 갱신
+            line_center += (centers[i] - line_center) / len(current)
+            line_height += (heights[i] - line_height) / len(current)
+        else:
+            lines.append(current)
+            current = [i]
+            line_center = centers[i]
+            line_height = heights[i]
+    lines.append(current)
+    return [sorted(line, key=lambda i: coords[i * 4]) for line in lines]
+
+
+def parse_amount(text: str) -> Optional[int]:
+    """금액 문자열을 정수로 변환 (쉼표/마침표 천 단위 구분, 원/₩ 기호 허용)"""
+    match = _AMOUNT.fullmatch(text.strip())
+    if not match:
+        return None
+    digits = re.sub(r"[^\d]", "", text)
+    if not digits:
+        return None
+    value = int(digits)
+    return -value if text.strip().startswith(("-", "−")) else value
+
+
+def _normalize_key(text: str) -> str:
+    return re.sub(r"\s+", "", text).lower()
+
+
+def _parse_line(text: str) -> Optional[Dict[str, Any]]:
+    """줄 끝의 금액과 앞쪽 상품명(및 수량)을 분리"""
+    matches = list(_AMOUNT.finditer(text))
+    if not matches:
+        return None
+    last = matches[-1]
+    # 금액 뒤에 다른 글자가 남아 있으면 금액 줄이 아님 (예: 전화번호, 날짜)
+    if text[last.end():].strip():
+        return None
+    amount = parse_amount(last.group())
+    if amount is None:
+        return None
+    name = text[:matches[0].start()].strip()
+    quantity = None
+    numbers = [parse_amount(m.group()) for m in matches[:-1]]
+    if numbers and numbers[0] is not None and 0 < numbers[0] < 100 and "," not in matches[0].group():
+        quantity = numbers[0]
+    return {"name": name, "quantity": quantity, "amount": amount}
+
+
+def _lines_from_result(result: Dict[str, Any]) -> List[str]:
+    words = WordBoxes.from_dict(result.get("words"))
+    if len(words):
+        return [" ".join(words.texts[i] for i in line) for line in group_lines(words)]
+    # 경계 상자가 없으면 줄바꿈 기준으로 대체
+    return [line for line in result.get("full_text", "").splitlines() if line.strip()]
+
+
+def extract_receipt_fields(result: Dict[str, Any]) -> Dict[str, Any]:
+    """OCR 결과에서 상품명/수량/가격 목록과 합계 금액 추출"""
+    items = []
+    totals = []
+    lines = _lines_from_result(result)
+    for line in lines:
+        parsed = _parse_line(line)
+        if parsed is None:
+            continue
+        key = _normalize_key(line)
+        if any(keyword in key for keyword in TOTAL_KEYWORDS):
+            totals.append(parsed["amount"])
+            continue
+        if any(keyword in key for keyword in NON_ITEM_KEYWORDS):
+            continue
+        if parsed["name"] and _HAS_LETTER.search(parsed["name"]) and parsed["amount"] > 0:
+            items.append({"name": parsed["name"], "quantity": parsed["quantity"], "price": parsed["amount"]})
+
+    return {
+        "items": items,
+        # 합계 키워드 줄이 여러 개면(합계/결제금액 등) 가장 큰 금액을 총액으로 봄
+        "total": max(totals) if totals else None,
+        "line_count": len(lines)
+    }
+
+
+def field_accuracy(reference: Dict[str, Any], hypothesis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    구조화된 필드 비교: 총액 일치 여부와 (상품명, 가격) 쌍 기준 precision/recall/F1,
+    가격만 기준으로 한 recall
+    """
+    ref_items = [(_normalize_key(item["name"]), item["price"]) for item in reference.get("items", [])]
+    hyp_items = [(_normalize_key(item["name"]), item["price"]) for item in hypothesis.get("items", [])]
+
+    def matched(ref, hyp) -> int:
+        remaining = list(hyp)
+        count = 0
+        for entry in ref:
+            if entry in remaining:
+                remaining.remove(entry)
+                count += 1
+        return count
+
+    item_matches = matched(ref_items, hyp_items)
+    price_matches = matched([p for _, p in ref_items], [p for _, p in hyp_items])
+    precision = item_matches / len(hyp_items) if hyp_items else (1.0 if not ref_items else 0.0)
+    recall = item_matches / len(ref_items) if ref_items else (1.0 if not hyp_items else 0.0)
+    ref_total, hyp_total = reference.get("total"), hypothesis.get("total")
+
+    return {
+        "total_match": None if ref_total is None and hyp_total is None else ref_total == hyp_total,
+        "item_precision": round(precision, 4),
+        "item_recall": round(recall, 4),
+        "item_f1": round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+        "price_recall": round(price_matches / len(ref_items), 4) if ref_items else (1.0 if not hyp_items else 0.0)
+    }
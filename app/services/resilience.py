@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from app.core.config import settings
+
+# 지연 시간 분포(p95)를 신뢰하기 위한 최소 표본 수
+MIN_LATENCY_SAMPLES = 20
+
+
+class CircuitBreaker:
+    """
+    제공자별 서킷 브레이커.
+    연속 실패(마감 초과, 느린 응답 포함)가 임계값에 도달하면 열려서 호출을 즉시 실패 처리하고,
+    reset_timeout 후 반열림 상태에서 시험 호출 하나만 허용해 성공하면 다시 닫힌다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None,
+                 slow_call_threshold: Optional[float] = None, reset_timeout: Optional[float] = None,
+                 window: int = 200):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.BREAKER_FAILURE_THRESHOLD
+        self.slow_call_threshold = slow_call_threshold or settings.BREAKER_SLOW_CALL_THRESHOLD
+        self.reset_timeout = settings.BREAKER_RESET_TIMEOUT if reset_timeout is None else reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.short_circuits = 0
+        # 성공한 호출의 처리 시간 (초, 헤지 지연 계산용)
+        self._latencies: Deque[float] = deque(maxlen=window)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """호출 가능 여부 (반열림 상태에서는 시험 호출 하나만 허용)"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.short_circuits += 1
+            return False
+
+    def release(self):
+        """결과 없이 끝난 호출(쿼럼 도달로 취소 등)의 시험 호출 권한 반환"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record(self, success: bool, latency: float):
+        """호출 결과 기록 (latency는 초 단위, 느린 성공 응답도 실패로 간주)"""
+        with self._lock:
+            if success:
+                self._latencies.append(latency)
+            failed = not success or latency > self.slow_call_threshold
+            state = self._current_state()
+            self._trial_in_flight = False
+            if failed:
+                self.consecutive_failures += 1
+                if state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                    if state != self.OPEN:
+                        self.trips += 1
+                    self._state = self.OPEN
+                    self._opened_at = time.monotonic()
+            else:
+                self.consecutive_failures = 0
+                self._state = self.CLOSED
+
+    def latency_p95(self) -> Optional[float]:
+        with self._lock:
+            if len(self._latencies) < MIN_LATENCY_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[int(round(0.95 * (len(ordered) - 1)))]
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)) if state == self.OPEN else None
+            samples = len(self._latencies)
+        p95 = self.latency_p95()
+        return {
+            "state": state,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "short_circuits": self.short_circuits,
+            "retry_in": round(retry_in, 2) if retry_in is not None else None,
+            "latency_samples": samples,
+            "latency_p95": round(p95 * 1000, 2) if p95 is not None else None
+        }
+
+
+class CircuitBreakers:
+    """제공자 이름별 서킷 브레이커 모음 (처음 조회할 때 생성)"""
+
+    def __init__(self, enabled: Optional[bool] = None, **options):
+        self.enabled = settings.BREAKER_ENABLED if enabled is None else enabled
+        self.options = options
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, provider: str) -> CircuitBreaker:
+        with self._lock:
+            if provider not in self._breakers:
+                self._breakers[provider] = CircuitBreaker(provider, **self.options)
+            return self._breakers[provider]
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {
+            "enabled": self.enabled,
+            "providers": {name: breaker.status() for name, breaker in breakers.items()}
+        }
+
+
+# 워커 프로세스당 하나 (비교/라우팅/배치/단독 호출이 같은 브레이커 상태를 공유)
+circuit_breakers = CircuitBreakers()
@@ -0,0 +1,305 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.utils.payload import ImagePayload
+
+logger = logging.getLogger(__name__)
+
+
+class ResultStore:
+    """
+    모든 비교 결과를 기록하는 SQLite 저장소 (이력 조회/집계의 기준 기록).
+    비교 한 건은 comparisons, 제공자별 결과는 provider_results에 한 행씩 저장하고
+    시각/이미지 해시/제공자 인덱스로 조회한다. Google Sheets는 여기서 내보내는 선택적 사본이다.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS comparisons (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at REAL NOT NULL,
+                image_hash TEXT NOT NULL,
+                image_name TEXT,
+                image_size INTEGER,
+                baseline TEXT,
+                similarity_score REAL,
+                both_successful INTEGER NOT NULL,
+                recommendation TEXT,
+                comparison TEXT,
+                exported_sheet TEXT,
+                exported_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS provider_results (
+                comparison_id INTEGER NOT NULL REFERENCES comparisons (id),
+                provider TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                success INTEGER NOT NULL,
+                skipped INTEGER NOT NULL DEFAULT 0,
+                cached INTEGER NOT NULL DEFAULT 0,
+                text_length INTEGER NOT NULL,
+                process_time REAL,
+                confidence REAL,
+                similarity_score REAL,
+                cer REAL,
+                wer REAL,
+                full_text TEXT,
+                error TEXT,
+                PRIMARY KEY (comparison_id, provider)
+            );
+            CREATE INDEX IF NOT EXISTS idx_comparisons_created ON comparisons (created_at);
+            CREATE INDEX IF NOT EXISTS idx_comparisons_hash ON comparisons (image_hash);
+            CREATE INDEX IF NOT EXISTS idx_comparisons_unexported ON comparisons (id) WHERE exported_at IS NULL;
+            CREATE INDEX IF NOT EXISTS idx_provider_results_provider ON provider_results (provider, created_at);
+            """
+        )
+        self._conn.commit()
+
+    def add(self, payload: ImagePayload, result: Dict[str, Any]) -> int:
+        """비교 결과 한 건 저장 (단어 상자/필드 등 큰 값은 제외하고 비교 요약만 JSON으로 보관)"""
+        comparison = result["comparison"]
+        pairwise = comparison.get("pairwise") or {}
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO comparisons (created_at, image_hash, image_name, image_size, baseline,"
+                " similarity_score, both_successful, recommendation, comparison)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    now, payload.digest, payload.filename, payload.size, comparison.get("baseline"),
+                    comparison.get("similarity_score"), int(bool(comparison.get("both_successful"))),
+                    comparison.get("recommendation"), json.dumps(comparison, ensure_ascii=False, default=str)
+                )
+            )
+            comparison_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO provider_results (comparison_id, provider, created_at, success, skipped, cached,"
+                " text_length, process_time, confidence, similarity_score, cer, wer, full_text, error)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        comparison_id, name, now, int(bool(provider_result.get("success"))),
+                        int(bool(provider_result.get("skipped"))), int(bool(provider_result.get("cached"))),
+                        len(provider_result.get("full_text", "").strip()), provider_result.get("process_time"),
+                        provider_result.get("confidence"), pairwise.get(name, {}).get("similarity_score"),
+                        pairwise.get(name, {}).get("cer"), pairwise.get(name, {}).get("wer"),
+                        provider_result.get("full_text", ""), provider_result.get("error")
+                    )
+                    for name, provider_result in ((name, result[name]) for name in result.get("providers", []))
+                ]
+            )
+            self._conn.commit()
+        return comparison_id
+
+    @staticmethod
+    def _filters(since: Optional[float], until: Optional[float], provider: Optional[str],
+                 image_hash: Optional[str], alias: str = "c", ids: Optional[List[int]] = None):
+        clauses, params = [], []
+        if ids is not None:
+            clauses.append(f"{alias}.id IN ({','.join('?' * len(ids)) or 'NULL'})")
+            params.extend(ids)
+        if since is not None:
+            clauses.append(f"{alias}.created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append(f"{alias}.created_at < ?")
+            params.append(until)
+        if image_hash:
+            clauses.append(f"{alias}.image_hash = ?")
+            params.append(image_hash)
+        if provider:
+            clauses.append(f"EXISTS (SELECT 1 FROM provider_results p WHERE p.comparison_id = {alias}.id AND p.provider = ?)")
+            params.append(provider)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, since: Optional[float] = None, until: Optional[float] = None, provider: Optional[str] = None,
+              image_hash: Optional[str] = None, limit: int = 100, offset: int = 0,
+              include_text: bool = False, ids: Optional[List[int]] = None,
+              oldest_first: bool = False) -> List[Dict[str, Any]]:
+        """비교 결과 (기본 최신순, provider를 지정하면 그 제공자 결과만 포함)"""
+        where, params = self._filters(since, until, provider, image_hash, ids=ids)
+        order = "ASC" if oldest_first else "DESC"
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, created_at, image_hash, image_name, image_size, baseline, similarity_score,"
+                f" both_successful, recommendation, exported_sheet, exported_at FROM comparisons c{where}"
+                f" ORDER BY created_at {order}, id {order} LIMIT ? OFFSET ?",
+                (*params, limit, offset)
+            ).fetchall()
+            ids = [row["id"] for row in rows]
+            provider_rows = []
+            if ids:
+                text_column = "full_text" if include_text else "NULL AS full_text"
+                provider_clause = " AND provider = ?" if provider else ""
+                provider_rows = self._conn.execute(
+                    f"SELECT comparison_id, provider, success, skipped, cached, text_length, process_time, confidence,"
+                    f" similarity_score, cer, wer, {text_column}, error FROM provider_results"
+                    f" WHERE comparison_id IN ({','.join('?' * len(ids))}){provider_clause}",
+                    (*ids, *([provider] if provider else []))
+                ).fetchall()
+
+        providers: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        for row in provider_rows:
+            entry = {key: row[key] for key in row.keys() if key not in ("comparison_id", "provider")}
+            for key in ("success", "skipped", "cached"):
+                entry[key] = bool(entry[key])
+            if not include_text:
+                entry.pop("full_text")
+            providers.setdefault(row["comparison_id"], {})[row["provider"]] = entry
+        return [
+            {**dict(row), "both_successful": bool(row["both_successful"]), "providers": providers.get(row["id"], {})}
+            for row in rows
+        ]
+
+    def stats(self, since: Optional[float] = None, until: Optional[float] = None,
+              provider: Optional[str] = None) -> Dict[str, Any]:
+        """기간 내 비교 수와 제공자별 성공률/처리 시간/기준 대비 유사도 집계 (SQLite에서 계산)"""
+        where, params = self._filters(since, until, None, None, alias="p")
+        if provider:
+            where += (" AND " if where else " WHERE ") + "p.provider = ?"
+            params.append(provider)
+        comparison_where, comparison_params = self._filters(since, until, provider, None)
+        with self._lock:
+            totals = self._conn.execute(
+                "SELECT COUNT(*) AS comparisons, AVG(both_successful) AS both_success_rate,"
+                " AVG(similarity_score) AS avg_similarity, COUNT(DISTINCT image_hash) AS unique_images,"
+                f" MIN(created_at) AS first_at, MAX(created_at) AS last_at FROM comparisons c{comparison_where}",
+                comparison_params
+            ).fetchone()
+            rows = self._conn.execute(
+                "SELECT provider, COUNT(*) AS calls, SUM(success) AS successes, SUM(skipped) AS skipped,"
+                " SUM(cached) AS cached, AVG(success) AS success_rate,"
+                " AVG(CASE WHEN success AND NOT cached THEN process_time END) AS avg_process_time,"
+                " MAX(CASE WHEN success AND NOT cached THEN process_time END) AS max_process_time,"
+                " AVG(CASE WHEN success THEN text_length END) AS avg_text_length,"
+                " AVG(confidence) AS avg_confidence, AVG(similarity_score) AS avg_similarity,"
+                f" AVG(cer) AS avg_cer, AVG(wer) AS avg_wer FROM provider_results p{where}"
+                " GROUP BY provider ORDER BY provider",
+                params
+            ).fetchall()
+
+        def rounded(value, digits=4):
+            return round(value, digits) if value is not None else None
+
+        return {
+            "comparisons": totals["comparisons"],
+            "unique_images": totals["unique_images"],
+            "both_success_rate": rounded(totals["both_success_rate"]),
+            "avg_similarity": rounded(totals["avg_similarity"], 2),
+            "first_at": totals["first_at"],
+            "last_at": totals["last_at"],
+            "providers": {
+                row["provider"]: {
+                    "calls": row["calls"],
+                    "successes": row["successes"],
+                    "skipped": row["skipped"],
+                    "cached": row["cached"],
+                    "success_rate": rounded(row["success_rate"]),
+                    "avg_process_time": rounded(row["avg_process_time"], 2),
+                    "max_process_time": rounded(row["max_process_time"], 2),
+                    "avg_text_length": rounded(row["avg_text_length"], 1),
+                    "avg_confidence": rounded(row["avg_confidence"]),
+                    "avg_similarity": rounded(row["avg_similarity"], 2),
+                    "avg_cer": rounded(row["avg_cer"]),
+                    "avg_wer": rounded(row["avg_wer"])
+                }
+                for row in rows
+            }
+        }
+
+    def pending_export(self, limit: int = 500) -> List[Dict[str, Any]]:
+        """아직 시트로 내보내지 않은 비교 결과 (오래된 순, 제공자별 전체 텍스트 포함)"""
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute(
+                "SELECT id FROM comparisons WHERE exported_at IS NULL ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()]
+        if not ids:
+            return []
+        return self.query(ids=ids, limit=len(ids), include_text=True, oldest_first=True)
+
+    def get(self, comparison_id: int) -> Optional[Dict[str, Any]]:
+        entries = self.query(ids=[comparison_id], limit=1, include_text=True)
+        return entries[0] if entries else None
+
+    def mark_exported(self, ids: List[int], sheet_name: str):
+        if not ids:
+            return
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE comparisons SET exported_sheet = ?, exported_at = ? WHERE id IN ({','.join('?' * len(ids))})",
+                (sheet_name, time.time(), *ids)
+            )
+            self._conn.commit()
+
+
+class ResultSheetSync:
+    """
+    저장소에서 아직 내보내지 않은 비교 결과를 주기적으로 시트 일괄 작성기로 내보내는 선택적 동기화.
+    leader가 있으면 True를 돌려준 주기에만 내보냄 (다중 워커에서 같은 행을 두 번 내보내지 않도록 한 워커만 담당)
+    """
+
+    def __init__(self, store: Callable[[], ResultStore], writer, sheet_name: str,
+                 interval: float, batch_size: int = 500, leader: Optional[Callable[[], bool]] = None):
+        self._store = store
+        self._leader = leader
+        self.writer = writer
+        self.sheet_name = sheet_name
+        self.interval = interval
+        self.batch_size = batch_size
+        self.exported = 0
+        self.last_error: Optional[str] = None
+
+    @staticmethod
+    def build_row(entry: Dict[str, Any]) -> List[Any]:
+        from app.services.google_sheets import GoogleSheetsService
+
+        providers = entry["providers"]
+        return GoogleSheetsService.build_row(
+            image_name=entry["image_name"] or entry["image_hash"][:12],
+            image_size=entry["image_size"] or 0,
+            google_result=providers.get("google_vision", {}),
+            naver_result=providers.get("naver_clova", {}),
+            comparison_result=entry,
+            timestamp=datetime.fromtimestamp(entry["created_at"])
+        )
+
+    def sync_once(self) -> int:
+        """(스레드에서 실행) 미내보내기 결과를 작성기에 넣고 기록(또는 스필 보관)이 끝나면 내보냄으로 표시"""
+        store = self._store()
+        total = 0
+        while True:
+            entries = store.pending_export(self.batch_size)
+            if not entries:
+                return total
+            futures = [self.writer.submit(self.sheet_name, self.build_row(entry)) for entry in entries]
+            # 작성기는 실패한 행도 스필 파일에 보관했다가 재시도하므로 완료되면 내보낸 것으로 처리
+            for future in futures:
+                future.result()
+            store.mark_exported([entry["id"] for entry in entries], self.sheet_name)
+            total += len(entries)
+            self.exported += len(entries)
+
+    async def run(self):
+        while True:
+            try:
+                if self._leader is None or await asyncio.to_thread(self._leader):
+                    await asyncio.to_thread(self.sync_once)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning("result sheet sync failed", extra={"error": str(e)})
+            await asyncio.sleep(self.interval)
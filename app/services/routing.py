@@ -0,0 +1,242 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+from app.core.config import settings
+from app.services.executor import ProviderExecutor
+from app.services.preprocess import ImagePreprocessor
+from app.services.receipt import extract_receipt_fields
+from app.services.text_metrics import normalize_text, similarity
+from app.utils.payload import ImagePayload
+
+# 지연 시간 기반 헤지를 시작하기 위한 최소 표본 수
+MIN_SAMPLES = 5
+
+
+def _percentile(values: List[float], percentile: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[int(round(percentile / 100 * (len(ordered) - 1)))]
+
+
+class ProviderStats:
+    """제공자별 최근 결과(처리 시간, 성공 여부, 품질)를 고정 길이 창으로 유지하는 롤링 통계"""
+
+    def __init__(self, window: Optional[int] = None):
+        self.window = window or settings.ROUTING_WINDOW
+        self._lock = threading.Lock()
+        # 제공자 -> (처리 시간 ms, 성공 여부)
+        self._calls: Dict[str, Deque[Tuple[float, bool]]] = {}
+        # 제공자 -> 품질 (나머지 제공자 결과와의 평균 유사도, 0~1, 3개 이상 성공한 비교에서만)
+        self._quality: Dict[str, Deque[float]] = {}
+
+    def record(self, provider: str, result: Dict[str, Any], quality: Optional[float] = None):
+        """
+        호출 결과 기록. 캐시 적중(실제 호출 없음)과 쿼럼/사전 검사로 생략된 호출은
+        지연·오류율을 왜곡하므로 제외한다.
+        """
+        with self._lock:
+            if not (result.get("cached") or result.get("skipped")):
+                calls = self._calls.setdefault(provider, deque(maxlen=self.window))
+                calls.append((float(result.get("process_time") or 0.0), bool(result.get("success"))))
+            if quality is not None:
+                self._quality.setdefault(provider, deque(maxlen=self.window)).append(quality)
+
+    def record_comparison(self, results: Dict[str, Dict[str, Any]], comparison: Dict[str, Any]):
+        """
+        비교 결과에서 제공자별 품질 표본 추출: 나머지 성공한 제공자들과의 평균 유사도(다수 결과와의 일치도).
+        성공한 제공자가 둘뿐이면 유사도가 양쪽에 같아 어느 쪽이 틀렸는지 알 수 없으므로 품질은 기록하지 않는다.
+        """
+        baseline = comparison.get("baseline") or next(iter(results))
+        pairwise = comparison.get("pairwise") or {}
+        successful = [name for name, result in results.items()
+                      if result.get("success") and result.get("full_text")]
+        agreement: Dict[str, List[float]] = {name: [] for name in successful}
+        if len(successful) >= 3:
+            texts = {name: normalize_text(results[name]["full_text"]) for name in successful}
+            for i, a in enumerate(successful):
+                for b in successful[i + 1:]:
+                    # 기준 제공자와의 유사도는 비교 단계에서 이미 계산됨
+                    other = b if a == baseline else a if b == baseline else None
+                    if other is not None and other in pairwise:
+                        score = pairwise[other]["similarity_score"] / 100
+                    else:
+                        score = similarity(texts[a], texts[b])
+                    agreement[a].append(score)
+                    agreement[b].append(score)
+        for name, result in results.items():
+            scores = agreement.get(name)
+            self.record(name, result, sum(scores) / len(scores) if scores else None)
+
+    def summary(self, provider: str) -> Dict[str, Any]:
+        with self._lock:
+            calls = list(self._calls.get(provider, ()))
+            quality = list(self._quality.get(provider, ()))
+        latencies = [latency for latency, success in calls if success]
+        return {
+            "samples": len(calls),
+            "error_rate": round(sum(not success for _, success in calls) / len(calls), 4) if calls else None,
+            "latency_p50": _percentile(latencies, 50),
+            "latency_p95": _percentile(latencies, 95),
+            "quality": round(sum(quality) / len(quality), 4) if quality else None,
+            "quality_samples": len(quality)
+        }
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            providers = list(dict.fromkeys([*self._calls, *self._quality]))
+        return {provider: self.summary(provider) for provider in providers}
+
+
+# 비교 모드와 라우팅 모드가 같은 통계를 공유 (워커 프로세스당 하나)
+provider_stats = ProviderStats()
+
+
+class ProviderRouter:
+    """
+    롤링 통계로 제공자 순위를 매겨 요청마다 1순위 제공자 하나만 호출하는 라우팅 모드.
+    1순위가 헤지 시간 안에 응답하지 않으면 2순위를 동시에 호출하고,
+    실패하거나 결과가 짧거나 신뢰도가 낮으면 다음 제공자로 폴백한다.
+    """
+
+    def __init__(self, registry, executor: Optional[ProviderExecutor] = None,
+                 stats: Optional[ProviderStats] = None, preprocessor: Optional[ImagePreprocessor] = None,
+                 costs: Optional[Dict[str, float]] = None, hedge_after: Optional[float] = None):
+        self.registry = registry
+        self.executor = executor or ProviderExecutor()
+        self.stats = stats or provider_stats
+        self.preprocessor = preprocessor or ImagePreprocessor()
+        self.costs = costs if costs is not None else settings.PROVIDER_COSTS
+        self.hedge_after = settings.ROUTING_HEDGE_AFTER if hedge_after is None else hedge_after
+
+    def score(self, provider: str) -> float:
+        """
+        품질 × 성공률 - 지연(p95 초) 감점 - 비용 감점.
+        품질은 3개 이상 제공자 비교에서의 다수 일치도이며, 표본이 없는 값은 낙관적으로 가정해
+        새 제공자도 한 번씩 시도되게 한다 (제공자 두 개만 비교하면 지연/오류율/비용으로만 순위가 정해짐).
+        """
+        summary = self.stats.summary(provider)
+        quality = summary["quality"] if summary["quality"] is not None else 1.0
+        error_rate = summary["error_rate"] or 0.0
+        latency = (summary["latency_p95"] or 0.0) / 1000
+        return (quality * (1 - error_rate)
+                - settings.ROUTING_LATENCY_WEIGHT * latency
+                - settings.ROUTING_COST_WEIGHT * self.costs.get(provider, 0.0))
+
+    def rank(self) -> List[Tuple[str, float]]:
+        """점수 내림차순 (서킷 브레이커가 열린 제공자는 맨 뒤, 동점이면 OCR_PROVIDERS 순서)"""
+        scores = [(name, round(self.score(name), 4)) for name in self.registry.names]
+        breakers = self.executor.breakers
+        return sorted(scores, key=lambda item: (breakers.enabled and breakers.get(item[0]).state == "open", -item[1]))
+
+    def hedge_delay(self, provider: str) -> Optional[float]:
+        """2순위 제공자를 동시에 호출하기까지 기다릴 시간 (초, 표본이 부족하면 헤지하지 않음)"""
+        if self.hedge_after > 0:
+            return self.hedge_after
+        summary = self.stats.summary(provider)
+        if summary["samples"] < MIN_SAMPLES or summary["latency_p95"] is None:
+            return None
+        return summary["latency_p95"] / 1000
+
+    @staticmethod
+    def rejection(result: Dict[str, Any]) -> Optional[str]:
+        """결과를 그대로 쓸 수 없는 이유 (사용 가능하면 None)"""
+        if not result.get("success"):
+            return "failed"
+        if len(result.get("full_text", "").strip()) < settings.ROUTING_MIN_CHARS:
+            return "too_short"
+        confidence = result.get("confidence")
+        if confidence is not None and confidence < settings.ROUTING_MIN_CONFIDENCE:
+            return "low_confidence"
+        return None
+
+    async def route(self, image_content: Union[ImagePayload, bytes],
+                    limits: Optional[Dict[str, asyncio.Semaphore]] = None,
+                    preprocess: Optional[bool] = None) -> Dict[str, Any]:
+        start_time = time.monotonic()
+        payload = ImagePayload.wrap(image_content)
+        ranking = self.rank()
+        order = [name for name, _ in ranking]
+        payloads = {name: payload for name in order}
+        preprocess_report = None
+        if settings.PREPROCESS_ENABLED if preprocess is None else preprocess:
+            payloads, preprocess_report = await self.preprocessor.prepare(payload, order)
+
+        tasks: Dict[asyncio.Task, str] = {}
+        launched: List[str] = []
+        hedged: List[str] = []
+
+        def launch(name: str):
+            call = lambda: self.registry.get(name).extract_text(payloads[name])
+            tasks[asyncio.create_task(self.executor.run({name: call}, quorum=0, limits=limits))] = name
+            launched.append(name)
+
+        launch(order[0])
+        # 헤지 대상은 2순위 제공자 하나 (1순위가 느릴 때만)
+        hedge_at = self.hedge_delay(order[0]) if len(order) > 1 else None
+
+        results: Dict[str, Dict[str, Any]] = {}
+        attempts = []
+        chosen = None
+        try:
+            while tasks and chosen is None:
+                timeout = None
+                if hedge_at is not None and order[1] not in launched:
+                    timeout = max(0.0, hedge_at - (time.monotonic() - start_time))
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    launch(order[1])
+                    hedged.append(order[1])
+                    continue
+
+                for task in done:
+                    name = tasks.pop(task)
+                    result = task.result()[name]
+                    results[name] = result
+                    self.stats.record(name, result)
+                    reason = self.rejection(result)
+                    attempts.append({
+                        "provider": name,
+                        "success": result.get("success", False),
+                        "process_time": result.get("process_time"),
+                        "hedge": name in hedged,
+                        "rejected": reason
+                    })
+                    if reason is None and chosen is None:
+                        chosen = name
+
+                # 실패/저신뢰이고 진행 중인 호출이 없으면 다음 순위 제공자로 폴백
+                if chosen is None and not tasks:
+                    remaining = [name for name in order if name not in launched]
+                    if remaining:
+                        launch(remaining[0])
+        finally:
+            # 채택된 결과가 나오면 나머지 헤지 호출은 취소
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if chosen is None:
+            # 모두 기준 미달이면 성공한 결과 중 가장 긴 텍스트, 없으면 1순위 결과 반환
+            chosen = max(results, key=lambda name: (results[name].get("success", False),
+                                                   len(results[name].get("full_text", ""))))
+        result = results[chosen]
+        if result.get("success"):
+            result = {**result, "fields": extract_receipt_fields(result)}
+
+        routed = {
+            "mode": "route",
+            "provider": chosen,
+            "result": result,
+            "accepted": self.rejection(result) is None,
+            "attempts": attempts,
+            "ranking": [{"provider": name, "score": score} for name, score in ranking],
+            "elapsed": round((time.monotonic() - start_time) * 1000, 2),
+            "timestamp": int(time.time())
+        }
+        if preprocess_report is not None:
+            routed["preprocess"] = preprocess_report
+        return routed
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional
+
+from app.core.config import settings
+from app.utils.payload import ImagePayload
+
+
+class BatchItem:
+    """배치로 처리할 이미지 한 건 (내용은 워커가 처리할 때 지연 로딩)"""
+
+    def __init__(self, index: int, filename: str, load: Callable[[], Awaitable[bytes]],
+                 error: Optional[str] = None):
+        self.index = index
+        self.filename = filename
+        self.load = load
+        # 업로드 단계에서 이미 거부된 항목은 error를 담아 결과로만 전달
+        self.error = error
+
+
+class BatchScheduler:
+    """다수 이미지를 제한된 워커 풀로 비교 처리하고 완료되는 순서대로 결과를 내보내는 스케줄러"""
+
+    def __init__(self, comparator, workers: Optional[int] = None,
+                 provider_limits: Optional[Dict[str, int]] = None):
+        self.comparator = comparator
+        self.workers = workers or settings.BATCH_WORKERS
+        provider_limits = provider_limits if provider_limits is not None else settings.BATCH_PROVIDER_CONCURRENCY
+        # 제공자별 동시 호출 제한은 스케줄러 인스턴스를 공유하는 모든 배치 요청에 공통 적용
+        self.limits = {
+            provider: asyncio.Semaphore(limit)
+            for provider, limit in provider_limits.items()
+        }
+
+    @staticmethod
+    def _provider_results(result: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """비교 결과 중 제공자별 결과 (providers 목록이 없으면 success 필드가 있는 항목)"""
+        names = result.get("providers") or [
+            name for name, value in result.items() if isinstance(value, dict) and "success" in value
+        ]
+        return {name: result[name] for name in names if isinstance(result.get(name), dict)}
+
+    async def _process(self, item: BatchItem) -> Dict[str, Any]:
+        start_time = time.monotonic()
+        if item.error:
+            return {"index": item.index, "filename": item.filename, "success": False, "error": item.error}
+        try:
+            image_content = await item.load()
+            if len(image_content) > settings.MAX_FILE_SIZE:
+                raise ValueError("File size exceeds 10MB limit")
+            # 결과 저장소에 파일 이름이 남도록 페이로드에 담아 전달
+            payload = ImagePayload(image_content, filename=item.filename)
+            result = await self.comparator.compare_ocr_results(payload, limits=self.limits)
+            # 예외 없이 끝나도 모든 제공자가 실패했으면 실패한 항목으로 집계
+            providers = self._provider_results(result)
+            success = not providers or any(provider.get("success") for provider in providers.values())
+            line = {
+                "index": item.index,
+                "filename": item.filename,
+                "success": success,
+                "elapsed": round((time.monotonic() - start_time) * 1000, 2),
+                "result": result
+            }
+            if not success:
+                line["error"] = "; ".join(
+                    f"{name}: {provider.get('error') or 'failed'}" for name, provider in providers.items()
+                )
+            return line
+        except Exception as e:
+            return {
+                "index": item.index,
+                "filename": item.filename,
+                "success": False,
+                "elapsed": round((time.monotonic() - start_time) * 1000, 2),
+                "error": str(e)
+            }
+
+    async def run(self, items: Iterable[BatchItem]) -> AsyncIterator[Dict[str, Any]]:
+        """항목을 워커 풀에 배분하고 끝나는 대로 결과를 하나씩 반환"""
+        pending: asyncio.Queue = asyncio.Queue(maxsize=self.workers)
+        finished: asyncio.Queue = asyncio.Queue()
+        done_marker = object()
+
+        async def produce():
+            try:
+                for item in items:
+                    await pending.put(item)
+            finally:
+                for _ in range(self.workers):
+                    await pending.put(None)
+
+        async def work():
+            try:
+                while True:
+                    item = await pending.get()
+                    if item is None:
+                        return
+                    await finished.put(await self._process(item))
+            finally:
+                await finished.put(done_marker)
+
+        tasks = [asyncio.create_task(produce())]
+        tasks += [asyncio.create_task(work()) for _ in range(self.workers)]
+        try:
+            remaining = self.workers
+            while remaining:
+                result = await finished.get()
+                if result is done_marker:
+                    remaining -= 1
+                    continue
+                yield result
+        finally:
+            # 클라이언트 연결이 끊기면 남은 작업을 취소
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,312 @@
+"""
+워커 프로세스 간 공유 상태 저장소 (gunicorn 다중 워커 실행용).
+
+- 토큰 버킷: 여러 워커가 같은 요청 수 제한/제공자 호출 예산/시트 기록 예산을 나눠 씀
+- 키-값 (만료 시각 포함): 결과 캐시 디스크 계층, 워커별 메트릭 스냅숏
+- 리스(claim): 작업 재개/시트 동기화처럼 한 워커만 실행해야 하는 일의 담당자 선출
+
+기본은 로컬 SQLite 파일 (같은 컨테이너의 워커끼리 공유),
+SHARED_STATE_BACKEND=redis이면 Redis 호환 서버를 사용한다 (redis 패키지 필요, 로컬 대역 서버로 대체 가능).
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.lazy import Lazy
+
+# SQLite 키-값에서 만료된 항목을 정리하는 주기 (쓰기 횟수)
+PURGE_EVERY = 500
+
+
+class SharedStore:
+    def take(self, key: str, rate: float, burst: float, tokens: float, max_wait: float) -> Tuple[float, float]:
+        """
+        토큰 버킷을 원자적으로 채우고, 기다릴 시간이 max_wait 이하이면 tokens개를 가져감 (잔량은 음수가 될 수 있음).
+        (tokens개를 쓰려면 기다려야 하는 시간(초), 처리 후 잔량)을 반환. max_wait이 음수이면 조회만 한다
+        """
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def scan(self, prefix: str) -> Dict[str, Any]:
+        """prefix로 시작하는 만료되지 않은 키와 값"""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def claim(self, name: str, owner: str, ttl: float) -> bool:
+        """리스가 비었거나 만료됐거나 이미 owner 것이면 owner로 ttl초 동안 잡고 True"""
+        raise NotImplementedError
+
+    def release(self, name: str, owner: str) -> None:
+        """owner가 잡고 있는 리스만 해제"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+def _refill(tokens: Optional[float], updated: Optional[float], now: float, rate: float, burst: float) -> float:
+    if tokens is None:
+        return burst
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+class SQLiteSharedStore(SharedStore):
+    """
+    같은 컨테이너의 워커들이 함께 여는 SQLite 파일 (WAL).
+    토큰 버킷과 리스는 BEGIN IMMEDIATE 트랜잭션으로 프로세스 간 원자적으로 갱신한다
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._writes = 0
+        # 다른 워커가 쓰기 잠금을 잡고 있으면 잠시 기다림 (autocommit 모드, 트랜잭션은 직접 시작)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _transaction(self, work):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work()
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def take(self, key: str, rate: float, burst: float, tokens: float, max_wait: float) -> Tuple[float, float]:
+        if max_wait < 0:
+            # 조회만 할 때는 쓰기 잠금을 잡지 않음
+            with self._lock:
+                row = self._conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            level = _refill(row[0] if row else None, row[1] if row else None, time.time(), rate, burst)
+            return max(0.0, (tokens - level) / rate), level
+
+        def work():
+            now = time.time()
+            row = self._conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            level = _refill(row[0] if row else None, row[1] if row else None, now, rate, burst)
+            wait = max(0.0, (tokens - level) / rate)
+            if wait <= max_wait:
+                level -= tokens
+            self._conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)", (key, level, now)
+            )
+            return wait, level
+        return self._transaction(work)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)", (key, data, time.time() + ttl)
+            )
+            # 만료된 키(종료된 워커의 메트릭, 오래된 캐시)는 가끔 한 번에 정리
+            self._writes += 1
+            if self._writes % PURGE_EVERY == 0:
+                self._conn.execute("DELETE FROM kv WHERE expires_at < ?", (time.time(),))
+
+    def scan(self, prefix: str) -> Dict[str, Any]:
+        # LIKE 와일드카드 문자를 피하려고 범위 조건으로 접두사 검색
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM kv WHERE key >= ? AND key < ? AND expires_at >= ?",
+                (prefix, prefix + "\uffff", time.time())
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def claim(self, name: str, owner: str, ttl: float) -> bool:
+        def work():
+            now = time.time()
+            row = self._conn.execute("SELECT owner, expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+            if row is not None and row[0] != owner and row[1] >= now:
+                return False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO leases (name, owner, expires_at) VALUES (?, ?, ?)", (name, owner, now + ttl)
+            )
+            return True
+        return self._transaction(work)
+
+    def release(self, name: str, owner: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# 토큰 버킷 갱신 (KEYS[1], ARGV: rate, burst, tokens, max_wait, max_wait이 음수이면 조회만) → {wait, level} (Redis는 Lua 숫자를 정수로 바꾸므로 문자열로 반환)
+_TAKE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local rate, burst, tokens, max_wait = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local level = burst
+if state[1] then
+  level = math.min(burst, tonumber(state[1]) + math.max(0, now - tonumber(state[2])) * rate)
+end
+local wait = math.max(0, (tokens - level) / rate)
+if max_wait < 0 then return {tostring(wait), tostring(level)} end
+if wait <= max_wait then level = level - tokens end
+redis.call('HSET', KEYS[1], 'tokens', tostring(level), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return {tostring(wait), tostring(level)}
+"""
+
+# 리스 획득 (KEYS[1], ARGV: owner, ttl ms): 비었거나 내 것이면 갱신
+_CLAIM_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current and current ~= ARGV[1] then return 0 end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return 1
+"""
+
+# 리스 해제 (KEYS[1], ARGV: owner): 내 것일 때만 삭제
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then redis.call('DEL', KEYS[1]) end
+return 1
+"""
+
+
+class RedisSharedStore(SharedStore):
+    """Redis 호환 서버 (여러 컨테이너가 공유할 때). 키는 prefix로 구분"""
+
+    def __init__(self, url: str, prefix: str = "ocr:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SHARED_STATE_BACKEND=redis requires the redis package (pip install redis)") from None
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+        self._claim = self._client.register_script(_CLAIM_SCRIPT)
+        self._release = self._client.register_script(_RELEASE_SCRIPT)
+
+    def take(self, key: str, rate: float, burst: float, tokens: float, max_wait: float) -> Tuple[float, float]:
+        wait, level = self._take(keys=[f"{self.prefix}bucket:{key}"], args=[rate, burst, tokens, max_wait])
+        return float(wait), float(level)
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._client.get(f"{self.prefix}kv:{key}")
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._client.set(f"{self.prefix}kv:{key}", json.dumps(value, ensure_ascii=False), px=max(1, int(ttl * 1000)))
+
+    def scan(self, prefix: str) -> Dict[str, Any]:
+        base = f"{self.prefix}kv:"
+        keys = list(self._client.scan_iter(match=f"{base}{prefix}*"))
+        values = self._client.mget(keys) if keys else []
+        return {
+            key.decode()[len(base):]: json.loads(value)
+            for key, value in zip(keys, values) if value is not None
+        }
+
+    def delete(self, key: str) -> None:
+        self._client.delete(f"{self.prefix}kv:{key}")
+
+    def claim(self, name: str, owner: str, ttl: float) -> bool:
+        return bool(self._claim(keys=[f"{self.prefix}lease:{name}"], args=[owner, max(1, int(ttl * 1000))]))
+
+    def release(self, name: str, owner: str) -> None:
+        self._release(keys=[f"{self.prefix}lease:{name}"], args=[owner])
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def create_shared_store(kind: str, path: str, url: str) -> Optional[SharedStore]:
+    if kind == "sqlite":
+        return SQLiteSharedStore(path)
+    if kind == "redis":
+        return RedisSharedStore(url)
+    return None
+
+
+def worker_id() -> str:
+    """현재 워커 프로세스 식별자 (리스 소유자, 메트릭 스냅숏 키)"""
+    return str(os.getpid())
+
+
+def _process_start(pid: int) -> str:
+    """프로세스 시작 시각 (부팅 이후 클록 틱, /proc가 없으면 빈 문자열)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # 실행 파일 이름에 공백이 있을 수 있어 마지막 ')' 뒤부터 셈 (22번째 필드)
+            return f.read().rsplit(")", 1)[1].split()[19]
+    except (OSError, IndexError):
+        return ""
+
+
+def boot_id() -> str:
+    """
+    이 서버 실행(컨테이너 + 마스터 프로세스 기동)의 식별자. 같은 실행의 워커끼리만 같은 값.
+    gunicorn.conf.py가 마스터에서 SERVER_BOOT_ID를 정하고, 없으면 호스트 이름 + 부모 프로세스 ID/시작 시각
+    """
+    configured = os.getenv("SERVER_BOOT_ID")
+    if configured:
+        return configured
+    parent = os.getppid()
+    return f"{socket.gethostname()}:{parent}:{_process_start(parent)}"
+
+
+# 워커 프로세스당 연결 하나 (SHARED_STATE_BACKEND=none이면 공유하지 않고 프로세스 내부 상태만 사용)
+shared_store = Lazy("shared_state", lambda: create_shared_store(
+    settings.SHARED_STATE_BACKEND, settings.SHARED_STATE_PATH, settings.SHARED_STATE_URL
+))
+
+
+def get_shared_store() -> Optional[SharedStore]:
+    if settings.SHARED_STATE_BACKEND == "none":
+        return None
+    return shared_store.get()
+
+
+def hold_lease(name: str, ttl: float) -> bool:
+    """이 워커가 name 작업을 맡아도 되는지 (공유 상태가 없으면 단일 프로세스이므로 항상 True)"""
+    store = get_shared_store()
+    return store is None or store.claim(name, worker_id(), ttl)
+
+
+def release_lease(name: str) -> None:
+    """종료 시 이 워커가 잡은 리스 반환 (다른 워커가 TTL을 기다리지 않고 바로 맡을 수 있음)"""
+    store = get_shared_store()
+    if store is not None:
+        store.release(name, worker_id())
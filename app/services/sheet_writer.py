@@ -0,0 +1,222 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 스레드 잠금만 사용
+    fcntl = None
+
+from app.core.config import settings
+from app.core.metrics import span
+from app.services.ratelimit import make_bucket
+from app.services.shared import SharedStore, get_shared_store
+
+logger = logging.getLogger(__name__)
+
+
+class SheetWriter:
+    """
+    시트 저장 요청을 메모리에 모아 두었다가 크기/시간 기준으로 append_rows 한 번에 기록하는 백그라운드 작성기.
+    할당량 오류 등으로 기록에 실패한 행은 로컬 스필 파일에 보관하고 주기적으로 재시도한다.
+    append_rows 호출은 write_rate(초당, 공유 상태 저장소가 있으면 모든 워커 합계) 예산 안에서만 보내고,
+    스필 파일은 같은 경로를 쓰는 다른 워커와 파일 잠금으로 나눠 쓴다.
+    """
+
+    def __init__(self, service_factory: Callable[[], Any], batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None, retry_interval: Optional[float] = None,
+                 spill_path: Optional[str] = None, write_rate: Optional[float] = None,
+                 store: Optional[SharedStore] = None):
+        self._service_factory = service_factory
+        self._service = None
+        self.batch_size = batch_size or settings.SHEET_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else settings.SHEET_FLUSH_INTERVAL
+        self.retry_interval = retry_interval if retry_interval is not None else settings.SHEET_RETRY_INTERVAL
+        self.spill_path = spill_path or settings.SHEET_SPILL_PATH
+        write_rate = settings.SHEET_WRITE_RATE if write_rate is None else write_rate
+        # 예산이 없으면(0) 바로 기록, 버스트 1회 (분당 할당량을 넘지 않도록 호출 간격을 고르게 유지)
+        self._write_budget = make_bucket(
+            store if store is not None else get_shared_store(), "sheet_write", write_rate, 1
+        ) if write_rate > 0 else None
+        self._queue: "queue.Queue[Optional[Tuple[str, List[Any], Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._next_retry = 0.0
+        self.rows_written = 0
+        self.flushes = 0
+        self.rows_spilled = 0
+        self.write_wait = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def service(self):
+        if self._service is None:
+            self._service = self._service_factory()
+        return self._service
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sheet-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """남은 버퍼를 기록하고 작성기 스레드 종료"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def submit(self, sheet_name: str, row: List[Any]) -> Future:
+        """행을 버퍼에 넣고 즉시 반환, 반환된 Future는 실제 기록(또는 스필) 후 상태 dict로 완료됨"""
+        self.start()
+        future: Future = Future()
+        self._queue.put((sheet_name, row, future))
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "rows_written": self.rows_written,
+            "flushes": self.flushes,
+            "rows_spilled": self.rows_spilled,
+            "write_wait": round(self.write_wait, 3),
+            "spill_pending": self._spill_pending(),
+            "last_error": self.last_error
+        }
+
+    def _run(self):
+        buffer: List[Tuple[str, List[Any], Future]] = []
+        oldest = 0.0
+        running = True
+        while running:
+            # 기동 직후에도 이전 실행이 남긴 스필 행을 먼저 재시도 (submit 없이 start만 해도 비워짐)
+            if self._spill_pending() and time.monotonic() >= self._next_retry:
+                self._retry_spill()
+            timeout = self.flush_interval - (time.monotonic() - oldest) if buffer else self.retry_interval
+            try:
+                entry = self._queue.get(timeout=max(timeout, 0.01))
+                if entry is None:
+                    running = False
+                else:
+                    if not buffer:
+                        oldest = time.monotonic()
+                    buffer.append(entry)
+            except queue.Empty:
+                pass
+
+            if buffer and (not running or len(buffer) >= self.batch_size
+                           or time.monotonic() - oldest >= self.flush_interval):
+                self._flush(buffer)
+                buffer = []
+
+    def _append_rows(self, sheet_name: str, rows: List[List[Any]]):
+        """호출 예산 토큰을 예약하고 차례가 올 때까지 기다린 뒤 기록 (작성기 스레드에서만 호출)"""
+        if self._write_budget is not None:
+            wait = self._write_budget.reserve(float("inf"))
+            if wait > 0:
+                self.write_wait += wait
+                time.sleep(wait)
+        self.service.append_rows(sheet_name, rows)
+
+    @contextmanager
+    def _spill_locked(self):
+        """스필 파일 잠금 (스레드 잠금 + 같은 경로를 쓰는 다른 워커 프로세스와의 파일 잠금)"""
+        with self._spill_lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.spill_path)), exist_ok=True)
+            if fcntl is None:
+                yield
+                return
+            with open(f"{self.spill_path}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _group(entries):
+        grouped: Dict[str, list] = {}
+        for entry in entries:
+            grouped.setdefault(entry[0], []).append(entry)
+        return grouped
+
+    def _flush(self, buffer: List[Tuple[str, List[Any], Future]]):
+        # 이전 실패분이 남아 있으면 순서를 지키기 위해 새 행도 스필 파일 뒤에 붙임
+        if self._spill_pending():
+            self._spill(buffer, "Pending retry of earlier rows")
+            return
+
+        # 시트별로 한 번씩 append_rows 호출, 실패한 시트의 행만 스필
+        for sheet_name, entries in self._group(buffer).items():
+            try:
+                with span("sheet_write"):
+                    self._append_rows(sheet_name, [row for _, row, _ in entries])
+            except Exception as e:
+                self._spill(entries, str(e))
+                continue
+            self.rows_written += len(entries)
+            self.flushes += 1
+            for _, _, future in entries:
+                future.set_result({"saved": True, "sheet_name": sheet_name, "message": "Row appended"})
+
+    def _spill(self, buffer: List[Tuple[str, List[Any], Future]], error: str):
+        self.last_error = error
+        logger.warning("sheet write failed, rows spilled", extra={"rows": len(buffer), "error": error})
+        with self._spill_locked():
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for sheet_name, row, _ in buffer:
+                    f.write(json.dumps({"sheet_name": sheet_name, "row": row}, ensure_ascii=False) + "\n")
+        self.rows_spilled += len(buffer)
+        if self._next_retry <= time.monotonic():
+            self._next_retry = time.monotonic() + self.retry_interval
+        for sheet_name, _, future in buffer:
+            future.set_result({
+                "saved": False,
+                "queued": True,
+                "sheet_name": sheet_name,
+                "message": "Sheet write deferred; row kept in local spill file for retry",
+                "error": error
+            })
+
+    def _spill_pending(self) -> bool:
+        return os.path.exists(self.spill_path) and os.path.getsize(self.spill_path) > 0
+
+    def _retry_spill(self):
+        """스필 파일의 행을 시트별로 다시 기록, 실패한 시트의 행만 파일에 남김"""
+        with self._spill_locked():
+            # 잠금을 기다리는 동안 다른 워커가 이미 비웠을 수 있음
+            if not self._spill_pending():
+                return
+            with open(self.spill_path, "r", encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+            remaining = []
+            written = 0
+            for sheet_name, group in self._group([(e["sheet_name"], e["row"]) for e in entries]).items():
+                try:
+                    self._append_rows(sheet_name, [row for _, row in group])
+                except Exception as e:
+                    self.last_error = str(e)
+                    remaining.extend(group)
+                    continue
+                written += len(group)
+                self.flushes += 1
+
+            if remaining:
+                tmp_path = f"{self.spill_path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for sheet_name, row in remaining:
+                        f.write(json.dumps({"sheet_name": sheet_name, "row": row}, ensure_ascii=False) + "\n")
+                os.replace(tmp_path, self.spill_path)
+                self._next_retry = time.monotonic() + self.retry_interval
+            else:
+                os.remove(self.spill_path)
+        self.rows_written += written
+        if written:
+            logger.info("spilled rows rewritten", extra={"rows": written})
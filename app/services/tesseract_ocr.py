@@ -0,0 +1,113 @@
+import asyncio
+import io
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Union
+
+from app.core.config import settings
+from app.services.cache import OCRResultCache, result_cache
+from app.services.layout import WordBoxes
+from app.utils.lazy import Lazy
+from app.utils.payload import ImagePayload
+
+WORD_KEYS = ("text", "conf", "left", "top", "width", "height", "block_num", "par_num", "line_num")
+
+
+def _check_tesseract() -> str:
+    """pytesseract와 tesseract 실행 파일이 있는지 확인하고 버전 반환"""
+    import pytesseract
+
+    return str(pytesseract.get_tesseract_version())
+
+
+def _run_tesseract(data: bytes, lang: str, config: str) -> Dict[str, List[Any]]:
+    """(프로세스 풀에서 실행) 단어별 텍스트와 위치만 추려 반환 (프로세스 간 전송량 최소화)"""
+    import pytesseract
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        output = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+    return {key: output[key] for key in WORD_KEYS}
+
+
+def _full_text(data: Dict[str, List[Any]]) -> str:
+    """Tesseract가 나눈 (블록, 문단, 줄) 단위로 단어를 이어 줄바꿈으로 구분된 전체 텍스트 생성"""
+    lines: Dict[tuple, List[str]] = {}
+    for i, text in enumerate(data["text"]):
+        if text and text.strip():
+            key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            lines.setdefault(key, []).append(text.strip())
+    return "\n".join(" ".join(words) for words in lines.values())
+
+
+def _confidence(data: Dict[str, List[Any]]) -> Optional[float]:
+    """단어별 신뢰도(0~100, 비단어는 -1) 평균을 0~1로 변환"""
+    values = [float(conf) for text, conf in zip(data["text"], data["conf"]) if text and text.strip() and float(conf) >= 0]
+    return round(sum(values) / len(values) / 100, 4) if values else None
+
+
+class TesseractOCRService:
+    """Tesseract 로컬 OCR (네트워크/비용 없음, CPU 작업은 프로세스 풀에서 실행)"""
+
+    def __init__(self, lang: Optional[str] = None, config: Optional[str] = None,
+                 workers: Optional[int] = None, executor: Optional[Executor] = None,
+                 cache: Optional[OCRResultCache] = None):
+        self.lang = lang or settings.TESSERACT_LANG
+        self.config = settings.TESSERACT_CONFIG if config is None else config
+        self.cache = cache or result_cache
+        self._engine = Lazy("tesseract", _check_tesseract)
+        self._pool = Lazy("tesseract_pool", lambda: executor or ProcessPoolExecutor(
+            max_workers=workers or settings.TESSERACT_WORKERS
+        ))
+
+    @property
+    def ready(self) -> bool:
+        return self._engine.ready
+
+    def warm_up(self):
+        """엔진 확인 후 프로세스 풀 생성"""
+        self._engine.get()
+        self._pool.get()
+
+    def status(self) -> Dict[str, Any]:
+        return {**self._engine.status(), "version": self._engine.get() if self._engine.ready else None}
+
+    def shutdown(self):
+        if self._pool.ready:
+            self._pool.get().shutdown(wait=False, cancel_futures=True)
+
+    async def extract_text(self, image_content: Union[ImagePayload, bytes]) -> Dict[str, Any]:
+        payload = ImagePayload.wrap(image_content)
+        return await self.cache.get_or_fetch("tesseract", payload, self._extract_text)
+
+    async def _extract_text(self, payload: ImagePayload) -> Dict[str, Any]:
+        start_time = time.monotonic()
+
+        try:
+            loop = asyncio.get_running_loop()
+            await asyncio.to_thread(self._engine.get)
+            data = await loop.run_in_executor(
+                self._pool.get(), _run_tesseract, payload.tobytes(), self.lang, self.config
+            )
+            process_time = round((time.monotonic() - start_time) * 1000, 2)
+
+            return {
+                "provider": "tesseract",
+                "success": True,
+                "full_text": _full_text(data),
+                "process_time": process_time,
+                "error": None,
+                "confidence": _confidence(data),
+                "words": WordBoxes.from_tesseract(data).to_dict()
+            }
+
+        except Exception as e:
+            process_time = round((time.monotonic() - start_time) * 1000, 2)
+
+            return {
+                "provider": "tesseract",
+                "success": False,
+                "full_text": "",
+                "process_time": process_time,
+                "error": str(e)
+            }
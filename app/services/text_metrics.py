@@ -0,0 +1,130 @@
+import re
+import unicodedata
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+try:
+    # C++ 구현(rapidfuzz)이 있으면 사용하고, 없으면 아래 순수 파이썬 비트 병렬 구현으로 계산
+    from rapidfuzz.distance import Levenshtein as _rapidfuzz_levenshtein
+except ImportError:
+    _rapidfuzz_levenshtein = None
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """유니코드 정규화(NFC, 한글 자모 조합 통일)와 공백 정리"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+def tokenize(text: str) -> List[str]:
+    return normalize_text(text).split()
+
+
+def _myers_distance(pattern: Sequence[Hashable], text: Sequence[Hashable],
+                    max_distance: Optional[int]) -> int:
+    """
+    Myers/Hyyrö 비트 병렬 편집 거리. pattern 길이만큼의 비트를 파이썬 정수 하나로 표현해
+    text 한 글자마다 상수 개의 정수 연산으로 DP 열 전체를 갱신한다.
+    """
+    m = len(pattern)
+    peq: Dict[Hashable, int] = {}
+    for i, symbol in enumerate(pattern):
+        peq[symbol] = peq.get(symbol, 0) | (1 << i)
+
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    vp = mask
+    vn = 0
+    score = m
+    remaining = len(text)
+    for symbol in text:
+        eq = peq.get(symbol, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        hp = vn | ~(xh | vp)
+        hn = vp & xh
+        if hp & high:
+            score += 1
+        elif hn & high:
+            score -= 1
+        hp = (hp << 1) | 1
+        hn <<= 1
+        vp = (hn | ~(xv | hp)) & mask
+        vn = hp & xv
+        remaining -= 1
+        # 남은 글자로 줄일 수 있는 최대치보다 점수가 크면 조기 종료 (밴드 제한)
+        if max_distance is not None and score - remaining > max_distance:
+            return max_distance + 1
+    return score
+
+
+def levenshtein(a: Sequence[Hashable], b: Sequence[Hashable], max_distance: Optional[int] = None) -> int:
+    """
+    두 시퀀스(문자열 또는 단어 목록)의 편집 거리.
+    max_distance를 주면 그 값을 넘는 순간 max_distance + 1을 반환한다.
+    """
+    if _rapidfuzz_levenshtein is not None:
+        return _rapidfuzz_levenshtein.distance(a, b, score_cutoff=max_distance)
+    return levenshtein_python(a, b, max_distance)
+
+
+def levenshtein_python(a: Sequence[Hashable], b: Sequence[Hashable], max_distance: Optional[int] = None) -> int:
+    """levenshtein의 순수 파이썬 구현 (rapidfuzz가 없을 때 사용)"""
+    # 공통 접두/접미사는 거리에 영향이 없으므로 제거
+    start = 0
+    end_a, end_b = len(a), len(b)
+    while start < end_a and start < end_b and a[start] == b[start]:
+        start += 1
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+
+    if len(a) > len(b):
+        a, b = b, a
+    if max_distance is not None and len(b) - len(a) > max_distance:
+        return max_distance + 1
+    if not a:
+        return len(b)
+    return _myers_distance(a, b, max_distance)
+
+
+def error_rate(reference: Sequence[Hashable], hypothesis: Sequence[Hashable]) -> float:
+    """기준 길이로 정규화한 편집 거리 (CER/WER 공통)"""
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+    return levenshtein(reference, hypothesis) / len(reference)
+
+
+def cer(reference: str, hypothesis: str) -> float:
+    """Character Error Rate"""
+    return error_rate(normalize_text(reference), normalize_text(hypothesis))
+
+
+def wer(reference: str, hypothesis: str) -> float:
+    """Word Error Rate"""
+    return error_rate(tokenize(reference), tokenize(hypothesis))
+
+
+def similarity(a: Sequence[Hashable], b: Sequence[Hashable]) -> float:
+    """정렬(편집 거리) 기반 유사도 0~1"""
+    longest = max(len(a), len(b))
+    if not longest:
+        return 1.0
+    return 1 - levenshtein(a, b) / longest
+
+
+def compare_texts(reference: str, hypothesis: str) -> Dict[str, Any]:
+    """문자/단어 단위 편집 거리, CER, WER, 유사도를 한 번에 계산"""
+    ref_chars, hyp_chars = normalize_text(reference), normalize_text(hypothesis)
+    ref_words, hyp_words = ref_chars.split(), hyp_chars.split()
+    char_distance = levenshtein(ref_chars, hyp_chars)
+    word_distance = levenshtein(ref_words, hyp_words)
+    return {
+        "char_edit_distance": char_distance,
+        "word_edit_distance": word_distance,
+        "cer": round(char_distance / len(ref_chars), 4) if ref_chars else float(bool(hyp_chars)),
+        "wer": round(word_distance / len(ref_words), 4) if ref_words else float(bool(hyp_words)),
+        "char_similarity": round(1 - char_distance / max(len(ref_chars), len(hyp_chars), 1), 4),
+        "word_similarity": round(1 - word_distance / max(len(ref_words), len(hyp_words), 1), 4),
+    }
@@ -0,0 +1,38 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    """처음 사용할 때 한 번만 생성되는 스레드 안전 지연 초기화 래퍼 (실패 시 다음 호출에서 재시도)"""
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self.name = name
+        self._factory = factory
+        self._value: Optional[T] = None
+        self._lock = threading.Lock()
+        self.error: Optional[str] = None
+        self.init_time: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._value is not None
+
+    def get(self) -> T:
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    start_time = time.monotonic()
+                    try:
+                        self._value = self._factory()
+                    except Exception as e:
+                        self.error = str(e)
+                        raise
+                    self.error = None
+                    self.init_time = round((time.monotonic() - start_time) * 1000, 2)
+        return self._value
+
+    def status(self) -> Dict[str, Any]:
+        return {"ready": self.ready, "init_time": self.init_time, "error": self.error}
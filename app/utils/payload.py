@@ -0,0 +1,108 @@
+import base64
+import hashlib
+import mmap
+from typing import Iterator, Optional, Union
+
+# base64는 3바이트 단위로 인코딩되므로 청크 크기는 3의 배수로 유지
+BASE64_CHUNK_SIZE = 3 * 16 * 1024
+
+# 파일 시그니처(매직 바이트)로 실제 형식 판별
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+    (b"%PDF", "pdf"),
+)
+
+
+def detect_image_format(header: bytes) -> Optional[str]:
+    """앞부분 바이트로 이미지 형식 판별 (알 수 없으면 None)"""
+    for signature, image_format in _SIGNATURES:
+        if header.startswith(signature):
+            return image_format
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+class ImagePayload:
+    """
+    업로드 이미지 한 건을 한 번만 읽어 모든 제공자가 공유하는 버퍼.
+    디스크로 스풀된 큰 업로드는 mmap으로 참조해 힙 복사본을 만들지 않고,
+    해시와 base64 인코딩도 이 객체에서 한 번(또는 스트리밍)으로 처리한다.
+    """
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview, mmap.mmap],
+                 filename: Optional[str] = None, content_type: Optional[str] = None):
+        self._buffer = data
+        self.filename = filename
+        self.content_type = content_type
+        self._digest: Optional[str] = None
+
+    @classmethod
+    def wrap(cls, image: Union["ImagePayload", bytes]) -> "ImagePayload":
+        return image if isinstance(image, cls) else cls(image)
+
+    @classmethod
+    async def from_upload(cls, file) -> "ImagePayload":
+        """UploadFile에서 생성, 이미 디스크로 넘어간 업로드는 mmap으로 매핑"""
+        spooled = file.file
+        if getattr(spooled, "_rolled", False):
+            spooled.flush()
+            buffer = mmap.mmap(spooled.fileno(), 0, access=mmap.ACCESS_READ)
+            return cls(buffer, filename=file.filename, content_type=file.content_type)
+        await file.seek(0)
+        return cls(await file.read(), filename=file.filename, content_type=file.content_type)
+
+    @property
+    def view(self) -> memoryview:
+        return memoryview(self._buffer)
+
+    @property
+    def size(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def digest(self) -> str:
+        """캐시 키 등에 쓰이는 SHA-256 (한 번만 계산)"""
+        if self._digest is None:
+            self._digest = hashlib.sha256(self._buffer).hexdigest()
+        return self._digest
+
+    @property
+    def format(self) -> Optional[str]:
+        """업로드 파일 이름/Content-Type과 무관하게 실제 내용으로 판별한 형식"""
+        with memoryview(self._buffer) as view:
+            return detect_image_format(view[:16].tobytes())
+
+    @property
+    def base64_size(self) -> int:
+        return 4 * ((self.size + 2) // 3)
+
+    def tobytes(self) -> bytes:
+        """bytes가 필요한 클라이언트용 (이미 bytes면 복사하지 않음)"""
+        if isinstance(self._buffer, bytes):
+            return self._buffer
+        with memoryview(self._buffer) as view:
+            return view.tobytes()
+
+    def base64_chunks(self, chunk_size: int = BASE64_CHUNK_SIZE) -> Iterator[bytes]:
+        """전체 base64 문자열을 만들지 않고 청크 단위로 인코딩"""
+        with memoryview(self._buffer) as view:
+            for offset in range(0, len(view), chunk_size):
+                yield base64.b64encode(view[offset:offset + chunk_size])
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            try:
+                self._buffer.close()
+            except BufferError:
+                # 취소된 요청이 아직 뷰를 잡고 있으면 GC 시점에 해제되도록 둠
+                pass
+
+    def __len__(self) -> int:
+        return self.size
@@ -0,0 +1,305 @@
+"""
+부하 테스트 / 처리량 벤치마크
+
+    python -m benchmarks.load [--scenarios compare,google_vision,naver_clova,compare_sheet,compare_stream]
+                              [--requests 200] [--concurrency 16] [--latency-ms 50] [--error-rate 0]
+
+실제 API 대신 인프로세스 스텁(benchmarks/stubs.py)에 연결한 앱에 ASGI로 요청을 보내
+시나리오별 처리량(req/s), p50/p95/p99 지연, 최대 RSS를 측정한다.
+시나리오마다 새 프로세스에서 실행해 메모리 측정이 서로 섞이지 않게 한다.
+- compare: POST /api/compare
+- google_vision / naver_clova: 단일 제공자 엔드포인트
+- compare_sheet: save_to_sheet=true로 비교 후 시트 일괄 작성기까지 (종료 시 버퍼 비우는 시간 포함)
+- compare_stream: POST /api/compare/stream (NDJSON 전체를 받을 때까지, ASGI 전송은 본문을 모아 돌려주므로 첫 줄 지연은 측정하지 않음)
+
+결과는 커밋 해시와 함께 benchmarks/results/load.jsonl에 한 줄씩 추가되고,
+같은 설정의 이전 커밋 결과와 비교한 변화율을 함께 출력한다.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.stubs import SheetsStub, StubProfile, stub_services
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(ROOT, "benchmarks", "results", "load.jsonl")
+
+SCENARIOS = {
+    "compare": ("/api/compare", {}),
+    "google_vision": ("/api/google-vision", {}),
+    "naver_clova": ("/api/naver-clova", {}),
+    "compare_sheet": ("/api/compare", {"save_to_sheet": "true", "sheet_name": "Load Test"}),
+    "compare_stream": ("/api/compare/stream", {}),
+}
+
+DEFAULT_CONFIG = {
+    "requests": 200,
+    "concurrency": 16,
+    "latency_ms": 50.0,
+    "jitter_ms": 10.0,
+    "error_rate": 0.0,
+    "words": 60,
+    "image_kb": 256,
+    "sheet_latency_ms": 300.0,
+    "clova_batch": False,
+    "vision_batch": False,
+    "seed": 0,
+}
+
+
+def _percentile(values: List[float], percentile: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[int(round(percentile / 100 * (len(ordered) - 1)))]
+
+
+def _peak_rss_mb() -> float:
+    # Linux에서 ru_maxrss는 KB 단위
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_image(size_kb: int, seed: int = 0) -> bytes:
+    """대략 size_kb 크기의 PNG (무작위 픽셀이라 압축이 거의 되지 않음)"""
+    from PIL import Image
+
+    side = max(8, int((size_kb * 1024 / 3) ** 0.5))
+    pixels = random.Random(seed).randbytes(side * side * 3)
+    buffer = io.BytesIO()
+    Image.frombytes("RGB", (side, side), pixels).save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+@contextmanager
+def stubbed_app(config: Dict[str, Any], spill_dir: str):
+    """앱의 제공자 레지스트리, 결과 저장소, 시트 작성기를 스텁/임시 파일로 교체 (종료 시 원래대로 복구)"""
+    import app.main as main
+    from app.api import ocr as ocr_api
+    from app.services.providers import ProviderRegistry
+    from app.services.results import ResultStore
+    from app.services.sheet_writer import SheetWriter
+    from app.utils.lazy import Lazy
+
+    provider_profile = StubProfile(config["latency_ms"], config["jitter_ms"], config["error_rate"], config["words"])
+    sheet_profile = StubProfile(config["sheet_latency_ms"], config["sheet_latency_ms"] / 5, 0.0)
+    registry = ProviderRegistry(["google_vision", "naver_clova"],
+                                stub_services(provider_profile, provider_profile, config["seed"],
+                                              clova_batching=config["clova_batch"],
+                                              vision_batching=config["vision_batch"]))
+    sheets = SheetsStub(sheet_profile, config["seed"])
+    writer = SheetWriter(lambda: sheets, spill_path=os.path.join(spill_dir, "spill.jsonl"))
+
+    # 결과 저장소 기록도 요청 경로에 포함되므로 임시 DB로 유지
+    results = Lazy("result_store", lambda: ResultStore(os.path.join(spill_dir, "results.sqlite3")))
+
+    original = (main.comparator.registry, main.comparator.results, ocr_api.provider_router.registry, ocr_api.sheet_writer)
+    main.comparator.registry = ocr_api.provider_router.registry = registry
+    main.comparator.results = results if main.comparator.results is not None else None
+    ocr_api.sheet_writer = writer
+    try:
+        yield main.app, registry, writer, sheets
+    finally:
+        (main.comparator.registry, main.comparator.results,
+         ocr_api.provider_router.registry, ocr_api.sheet_writer) = original
+
+
+def _provider_results(response: httpx.Response) -> List[Dict[str, Any]]:
+    """응답 본문의 제공자별 결과 (NDJSON 스트림은 {"provider", "result"} 줄에서 모음)"""
+    if response.headers.get("content-type", "").startswith("application/x-ndjson"):
+        lines = [json.loads(line) for line in response.text.splitlines() if line]
+        return [line["result"] for line in lines if "provider" in line]
+    body = response.json()
+    return [body.get(name, {}) for name in body.get("providers", [])] if "providers" in body else [body]
+
+
+async def _drive(client: httpx.AsyncClient, path: str, form: Dict[str, str], image: bytes,
+                 total: int, concurrency: int):
+    """concurrency개 워커가 total개 요청을 나눠 보내고 요청별 (지연 초, 상태 코드, 제공자 실패 수) 수집"""
+    samples = []
+    remaining = iter(range(total))
+
+    async def worker():
+        for i in remaining:
+            files = {"file": (f"load_{i}.png", image, "image/png")}
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, files=files, data=form)
+                status = response.status_code
+            except httpx.HTTPError:
+                response, status = None, 0
+            elapsed = time.perf_counter() - start
+            failures = 0
+            if response is not None and status == 200:
+                results = _provider_results(response)
+                failures = sum(not result.get("success") for result in results)
+            samples.append((elapsed, status, failures))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+async def run_scenario(scenario: str, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """시나리오 하나를 현재 프로세스에서 실행하고 측정값 반환"""
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    path, form = SCENARIOS[scenario]
+    image = make_image(config["image_kb"], config["seed"])
+
+    with tempfile.TemporaryDirectory() as spill_dir, stubbed_app(config, spill_dir) as (app, registry, writer, sheets):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            # 워밍업 한 번 (클라이언트 생성/지연 import 비용을 측정에서 제외)
+            await _drive(client, path, {}, image, 1, 1)
+            rss_before = _peak_rss_mb()
+            start = time.perf_counter()
+            samples = await _drive(client, path, form, image, config["requests"], config["concurrency"])
+            duration = time.perf_counter() - start
+
+            drain = None
+            if form.get("save_to_sheet"):
+                # 응답 후 남은 시트 버퍼를 모두 기록하는 데 걸린 시간
+                drain_start = time.perf_counter()
+                await asyncio.to_thread(writer.stop, 60.0)
+                drain = round(time.perf_counter() - drain_start, 3)
+        await registry.aclose()
+
+    latencies = [elapsed * 1000 for elapsed, _, _ in samples]
+    statuses: Dict[str, int] = {}
+    for _, status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    report = {
+        "scenario": scenario,
+        "requests": len(samples),
+        "concurrency": config["concurrency"],
+        "duration_s": round(duration, 3),
+        "rps": round(len(samples) / duration, 2) if duration else None,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else None,
+            "p50": round(_percentile(latencies, 50), 2) if latencies else None,
+            "p95": round(_percentile(latencies, 95), 2) if latencies else None,
+            "p99": round(_percentile(latencies, 99), 2) if latencies else None,
+            "max": round(max(latencies), 2) if latencies else None,
+        },
+        "status": statuses,
+        "provider_failures": sum(failures for _, _, failures in samples),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "rss_growth_mb": round(_peak_rss_mb() - rss_before, 1),
+    }
+    for name, key in (("naver_clova", "clova_batching"), ("google_vision", "vision_batching")):
+        status = registry.get(name).status()
+        if "batching" in status:
+            report[key] = status["batching"]
+    if drain is not None:
+        report["sheet"] = {"drain_s": drain, "rows_written": sheets.rows, "append_calls": sheets.calls,
+                           "rows_spilled": writer.rows_spilled}
+    return report
+
+
+def run_child(scenario: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """새 프로세스에서 시나리오 실행 (결과는 임시 파일로 전달, stdout은 앱 로그가 사용)"""
+    env = {**os.environ, "WARMUP_ON_STARTUP": "false", "LOG_LEVEL": os.getenv("LOG_LEVEL", "ERROR")}
+    with tempfile.NamedTemporaryFile("r", suffix=".json") as output:
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.load", "--child", scenario,
+             "--child-config", json.dumps(config), "--child-output", output.name],
+            cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL
+        )
+        return json.load(output)
+
+
+def _git_commit() -> Dict[str, Any]:
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+
+    return {"commit": git("rev-parse", "--short", "HEAD") or None,
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def _previous(path: str, scenario: str, config: Dict[str, Any], commit: Optional[str]) -> Optional[Dict[str, Any]]:
+    """같은 시나리오/설정으로 다른 커밋에서 측정한 가장 최근 결과"""
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry["scenario"] == scenario and entry["config"] == config and entry["commit"] != commit:
+                previous = entry
+    return previous
+
+
+def _change(current: Optional[float], previous: Optional[float]) -> Optional[str]:
+    if not current or not previous:
+        return None
+    return f"{(current - previous) / previous * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API against local provider stubs")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=DEFAULT_CONFIG["requests"])
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONFIG["concurrency"])
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_CONFIG["latency_ms"])
+    parser.add_argument("--jitter-ms", type=float, default=DEFAULT_CONFIG["jitter_ms"])
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_CONFIG["error_rate"])
+    parser.add_argument("--words", type=int, default=DEFAULT_CONFIG["words"], help="words per stub OCR response")
+    parser.add_argument("--image-kb", type=int, default=DEFAULT_CONFIG["image_kb"])
+    parser.add_argument("--sheet-latency-ms", type=float, default=DEFAULT_CONFIG["sheet_latency_ms"])
+    parser.add_argument("--clova-batch", action="store_true", help="pack concurrent Clova images into one request")
+    parser.add_argument("--vision-batch", action="store_true", help="pack concurrent Vision images into one batch_annotate_images call")
+    parser.add_argument("--seed", type=int, default=DEFAULT_CONFIG["seed"])
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSONL file results are appended to")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--child-config", help=argparse.SUPPRESS)
+    parser.add_argument("--child-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        report = asyncio.run(run_scenario(args.child, json.loads(args.child_config)))
+        with open(args.child_output, "w", encoding="utf-8") as f:
+            json.dump(report, f)
+        return
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)} (available: {', '.join(SCENARIOS)})")
+    config = {key: getattr(args, key) for key in DEFAULT_CONFIG}
+    revision = _git_commit()
+
+    reports = []
+    for scenario in scenarios:
+        report = run_child(scenario, config)
+        previous = _previous(args.output, scenario, config, revision["commit"])
+        if previous is not None:
+            report["vs_previous"] = {
+                "commit": previous["commit"],
+                "rps": _change(report["rps"], previous["result"]["rps"]),
+                "p95": _change(report["latency_ms"]["p95"], previous["result"]["latency_ms"]["p95"]),
+                "peak_rss_mb": _change(report["peak_rss_mb"], previous["result"]["peak_rss_mb"]),
+            }
+        reports.append(report)
+        if not args.no_save:
+            os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+            with open(args.output, "a", encoding="utf-8") as f:
+                entry = {"timestamp": int(time.time()), **revision, "scenario": scenario, "config": config,
+                         "result": {key: value for key, value in report.items() if key != "vs_previous"}}
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    print(json.dumps({**revision, "config": config, "scenarios": reports}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+요청당 최대 메모리 측정 스크립트
+
+    python benchmarks/memory.py [--size-mb 10]
+
+업로드를 읽어 Clova 요청 본문을 만들기까지의 경로를 변형별로 새 프로세스에서 실행하고
+peak RSS 증가량과 tracemalloc 최대 할당량을 비교한다.
+- legacy: file.read() → base64 문자열 → json.dumps → encode (이전 구현)
+- streaming: ImagePayload(mmap) → base64 청크 스트리밍 (현재 구현)
+
+streaming의 RSS 증가분은 대부분 mmap으로 매핑된 임시 파일 페이지(파일 기반, 회수 가능)이다.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import asyncio, base64, json, os, resource, sys, tempfile, time, tracemalloc, uuid
+
+variant, size = sys.argv[1], int(sys.argv[2])
+
+# starlette UploadFile과 같은 1MB 스풀 임시 파일에 업로드 내용을 조금씩 기록
+spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+chunk = os.urandom(1024 * 1024)
+for _ in range(size // len(chunk)):
+    spooled.write(chunk)
+spooled.write(chunk[:size % len(chunk)])
+spooled.seek(0)
+del chunk
+
+from starlette.datastructures import UploadFile
+from app.services.clova_ocr import ClovaOCRService
+from app.utils.payload import ImagePayload
+
+upload = UploadFile(spooled, size=size, filename="receipt.png")
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+async def legacy():
+    image_content = await upload.read()
+    image_base64 = base64.b64encode(image_content).decode('utf-8')
+    request_json = {
+        'images': [{'format': 'png', 'name': 'sample_image', 'data': image_base64}],
+        'requestId': str(uuid.uuid4()), 'version': 'V2', 'timestamp': int(time.time() * 1000)
+    }
+    body = json.dumps(request_json).encode('utf-8')
+    return len(body)
+
+async def streaming():
+    payload = await ImagePayload.from_upload(upload)
+    body, length = ClovaOCRService._request_body(payload)
+    sent = 0
+    async for part in body():
+        sent += len(part)  # 네트워크로 보낸 것으로 간주하고 버림
+    payload.digest
+    payload.close()
+    return sent
+
+tracemalloc.start()
+sent = asyncio.run({"legacy": legacy, "streaming": streaming}[variant]())
+_, traced_peak = tracemalloc.get_traced_memory()
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"variant": variant, "body_bytes": sent,
+                  "rss_delta_mb": round((peak - baseline) / 1024, 2),
+                  "traced_peak_mb": round(traced_peak / 1024 / 1024, 2)}))
+"""
+
+
+def run(variant: str, size: int) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, variant, str(size)], cwd=ROOT,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-request peak memory")
+    parser.add_argument("--size-mb", type=float, default=10)
+    args = parser.parse_args()
+
+    size = int(args.size_mb * 1024 * 1024)
+    results = [run(variant, size) for variant in ("legacy", "streaming")]
+    print(json.dumps({"upload_mb": args.size_mb, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+콜드 스타트 측정 스크립트
+
+    python benchmarks/startup.py [--runs 5]
+
+새 프로세스에서 다음 구간을 각각 측정해 JSON으로 출력한다.
+- import: app.main 모듈 import 시간
+- client: 제공자 클라이언트/시트 서비스 생성 시간 (워밍업과 동일한 경로)
+- first_request: 첫 요청(GET /health/ready) 응답 시간
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, time
+start = time.perf_counter()
+import app.main as main
+imported = time.perf_counter()
+
+clients = {}
+targets = [(name, service.warm_up) for name, service in main.comparator.registry.items()]
+for name, warm in targets + [("google_sheets", main.sheets_service.get)]:
+    t = time.perf_counter()
+    try:
+        warm()
+        clients[name] = round((time.perf_counter() - t) * 1000, 2)
+    except Exception as e:
+        clients[name] = None
+
+from fastapi.testclient import TestClient
+client = TestClient(main.app)
+t = time.perf_counter()
+client.get("/health/ready")
+first_request = time.perf_counter() - t
+
+print(json.dumps({
+    "import": round((imported - start) * 1000, 2),
+    "client": clients,
+    "first_request": round(first_request * 1000, 2),
+}))
+"""
+
+
+def run_once() -> dict:
+    env = {**os.environ, "WARMUP_ON_STARTUP": "false"}
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start timings")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    summary = {
+        "runs": args.runs,
+        "import_ms": round(statistics.median(r["import"] for r in runs), 2),
+        "first_request_ms": round(statistics.median(r["first_request"] for r in runs), 2),
+        "client_ms": {
+            name: round(statistics.median(r["client"][name] for r in runs), 2)
+            if all(r["client"][name] is not None for r in runs) else None
+            for name in runs[0]["client"]
+        },
+    }
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
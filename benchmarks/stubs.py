@@ -0,0 +1,182 @@
+"""
+부하 테스트용 인프로세스 제공자 스텁
+
+실제 자격증명이나 네트워크 없이 Google Vision / Naver Clova / Google Sheets 호출을 흉내 낸다.
+지연 시간(기본값 + 지터), 오류율, 응답 크기(단어 수)를 조절할 수 있다.
+- Clova: httpx.ASGITransport로 연결하는 Starlette 앱 (실제 HTTP 요청 본문 스트리밍/JSON 파싱 경로 그대로 사용)
+- Vision: 동기 text_detection/batch_annotate_images를 흉내 내는 클라이언트 (직렬화된 응답을 매번 역직렬화해 gRPC 응답 처리 비용 재현)
+- Sheets: append_rows 지연만 흉내 내는 시트 서비스
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from app.services.cache import OCRResultCache
+from app.services.clova_ocr import ClovaOCRService
+from app.services.google_vision import GoogleVisionService
+
+SAMPLE_WORDS = ["아메리카노", "카페라떼", "합계", "부가세", "카드", "승인", "12,000", "4,500", "1", "2", "원", "TOTAL"]
+
+CLOVA_STUB_URL = "http://clova-stub/ocr"
+
+
+@dataclass
+class StubProfile:
+    """스텁 응답 특성 (지연은 ms, 오류율은 0~1)"""
+    latency_ms: float = 50.0
+    jitter_ms: float = 10.0
+    error_rate: float = 0.0
+    words: int = 60
+
+    def delay(self, rng: random.Random) -> float:
+        return max(0.0, self.latency_ms + rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+
+    def fails(self, rng: random.Random) -> bool:
+        return rng.random() < self.error_rate
+
+
+def make_words(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """한 줄에 6단어씩 배치한 단어 목록 (텍스트, 좌상단/우하단 좌표)"""
+    rng = random.Random(seed)
+    words = []
+    for i in range(count):
+        x, y = 20 + (i % 6) * 90, 20 + (i // 6) * 30
+        words.append({"text": rng.choice(SAMPLE_WORDS), "box": (x, y, x + 80, y + 24)})
+    return words
+
+
+def _vertices(box) -> List[Dict[str, int]]:
+    left, top, right, bottom = box
+    return [{"x": left, "y": top}, {"x": right, "y": top}, {"x": right, "y": bottom}, {"x": left, "y": bottom}]
+
+
+def clova_stub_app(profile: StubProfile, seed: int = 0) -> Starlette:
+    """Clova General OCR V2 응답 형식을 흉내 내는 ASGI 앱"""
+    rng = random.Random(seed)
+    fields = [
+        {"inferText": word["text"], "inferConfidence": 0.98, "boundingPoly": {"vertices": _vertices(word["box"])}}
+        for word in make_words(profile.words, seed)
+    ]
+    stats = {"requests": 0, "errors": 0, "bytes_received": 0}
+
+    async def ocr(request: Request):
+        body = await request.body()
+        stats["requests"] += 1
+        stats["bytes_received"] += len(body)
+        if not request.headers.get("X-OCR-SECRET"):
+            return JSONResponse({"code": "0011", "message": "Invalid secret"}, status_code=401)
+        meta = json.loads(body)
+        await asyncio.sleep(profile.delay(rng))
+        if profile.fails(rng):
+            stats["errors"] += 1
+            return Response("stub failure", status_code=503)
+        # 여러 이미지를 담은 요청에는 이미지마다 결과를 돌려줌
+        return JSONResponse({
+            "version": "V2",
+            "requestId": meta.get("requestId"),
+            "timestamp": int(time.time() * 1000),
+            "images": [
+                {"uid": f"stub-{index}", "name": image.get("name"), "inferResult": "SUCCESS", "fields": fields}
+                for index, image in enumerate(meta["images"])
+            ]
+        })
+
+    app = Starlette(routes=[Route("/ocr", ocr, methods=["POST"])])
+    app.state.stats = stats
+    return app
+
+
+class VisionStubClient:
+    """ImageAnnotatorClient.text_detection 대역 (스레드에서 호출되므로 time.sleep으로 블로킹 지연을 흉내 냄)"""
+
+    def __init__(self, profile: StubProfile, seed: int = 0):
+        from google.cloud import vision
+
+        self.profile = profile
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._response_type = vision.AnnotateImageResponse
+        self._batch_type = vision.BatchAnnotateImagesResponse
+        words = make_words(profile.words, seed)
+        annotations = [vision.EntityAnnotation(description=" ".join(word["text"] for word in words))]
+        annotations.extend(
+            vision.EntityAnnotation(
+                description=word["text"],
+                bounding_poly=vision.BoundingPoly(vertices=[vision.Vertex(**v) for v in _vertices(word["box"])])
+            )
+            for word in words
+        )
+        self._serialized = vision.AnnotateImageResponse.serialize(
+            vision.AnnotateImageResponse(text_annotations=annotations)
+        )
+        self.requests = 0
+        self.errors = 0
+
+    def _call(self):
+        with self._lock:
+            self.requests += 1
+            delay = self.profile.delay(self._rng)
+            fails = self.profile.fails(self._rng)
+        time.sleep(delay)
+        if fails:
+            with self._lock:
+                self.errors += 1
+            raise RuntimeError("503 stub failure")
+
+    def text_detection(self, image, timeout: Optional[float] = None):
+        self._call()
+        return self._response_type.deserialize(self._serialized)
+
+    def batch_annotate_images(self, requests, timeout: Optional[float] = None):
+        """요청당 지연은 이미지 수와 무관하게 한 번만 적용하고 이미지마다 응답을 돌려줌"""
+        self._call()
+        return self._batch_type(responses=[self._response_type.deserialize(self._serialized) for _ in requests])
+
+
+class SheetsStub:
+    """append_rows만 흉내 내는 시트 서비스"""
+
+    def __init__(self, profile: StubProfile, seed: int = 0):
+        self.profile = profile
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.rows = 0
+
+    def append_rows(self, sheet_name: str, rows: List[List[Any]]):
+        with self._lock:
+            delay = self.profile.delay(self._rng)
+            fails = self.profile.fails(self._rng)
+        time.sleep(delay)
+        if fails:
+            raise RuntimeError("429 stub quota exceeded")
+        with self._lock:
+            self.calls += 1
+            self.rows += len(rows)
+
+    def get_spreadsheet_url(self) -> str:
+        return "https://docs.google.com/spreadsheets/d/stub"
+
+
+def stub_services(vision: StubProfile, clova: StubProfile, seed: int = 0,
+                  clova_batching: bool = False, vision_batching: bool = False) -> Dict[str, Any]:
+    """스텁에 연결된 제공자 서비스 (매 요청이 스텁까지 가도록 결과 캐시는 끔)"""
+    cache = OCRResultCache(enabled=False)
+    return {
+        "google_vision": GoogleVisionService(cache=cache, client_factory=lambda: VisionStubClient(vision, seed),
+                                             batching=vision_batching),
+        "naver_clova": ClovaOCRService(
+            secret_key="stub-secret", api_url=CLOVA_STUB_URL,
+            transport=httpx.ASGITransport(app=clova_stub_app(clova, seed)), cache=cache, batching=clova_batching
+        )
+    }
@@ -0,0 +1,68 @@
+"""
+텍스트 지표 마이크로 벤치마크
+
+    python benchmarks/text_metrics.py
+
+영수증 크기 텍스트에 대해 편집 거리 구현(rapidfuzz, 순수 파이썬 비트 병렬, 단순 DP)을 비교한다.
+"""
+import json
+import random
+import timeit
+
+from app.services.text_metrics import compare_texts, levenshtein, levenshtein_python
+
+SAMPLE_WORDS = ["아메리카노", "카페라떼", "합계", "부가세", "카드", "승인", "12,000", "4,500", "1", "2", "원", "TOTAL"]
+
+
+def make_text(rng: random.Random, size: int) -> str:
+    words = []
+    while sum(len(w) + 1 for w in words) < size:
+        words.append(rng.choice(SAMPLE_WORDS))
+    return " ".join(words)[:size]
+
+
+def mutate(rng: random.Random, text: str, rate: float) -> str:
+    chars = list(text)
+    for i in range(len(chars)):
+        if rng.random() < rate:
+            chars[i] = rng.choice("0123456789가나다 ")
+    return "".join(chars)
+
+
+def naive_levenshtein(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y)))
+        previous = current
+    return previous[-1]
+
+
+def bench(func, number: int) -> float:
+    """1회 평균 실행 시간 (마이크로초)"""
+    return round(min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6, 1)
+
+
+def main():
+    rng = random.Random(42)
+    results = []
+    for size in (256, 1024, 4096):
+        reference = make_text(rng, size)
+        hypothesis = mutate(rng, reference, 0.05)
+        number = max(1, 20000 // size)
+        row = {
+            "chars": size,
+            "levenshtein_us": bench(lambda: levenshtein(reference, hypothesis), number),
+            "python_bit_parallel_us": bench(lambda: levenshtein_python(reference, hypothesis), number),
+            "python_banded_k50_us": bench(lambda: levenshtein_python(reference, hypothesis, max_distance=50), number),
+            "compare_texts_us": bench(lambda: compare_texts(reference, hypothesis), number),
+        }
+        if size <= 1024:
+            row["naive_dp_us"] = bench(lambda: naive_levenshtein(reference, hypothesis), 1)
+        results.append(row)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# gunicorn 설정 (컨테이너 CPU 수에 맞춘 uvicorn 워커 프로세스)
+# 실행: gunicorn app.main:app -c gunicorn.conf.py
+import math
+import os
+import socket
+import time
+
+
+def cpu_limit() -> int:
+    """컨테이너에 할당된 CPU 수 (cgroup v2/v1 할당량 → 스케줄러 친화도 → 전체 코어 순)"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0:
+            return max(1, math.ceil(quota / period))
+    except (OSError, ValueError):
+        pass
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+workers = int(os.getenv("WEB_CONCURRENCY") or cpu_limit())
+# 워커가 읽는 설정 (워커가 둘 이상이면 공유 상태 저장소를 기본으로 사용)
+os.environ["WEB_CONCURRENCY"] = str(workers)
+# 이번 기동의 워커끼리만 공유하는 식별자 (작업 재개 담당 리스 이름, 재시작하면 새 값)
+os.environ["SERVER_BOOT_ID"] = f"{socket.gethostname()}:{time.time():.6f}"
+
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+# 배치/문서 요청은 제공자 호출을 여러 번 하므로 넉넉하게
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+# 제공자 클라이언트, 공유 상태 연결, 프로세스 풀은 fork 이후 워커마다 생성
+preload_app = False
+accesslog = None
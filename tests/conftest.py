@@ -0,0 +1,9 @@
+import pytest
+from app.services import executor
+from app.services.resilience import CircuitBreakers
+
+
+@pytest.fixture(autouse=True)
+def isolated_breakers(monkeypatch):
+    """테스트마다 새 서킷 브레이커 상태 사용 (실패를 일부러 만드는 테스트끼리 영향이 없도록)"""
+    monkeypatch.setattr(executor, "circuit_breakers", CircuitBreakers())
@@ -0,0 +1,93 @@
+import time
+import pytest
+from app.services.cache import OCRResultCache, SQLiteCacheBackend, DirectoryCacheBackend
+
+
+def ocr_result(text="hello", success=True):
+    return {"provider": "google_vision", "success": success, "full_text": text,
+            "process_time": 10.0, "error": None}
+
+
+class TestOCRResultCache:
+    def test_lru_eviction_by_entry_count(self):
+        cache = OCRResultCache(max_entries=2)
+        cache.set("a", ocr_result("a"))
+        cache.set("b", ocr_result("b"))
+        cache.get("a")  # a를 최근 사용으로 갱신
+        cache.set("c", ocr_result("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a")["full_text"] == "a"
+        assert cache.evictions == 1
+
+    def test_eviction_by_size(self):
+        cache = OCRResultCache(max_bytes=300)
+        cache.set("a", ocr_result("x" * 150))
+        cache.set("b", ocr_result("y" * 150))
+
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+
+    def test_ttl_expiry(self):
+        cache = OCRResultCache(ttl=0.01)
+        cache.set("a", ocr_result())
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert cache.misses == 1
+
+    @pytest.mark.parametrize("backend_factory", [
+        lambda path: SQLiteCacheBackend(str(path / "cache.sqlite3")),
+        lambda path: DirectoryCacheBackend(str(path / "cache")),
+    ])
+    def test_disk_tier_survives_new_instance(self, tmp_path, backend_factory):
+        first = OCRResultCache(backend=backend_factory(tmp_path))
+        first.set("google_vision:abc", ocr_result("persisted"))
+
+        second = OCRResultCache(backend=backend_factory(tmp_path))
+        assert second.get("google_vision:abc")["full_text"] == "persisted"
+        assert second.disk_hits == 1
+
+    @pytest.mark.parametrize("backend_factory", [
+        lambda path: SQLiteCacheBackend(str(path / "cache.sqlite3")),
+        lambda path: DirectoryCacheBackend(str(path / "cache")),
+    ])
+    def test_disk_hit_keeps_stored_expiry(self, tmp_path, backend_factory):
+        OCRResultCache(ttl=0.1, backend=backend_factory(tmp_path)).set("google_vision:abc", ocr_result("old"))
+        # 새 인스턴스의 TTL이 길어도 메모리로 승격된 항목은 디스크의 만료 시각을 따름
+        second = OCRResultCache(ttl=60, backend=backend_factory(tmp_path))
+        assert second.get("google_vision:abc")["full_text"] == "old"
+        time.sleep(0.15)
+        assert second.get("google_vision:abc") is None
+
+
+@pytest.mark.asyncio
+class TestCacheGetOrFetch:
+    async def test_hit_skips_fetch(self):
+        cache = OCRResultCache()
+        calls = []
+
+        async def fetch(image_content):
+            calls.append(image_content)
+            return ocr_result()
+
+        first = await cache.get_or_fetch("google_vision", b"img", fetch)
+        second = await cache.get_or_fetch("google_vision", b"img", fetch)
+
+        assert len(calls) == 1
+        assert "cached" not in first
+        assert second["cached"] is True
+        assert cache.stats()["hits"] == 1
+
+    async def test_failures_are_not_cached(self):
+        cache = OCRResultCache()
+        calls = []
+
+        async def fetch(image_content):
+            calls.append(image_content)
+            return ocr_result(success=False)
+
+        await cache.get_or_fetch("naver_clova", b"img", fetch)
+        await cache.get_or_fetch("naver_clova", b"img", fetch)
+
+        assert len(calls) == 2
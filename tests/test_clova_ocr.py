@@ -0,0 +1,194 @@
+import asyncio
+import base64
+import json
+import os
+import httpx
+import pytest
+from app.services.cache import OCRResultCache
+from app.services.clova_ocr import ClovaBatcher, ClovaOCRService
+from app.utils.payload import ImagePayload
+
+
+def clova_response(texts):
+    return {"images": [{"fields": [{"inferText": text} for text in texts]}]}
+
+
+def make_service(handler, **overrides):
+    service = ClovaOCRService(
+        secret_key="test-secret",
+        api_url="http://clova.stub/ocr",
+        transport=httpx.MockTransport(handler),
+        cache=OCRResultCache(enabled=False)
+    )
+    service.backoff_base = 0.001
+    service.backoff_max = 0.01
+    for key, value in overrides.items():
+        setattr(service, key, value)
+    return service
+
+
+@pytest.mark.asyncio
+class TestClovaOCRService:
+    async def test_extract_text_success(self):
+        def handler(request):
+            assert request.headers["X-OCR-SECRET"] == "test-secret"
+            payload = json.loads(request.content)
+            assert payload["images"][0]["data"]
+            return httpx.Response(200, json=clova_response(["합계", "12,000"]))
+
+        service = make_service(handler)
+        result = await service.extract_text(b"image-bytes")
+        await service.aclose()
+
+        assert result["success"] is True
+        assert result["full_text"] == "합계 12,000"
+
+    async def test_streamed_request_body_is_valid_json(self):
+        image = os.urandom(200_000)  # base64 청크 여러 개에 걸치는 크기
+        seen = {}
+
+        def handler(request):
+            seen["length"] = int(request.headers["Content-Length"])
+            seen["body"] = request.content
+            return httpx.Response(200, json=clova_response(["ok"]))
+
+        service = make_service(handler)
+        await service.extract_text(image)
+        await service.aclose()
+
+        payload = json.loads(seen["body"])
+        assert seen["length"] == len(seen["body"])
+        assert payload["version"] == "V2"
+        assert payload["requestId"]
+        assert payload["images"][0]["name"] == "sample_image"
+        assert base64.b64decode(payload["images"][0]["data"]) == image
+
+    async def test_retries_on_429_and_5xx(self):
+        statuses = iter([429, 503, 200])
+
+        def handler(request):
+            status = next(statuses)
+            if status == 200:
+                return httpx.Response(200, json=clova_response(["ok"]))
+            return httpx.Response(status, text="busy")
+
+        service = make_service(handler)
+        result = await service.extract_text(b"image-bytes")
+        await service.aclose()
+
+        assert result["success"] is True
+
+    async def test_gives_up_after_max_retries(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(500, text="down")
+
+        service = make_service(handler, max_retries=1)
+        result = await service.extract_text(b"image-bytes")
+        await service.aclose()
+
+        assert len(calls) == 2
+        assert result["success"] is False
+        assert "500" in result["error"]
+
+    async def test_client_error_is_not_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(401, text="unauthorized")
+
+        service = make_service(handler)
+        result = await service.extract_text(b"image-bytes")
+        await service.aclose()
+
+        assert len(calls) == 1
+        assert result["success"] is False
+
+    async def test_connect_errors_are_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) < 3:
+                raise httpx.ConnectError("connection refused", request=request)
+            return httpx.Response(200, json=clova_response(["ok"]))
+
+        service = make_service(handler)
+        result = await service.extract_text(b"image-bytes")
+        await service.aclose()
+
+        assert len(calls) == 3
+        assert result["success"] is True
+
+    @pytest.mark.parametrize("error", [httpx.ReadTimeout, httpx.RemoteProtocolError, httpx.WriteError])
+    async def test_errors_after_sending_are_not_retried(self, error):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise error("lost after send", request=request)
+
+        service = make_service(handler)
+        result = await service.extract_text(b"image-bytes")
+        await service.aclose()
+
+        # 요청이 이미 전달됐을 수 있으므로 다시 보내지 않음 (이미지당 과금 중복 방지)
+        assert len(calls) == 1
+        assert result["success"] is False
+
+    async def test_concurrent_images_share_one_request(self):
+        requests = []
+
+        def handler(request):
+            payload = json.loads(request.content)
+            requests.append(payload)
+            # 응답 순서를 뒤집어도 name으로 호출자별 결과를 찾아야 함
+            return httpx.Response(200, json={"images": [
+                {"name": image["name"], "fields": [{"inferText": base64.b64decode(image["data"]).decode()}]}
+                for image in reversed(payload["images"])
+            ]})
+
+        service = make_service(handler)
+        service.batcher = ClovaBatcher(service._send, max_images=8, linger=0.05, latency_budget=5)
+        results = await asyncio.gather(*(service.extract_text(f"image-{i}".encode()) for i in range(3)))
+        await service.aclose()
+
+        assert len(requests) == 1
+        assert [image["name"] for image in requests[0]["images"]] == ["image_0", "image_1", "image_2"]
+        assert [result["full_text"] for result in results] == ["image-0", "image-1", "image-2"]
+        assert all(result["batch_size"] == 3 for result in results)
+
+    async def test_batch_bounded_by_image_count_and_size(self):
+        sizes = []
+
+        def handler(request):
+            payload = json.loads(request.content)
+            sizes.append(len(payload["images"]))
+            return httpx.Response(200, json={"images": [
+                {"name": image["name"], "fields": [{"inferText": "ok"}]} for image in payload["images"]
+            ]})
+
+        service = make_service(handler)
+        service.batcher = ClovaBatcher(service._send, max_images=2, linger=0.05, latency_budget=5)
+        await asyncio.gather(*(service.extract_text(f"image-{i}".encode()) for i in range(5)))
+        service.batcher = ClovaBatcher(service._send, max_images=8, max_bytes=40, linger=0.05, latency_budget=5)
+        await asyncio.gather(*(service.extract_text(os.urandom(20)) for _ in range(3)))
+        await service.aclose()
+
+        assert sizes[:3] == [2, 2, 1]
+        # base64 28바이트씩이라 40바이트 한도에서는 한 장씩 전송
+        assert sizes[3:] == [1, 1, 1]
+
+    async def test_batch_shrinks_when_over_latency_budget(self):
+        async def slow_send(payloads):
+            await asyncio.sleep(0.03)
+            return [{"provider": "naver_clova", "success": True, "full_text": "ok", "process_time": 30.0}] * len(payloads)
+
+        batcher = ClovaBatcher(slow_send, max_images=8, linger=0.01, latency_budget=0.02)
+        await asyncio.gather(*(batcher.submit(ImagePayload(b"x")) for _ in range(8)))
+
+        assert batcher.limit == 4
+        assert batcher.stats()["over_budget"] == 1
@@ -0,0 +1,90 @@
+import io
+import pytest
+from PIL import Image
+from app.services.comparator import OCRComparator
+from app.services.documents import DocumentComparator, DocumentRasterizer
+from app.services.executor import ProviderExecutor
+from app.services.providers import ProviderRegistry
+from app.services.scheduler import BatchScheduler
+from app.utils.payload import ImagePayload
+
+SHADES = (10, 120, 230)
+
+
+class PixelProvider:
+    """페이지 이미지의 첫 픽셀 밝기를 텍스트로 돌려주는 가짜 제공자 (페이지 구분용)"""
+
+    def __init__(self, name: str, fail_shade: int = -1):
+        self.name = name
+        self.fail_shade = fail_shade
+
+    async def extract_text(self, payload):
+        with Image.open(io.BytesIO(ImagePayload.wrap(payload).tobytes())) as image:
+            shade = image.convert("L").getpixel((0, 0))
+        success = abs(shade - self.fail_shade) > 5
+        return {"provider": self.name, "success": success, "full_text": f"page {shade // 10}" if success else "",
+                "process_time": 5.0, "error": None if success else "failed"}
+
+
+def make_document(image_format: str) -> bytes:
+    frames = [Image.new("L", (64, 32), shade) for shade in SHADES]
+    buffer = io.BytesIO()
+    frames[0].save(buffer, format=image_format, save_all=True, append_images=frames[1:])
+    return buffer.getvalue()
+
+
+def make_documents(providers):
+    registry = ProviderRegistry([p.name for p in providers], services={p.name: p for p in providers})
+    comparator = OCRComparator(executor=ProviderExecutor(timeouts={}, default_timeout=5, quorum=0), registry=registry)
+    rasterizer = DocumentRasterizer(dpi=72, image_format="PNG", workers=1)
+    return DocumentComparator(BatchScheduler(comparator, workers=2, provider_limits={}), rasterizer)
+
+
+@pytest.mark.asyncio
+class TestDocumentComparator:
+    async def test_tiff_pages_streamed_and_merged(self):
+        documents = make_documents([PixelProvider("google_vision"), PixelProvider("naver_clova")])
+        document = await documents.rasterizer.open(ImagePayload(make_document("TIFF"), filename="scan.tif"))
+        try:
+            lines = [line async for line in documents.run(document)]
+        finally:
+            documents.rasterizer.shutdown()
+            document.close()
+
+        pages, merged = lines[:-1], lines[-1]["document"]
+        assert sorted(line["page"] for line in pages) == [1, 2, 3]
+        assert all(line["success"] for line in pages)
+        assert merged["pages"] == 3
+        assert merged["google_vision"]["full_text"] == "page 1\n\npage 12\n\npage 23"
+        assert merged["comparison"]["similarity_score"] == 100.0
+
+    async def test_failed_pages_reported(self):
+        documents = make_documents([PixelProvider("google_vision"), PixelProvider("naver_clova", fail_shade=120)])
+        document = await documents.rasterizer.open(ImagePayload(make_document("TIFF")))
+        try:
+            merged = [line async for line in documents.run(document)][-1]["document"]
+        finally:
+            documents.rasterizer.shutdown()
+            document.close()
+
+        assert merged["naver_clova"]["success"] is False
+        assert merged["naver_clova"]["failed_pages"] == [2]
+        assert merged["succeeded_pages"] == 2
+
+    async def test_pdf_pages_rasterized(self):
+        pytest.importorskip("pypdfium2")
+        rasterizer = DocumentRasterizer(dpi=72, image_format="PNG", workers=1)
+        try:
+            document = await rasterizer.open(ImagePayload(make_document("PDF")))
+            page = await rasterizer.render(document, 2)
+        finally:
+            rasterizer.shutdown()
+        document.close()
+
+        assert document.pages == 3
+        with Image.open(io.BytesIO(page)) as image:
+            assert abs(image.convert("L").getpixel((10, 10)) - SHADES[2]) <= 5
+
+    async def test_rejects_non_documents(self):
+        with pytest.raises(ValueError):
+            await DocumentRasterizer().open(ImagePayload(b"\x89PNG\r\n\x1a\n0000"))
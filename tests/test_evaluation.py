@@ -0,0 +1,51 @@
+import json
+from app.services.evaluation import format_report, load_ground_truth, load_outputs, save_outputs, score
+
+
+def ocr(text, success=True, process_time=100.0):
+    return {"success": success, "full_text": text if success else "", "process_time": process_time}
+
+
+class TestEvaluation:
+    def test_scores_replayed_outputs(self, tmp_path):
+        ground_truth = tmp_path / "ground_truth.json"
+        ground_truth.write_text(json.dumps({"images": [
+            {"image": "a.jpg", "text": "카페라떼 4,500\n합계 4,500"},
+            {"image": "b.jpg", "text": "아메리카노 3,000"},
+        ]}, ensure_ascii=False), encoding="utf-8")
+        outputs = {
+            "a.jpg": {"image": "a.jpg",
+                      "google_vision": ocr("카페라떼 4,500 합계 4,500", process_time=120.0),
+                      "naver_clova": ocr("카페라떼 4,500 합게 4,500", process_time=80.0)},
+            "b.jpg": {"image": "b.jpg",
+                      "google_vision": ocr("아메리카노 3,000", process_time=100.0),
+                      "naver_clova": ocr("", success=False)},
+        }
+        replay = tmp_path / "outputs.jsonl"
+        save_outputs(str(replay), outputs)
+
+        items = load_ground_truth(str(ground_truth))
+        report = score(items, load_outputs(str(replay)))
+
+        google = report["providers"]["google_vision"]
+        clova = report["providers"]["naver_clova"]
+        assert google["corpus_cer"] == 0.0
+        assert google["success_rate"] == 1.0
+        assert google["latency"]["p50"] == 110.0
+        assert clova["success_rate"] == 0.5
+        # 실패한 이미지는 전부 오류로 계산
+        assert report["per_image"][1]["naver_clova"]["cer"] == 1.0
+        assert report["per_image"][0]["naver_clova"]["wer"] == 0.25
+        assert items[0]["path"].endswith("a.jpg")
+        assert "google_vision" in format_report(report)
+
+    def test_scores_receipt_fields(self):
+        items = [{"image": "a.jpg", "text": "카페라떼 4,500\n합계 4,500",
+                  "fields": {"items": [{"name": "카페라떼", "price": 4500}], "total": 4500}}]
+        outputs = {"a.jpg": {"google_vision": ocr("카페라떼 4,500\n합계 4,500"),
+                             "naver_clova": ocr("카페라떼 4,000\n합계 4,000")}}
+        report = score(items, outputs)
+
+        assert report["providers"]["google_vision"]["field_item_f1"] == 1.0
+        assert report["providers"]["google_vision"]["field_total_accuracy"] == 1.0
+        assert report["providers"]["naver_clova"]["field_total_accuracy"] == 0.0
@@ -0,0 +1,78 @@
+import asyncio
+import time
+import pytest
+from app.services.executor import ProviderExecutor
+
+
+def make_call(provider: str, delay: float, success: bool = True):
+    async def call():
+        await asyncio.sleep(delay)
+        return {
+            "provider": provider,
+            "success": success,
+            "full_text": provider if success else "",
+            "process_time": delay * 1000,
+            "error": None if success else "failed"
+        }
+    return call
+
+
+@pytest.mark.asyncio
+class TestProviderExecutor:
+    async def test_runs_providers_concurrently(self):
+        executor = ProviderExecutor(timeouts={}, default_timeout=5, quorum=0)
+        start = time.monotonic()
+        results = await executor.run({
+            "a": make_call("a", 0.2),
+            "b": make_call("b", 0.2),
+        })
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 0.35
+        assert list(results) == ["a", "b"]
+        assert all(r["success"] for r in results.values())
+
+    async def test_deadline_returns_partial_results(self):
+        executor = ProviderExecutor(timeouts={"slow": 0.05}, default_timeout=5, quorum=0)
+        results = await executor.run({
+            "fast": make_call("fast", 0.01),
+            "slow": make_call("slow", 1),
+        })
+
+        assert results["fast"]["success"] is True
+        assert results["slow"]["success"] is False
+        assert "Timeout" in results["slow"]["error"]
+
+    async def test_quorum_cancels_remaining_providers(self):
+        executor = ProviderExecutor(timeouts={}, default_timeout=5, quorum=1)
+        start = time.monotonic()
+        results = await executor.run({
+            "fast": make_call("fast", 0.01),
+            "slow": make_call("slow", 1),
+        })
+
+        assert time.monotonic() - start < 0.5
+        assert results["fast"]["success"] is True
+        assert "quorum" in results["slow"]["error"]
+
+    async def test_failures_do_not_count_towards_quorum(self):
+        executor = ProviderExecutor(timeouts={}, default_timeout=5, quorum=1)
+        results = await executor.run({
+            "broken": make_call("broken", 0.01, success=False),
+            "ok": make_call("ok", 0.05),
+        })
+
+        assert results["broken"]["success"] is False
+        assert results["ok"]["success"] is True
+
+    async def test_on_result_reports_in_arrival_order(self):
+        executor = ProviderExecutor(timeouts={}, default_timeout=5, quorum=0)
+        arrived = []
+        results = await executor.run({
+            "slow": make_call("slow", 0.1),
+            "fast": make_call("fast", 0.01),
+        }, on_result=lambda name, result: arrived.append((name, time.monotonic())))
+
+        assert [name for name, _ in arrived] == ["fast", "slow"]
+        assert arrived[1][1] - arrived[0][1] > 0.05
+        assert list(results) == ["slow", "fast"]
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from google.cloud import vision
+from app.services.cache import OCRResultCache
+from app.services.google_vision import GoogleVisionService, VisionBatcher
+
+
+class FakeVisionClient:
+    """batch_annotate_images 호출을 기록하고 이미지 내용을 그대로 텍스트로 돌려주는 클라이언트"""
+
+    def __init__(self):
+        self.calls = []
+
+    def batch_annotate_images(self, requests, timeout=None):
+        self.calls.append(requests)
+        responses = []
+        for request in requests:
+            text = request.image.content.decode()
+            if text == "broken":
+                responses.append(vision.AnnotateImageResponse(error={"code": 3, "message": "Bad image data"}))
+            else:
+                responses.append(vision.AnnotateImageResponse(
+                    text_annotations=[vision.EntityAnnotation(description=text)]
+                ))
+        return vision.BatchAnnotateImagesResponse(responses=responses)
+
+
+def make_service(client, **kwargs):
+    return GoogleVisionService(cache=OCRResultCache(enabled=False), client_factory=lambda: client, **kwargs)
+
+
+@pytest.mark.asyncio
+class TestGoogleVisionService:
+    async def test_single_image_uses_configured_feature(self):
+        client = FakeVisionClient()
+        service = make_service(client, feature="DOCUMENT_TEXT_DETECTION", batching=False)
+        result = await service.extract_text(b"receipt")
+
+        assert result["success"] is True
+        assert result["full_text"] == "receipt"
+        assert result["feature"] == "DOCUMENT_TEXT_DETECTION"
+        assert client.calls[0][0].features[0].type_ == vision.Feature.Type.DOCUMENT_TEXT_DETECTION
+
+    async def test_concurrent_images_share_one_batch_call(self):
+        client = FakeVisionClient()
+        service = make_service(client)
+        service.batcher = VisionBatcher(service._send, max_images=16, linger=0.05, latency_budget=5)
+        results = await asyncio.gather(
+            service.extract_text(b"image-0"),
+            service.extract_text(b"broken"),
+            service.extract_text(b"image-2", feature="DOCUMENT_TEXT_DETECTION")
+        )
+
+        assert len(client.calls) == 1
+        assert [request.features[0].type_ for request in client.calls[0]] == [
+            vision.Feature.Type.TEXT_DETECTION, vision.Feature.Type.TEXT_DETECTION,
+            vision.Feature.Type.DOCUMENT_TEXT_DETECTION
+        ]
+        # 이미지별 오류는 해당 이미지만 실패 처리
+        assert [result["success"] for result in results] == [True, False, True]
+        assert "Bad image data" in results[1]["error"]
+        assert results[2]["full_text"] == "image-2"
+        assert all(result["batch_size"] == 3 for result in results)
+
+    async def test_unknown_feature_rejected(self):
+        service = make_service(FakeVisionClient())
+        with pytest.raises(ValueError):
+            await service.extract_text(b"image", feature="LABEL_DETECTION")
+
+    async def test_features_cached_separately(self):
+        client = FakeVisionClient()
+        service = GoogleVisionService(cache=OCRResultCache(), client_factory=lambda: client, batching=False)
+        await service.extract_text(b"image")
+        await service.extract_text(b"image", feature="DOCUMENT_TEXT_DETECTION")
+        cached = await service.extract_text(b"image")
+
+        assert len(client.calls) == 2
+        assert cached["cached"] is True
@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+from app.services.jobs import JobManager, JobStore, validate_callback_url
+from app.services.scheduler import BatchItem, BatchScheduler
+from app.utils.payload import ImagePayload
+
+
+class CountingComparator:
+    def __init__(self):
+        self.calls = []
+
+    async def compare_ocr_results(self, image_content, quorum=None, limits=None):
+        self.calls.append(ImagePayload.wrap(image_content).tobytes())
+        await asyncio.sleep(0.001)
+        return {"comparison": {"similarity_score": 100.0}, "timestamp": 0}
+
+
+def make_items(count):
+    def loader(i):
+        async def load():
+            return f"image-{i}".encode()
+        return load
+    return [BatchItem(i, f"{i}.png", loader(i)) for i in range(count)]
+
+
+async def wait_for_completion(manager, job_id):
+    for _ in range(200):
+        status = await manager.get_status(job_id)
+        if status["status"] == "completed":
+            return status
+        await asyncio.sleep(0.01)
+    raise AssertionError("job did not complete")
+
+
+@pytest.mark.asyncio
+class TestJobManager:
+    async def test_job_runs_to_completion(self, tmp_path):
+        comparator = CountingComparator()
+        manager = JobManager(BatchScheduler(comparator, workers=2, provider_limits={}),
+                             store=JobStore(str(tmp_path / "jobs.sqlite3")),
+                             image_dir=str(tmp_path / "images"))
+        items = make_items(3) + [BatchItem(3, "notes.txt", None, error="File must be an image")]
+        job_id = await manager.submit(items)
+        status = await wait_for_completion(manager, job_id)
+
+        assert status["completed"] == 3
+        assert status["failed"] == 1
+        assert status["progress"] == 100.0
+        assert status["eta_seconds"] == 0.0
+        assert len(comparator.calls) == 3
+        results = await manager.get_results(job_id)
+        assert [r["index"] for r in results] == [0, 1, 2, 3]
+
+    async def test_resume_skips_completed_images(self, tmp_path):
+        store = JobStore(str(tmp_path / "jobs.sqlite3"))
+        image_dir = tmp_path / "images"
+        (image_dir / "job1").mkdir(parents=True)
+        items = []
+        for i in range(4):
+            path = image_dir / "job1" / str(i)
+            path.write_bytes(f"image-{i}".encode())
+            items.append({"index": i, "filename": f"{i}.png", "path": str(path), "error": None})
+        store.create_job("job1", None, items)
+        # 재시작 전에 두 장이 이미 처리된 상태
+        for i in range(2):
+            store.save_item_result("job1", {"index": i, "success": True, "result": {"ok": True}, "elapsed": 1.0})
+
+        comparator = CountingComparator()
+        manager = JobManager(BatchScheduler(comparator, workers=2, provider_limits={}),
+                             store=store, image_dir=str(image_dir))
+        await manager.resume()
+        status = await wait_for_completion(manager, "job1")
+
+        assert sorted(comparator.calls) == [b"image-2", b"image-3"]
+        assert status["completed"] == 4
+
+    async def test_failed_run_marks_job_and_sends_callback(self, tmp_path):
+        class BrokenScheduler:
+            async def run(self, items):
+                raise RuntimeError("scheduler crashed")
+                yield
+
+        manager = JobManager(BrokenScheduler(), store=JobStore(str(tmp_path / "jobs.sqlite3")),
+                             image_dir=str(tmp_path / "images"))
+        sent = []
+
+        async def record(status):
+            sent.append(status)
+        manager._send_callback = record
+        job_id = await manager.submit(make_items(2), callback_url="https://93.184.216.34/hook")
+        for _ in range(200):
+            if sent:
+                break
+            await asyncio.sleep(0.01)
+
+        status = await manager.get_status(job_id)
+        assert status["status"] == "failed"
+        assert status["error"] == "scheduler crashed"
+        assert status["finished_at"] is not None
+        assert sent and sent[0]["status"] == "failed"
+
+    async def test_rejects_internal_callback_url(self, tmp_path):
+        manager = JobManager(BatchScheduler(CountingComparator(), workers=2, provider_limits={}),
+                             store=JobStore(str(tmp_path / "jobs.sqlite3")), image_dir=str(tmp_path / "images"))
+
+        with pytest.raises(ValueError):
+            await manager.submit(make_items(1), callback_url="http://169.254.169.254/latest/meta-data")
+        assert manager.store.unfinished_jobs() == []
+
+
+class TestCallbackUrl:
+    @pytest.mark.parametrize("url", [
+        "ftp://93.184.216.34/hook",
+        "file:///etc/passwd",
+        "http://127.0.0.1:8080/admin",
+        "http://localhost/hook",
+        "http://10.0.0.5/hook",
+        "http://192.168.1.1/hook",
+        "http://169.254.169.254/latest/meta-data",
+        "http://[::1]/hook",
+        "http://0.0.0.0/hook",
+    ])
+    def test_rejects_non_http_and_internal_targets(self, url):
+        with pytest.raises(ValueError):
+            validate_callback_url(url, allowed_hosts=[])
+
+    def test_allows_public_address_and_allowlist(self):
+        validate_callback_url("https://93.184.216.34/hook", allowed_hosts=[])
+        # 허용 목록이 있으면 목록의 호스트만 (내부 호스트도 명시하면 허용)
+        validate_callback_url("http://callbacks.internal/hook", allowed_hosts=["callbacks.internal"])
+        with pytest.raises(ValueError):
+            validate_callback_url("https://93.184.216.34/hook", allowed_hosts=["callbacks.internal"])
@@ -0,0 +1,47 @@
+import threading
+import pytest
+from app.utils.lazy import Lazy
+
+
+class TestLazy:
+    def test_factory_runs_once_across_threads(self):
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def factory():
+            calls.append(1)
+            return object()
+
+        lazy = Lazy("service", factory)
+        values = []
+
+        def worker():
+            barrier.wait()
+            values.append(lazy.get())
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert all(value is values[0] for value in values)
+        assert lazy.status()["ready"] is True
+
+    def test_failure_is_recorded_and_retried(self):
+        attempts = []
+
+        def factory():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ValueError("credentials not found")
+            return "client"
+
+        lazy = Lazy("service", factory)
+        with pytest.raises(ValueError):
+            lazy.get()
+        assert lazy.status() == {"ready": False, "init_time": None, "error": "credentials not found"}
+
+        assert lazy.get() == "client"
+        assert lazy.error is None
@@ -0,0 +1,68 @@
+import pytest
+from benchmarks.load import run_scenario
+
+# 자격증명 없이 스텁 제공자로 전체 요청 경로(업로드 → 비교 → 시트 작성기)를 확인
+SMALL = {"requests": 6, "concurrency": 3, "latency_ms": 5, "jitter_ms": 1, "image_kb": 8, "sheet_latency_ms": 5}
+
+
+@pytest.mark.asyncio
+class TestLoadBenchmark:
+    async def test_compare_against_stubs(self):
+        report = await run_scenario("compare", SMALL)
+
+        assert report["status"] == {"200": 6}
+        assert report["provider_failures"] == 0
+        assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+
+    async def test_sheet_rows_are_flushed(self):
+        report = await run_scenario("compare_sheet", SMALL)
+
+        assert report["status"] == {"200": 6}
+        assert report["sheet"]["rows_written"] == 6
+        assert report["sheet"]["rows_spilled"] == 0
+
+    async def test_provider_errors_are_reported(self):
+        report = await run_scenario("naver_clova", {**SMALL, "error_rate": 1.0})
+
+        assert report["provider_failures"] == 6
+
+    async def test_compare_stream_lines_in_order(self):
+        import httpx
+        import json
+        import tempfile
+        from benchmarks.load import DEFAULT_CONFIG, make_image, stubbed_app
+
+        config = {**DEFAULT_CONFIG, **SMALL}
+        with tempfile.TemporaryDirectory() as spill_dir, stubbed_app(config, spill_dir) as (app, registry, writer, _):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.post("/api/compare/stream", files={"file": ("r.png", make_image(8), "image/png")},
+                                             data={"save_to_sheet": "true", "sheet_name": "Stream"})
+            writer.stop()
+            await registry.aclose()
+
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        # 제공자 결과 → 비교 분석 → 시트 저장 상태 순서
+        assert sorted(line["provider"] for line in lines[:2]) == ["google_vision", "naver_clova"]
+        assert all(line["result"]["provider"] == line["provider"] for line in lines[:2])
+        assert "comparison" in lines[2] and "google_vision" not in lines[2]
+        assert lines[3]["sheet_info"]["saved"] is True
+        assert lines[3]["sheet_info"]["message"] == "Row appended"
+
+    async def test_compare_reports_queued_row_as_not_saved(self):
+        import httpx
+        import tempfile
+        from benchmarks.load import DEFAULT_CONFIG, make_image, stubbed_app
+
+        config = {**DEFAULT_CONFIG, **SMALL}
+        with tempfile.TemporaryDirectory() as spill_dir, stubbed_app(config, spill_dir) as (app, registry, writer, _):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.post("/api/compare", files={"file": ("r.png", make_image(8), "image/png")},
+                                             data={"save_to_sheet": "true", "sheet_name": "Queued"})
+            writer.stop()
+            await registry.aclose()
+
+        # 작성기가 아직 기록하지 않았으므로 저장 완료로 보고하지 않음
+        sheet_info = response.json()["sheet_info"]
+        assert sheet_info["saved"] is False
+        assert sheet_info["queued"] is True
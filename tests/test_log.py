@@ -0,0 +1,34 @@
+import json
+import logging
+from unittest import mock
+from app.core import log
+
+
+def make_record(level=logging.INFO, **extra):
+    record = logging.LogRecord("app.test", level, __file__, 1, "provider %s", ("google_vision",), None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestStructuredLogging:
+    def test_json_record_includes_request_id_and_fields(self):
+        log.begin_request("req-1")
+        record = make_record(duration_ms=12.5)
+        log._RequestContextFilter().filter(record)
+        data = json.loads(log.JsonFormatter().format(record))
+
+        assert data["message"] == "provider google_vision"
+        assert data["request_id"] == "req-1"
+        assert data["duration_ms"] == 12.5
+
+    def test_success_logs_are_sampled_per_request(self):
+        context_filter = log._RequestContextFilter()
+        with mock.patch.object(log.settings, "LOG_SAMPLE_RATE", 0.0):
+            log.begin_request()
+        assert context_filter.filter(make_record(logging.INFO)) is False
+        # 경고/오류는 샘플링과 관계없이 기록
+        assert context_filter.filter(make_record(logging.WARNING)) is True
+
+        with mock.patch.object(log.settings, "LOG_SAMPLE_RATE", 1.0):
+            log.begin_request()
+        assert context_filter.filter(make_record(logging.INFO)) is True
@@ -0,0 +1,42 @@
+from fastapi.testclient import TestClient
+from app.core.metrics import MetricsRegistry, span, start_timings
+
+
+class TestMetricsRegistry:
+    def test_renders_prometheus_text(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("requests_total", "Requests", ("route",))
+        histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+        registry.gauge("queue_rows", "Queue", callback=lambda: {(): 3})
+        counter.inc(route='/a"b')
+        counter.inc(2, route='/a"b')
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        text = registry.render()
+
+        assert 'requests_total{route="/a\\"b"} 3.0' in text
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+        assert "latency_seconds_count 2" in text
+        assert "queue_rows 3" in text
+        assert "# TYPE latency_seconds histogram" in text
+
+    def test_span_adds_request_timing(self):
+        timings = start_timings()
+        with span("provider_call", "google_vision"):
+            pass
+
+        assert timings.server_timing().startswith("provider_call.google_vision;dur=")
+
+
+class TestMetricsEndpoint:
+    def test_metrics_and_debug_timing_header(self):
+        from app.main import app
+
+        client = TestClient(app)
+        response = client.get("/", headers={"X-Debug-Timing": "1"})
+        assert "total;dur=" in response.headers["server-timing"]
+        assert "server-timing" not in client.get("/").headers
+
+        text = client.get("/metrics").text
+        assert 'ocr_http_requests_total{method="GET",route="/",status="200"}' in text
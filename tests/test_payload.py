@@ -0,0 +1,41 @@
+import base64
+import os
+import tempfile
+import pytest
+from starlette.datastructures import UploadFile
+from app.utils.payload import ImagePayload
+
+
+class TestImagePayload:
+    def test_base64_chunks_match_full_encoding(self):
+        data = os.urandom(100_001)
+        payload = ImagePayload(data)
+
+        encoded = b"".join(payload.base64_chunks(chunk_size=3 * 1000))
+        assert encoded == base64.b64encode(data)
+        assert payload.base64_size == len(encoded)
+
+    def test_wrap_keeps_existing_payload(self):
+        payload = ImagePayload(b"abc")
+        assert ImagePayload.wrap(payload) is payload
+        assert ImagePayload.wrap(b"abc").digest == payload.digest
+
+
+@pytest.mark.asyncio
+class TestImagePayloadFromUpload:
+    async def test_small_upload_is_read_into_memory(self):
+        spooled = tempfile.SpooledTemporaryFile(max_size=1024)
+        spooled.write(b"small")
+        payload = await ImagePayload.from_upload(UploadFile(spooled, filename="a.png"))
+
+        assert payload.tobytes() == b"small"
+
+    async def test_spooled_upload_is_memory_mapped(self):
+        data = os.urandom(4096)
+        spooled = tempfile.SpooledTemporaryFile(max_size=1024)
+        spooled.write(data)
+        payload = await ImagePayload.from_upload(UploadFile(spooled, filename="a.png"))
+
+        assert not isinstance(payload._buffer, bytes)
+        assert payload.tobytes() == data
+        payload.close()
@@ -0,0 +1,51 @@
+import io
+import pytest
+from PIL import Image
+from app.services.preprocess import ImagePreprocessor
+from app.utils.payload import ImagePayload, detect_image_format
+
+
+def png_bytes(width, height):
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), "white").save(output, format="PNG")
+    return output.getvalue()
+
+
+class TestDetectImageFormat:
+    def test_detects_common_formats(self):
+        assert detect_image_format(png_bytes(4, 4)[:16]) == "png"
+        assert detect_image_format(b"\xff\xd8\xff\xe0" + b"\x00" * 12) == "jpeg"
+        assert detect_image_format(b"II*\x00" + b"\x00" * 12) == "tiff"
+        assert detect_image_format(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "webp"
+        assert detect_image_format(b"not an image") is None
+
+
+@pytest.mark.asyncio
+class TestImagePreprocessor:
+    async def test_downscales_per_provider_and_dedupes(self):
+        preprocessor = ImagePreprocessor(max_sides={"google_vision": 1000, "naver_clova": 1000, "other": 500},
+                                         image_format="JPEG", quality=85, workers=1)
+        payload = ImagePayload(png_bytes(3000, 1500))
+        try:
+            payloads, report = await preprocessor.prepare(payload, ["google_vision", "naver_clova", "other"])
+        finally:
+            preprocessor.shutdown()
+
+        assert payloads["google_vision"] is payloads["naver_clova"]
+        assert payloads["google_vision"].format == "jpeg"
+        assert report["original_format"] == "png"
+        assert report["providers"]["google_vision"]["size"] == [1000, 500]
+        assert report["providers"]["other"]["size"] == [500, 250]
+        assert report["providers"]["other"]["saved_bytes"] > 0
+
+    async def test_undecodable_image_falls_back_to_original(self):
+        preprocessor = ImagePreprocessor(max_sides={"google_vision": 1000}, image_format="JPEG",
+                                         quality=85, workers=1)
+        payload = ImagePayload(b"not an image")
+        try:
+            payloads, report = await preprocessor.prepare(payload, ["google_vision"])
+        finally:
+            preprocessor.shutdown()
+
+        assert payloads["google_vision"] is payload
+        assert report["providers"]["google_vision"]["applied"] is False
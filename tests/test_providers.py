@@ -0,0 +1,118 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.services import tesseract_ocr
+from app.services.cache import OCRResultCache
+from app.services.comparator import OCRComparator
+from app.services.executor import ProviderExecutor
+from app.services.providers import ProviderRegistry
+from app.services.tesseract_ocr import TesseractOCRService
+
+
+class FakeProvider:
+    def __init__(self, name: str, text: str, success: bool = True):
+        self.name = name
+        self.text = text
+        self.success = success
+        self.calls = 0
+        self.ready = True
+
+    def warm_up(self):
+        pass
+
+    def status(self):
+        return {"ready": True, "init_time": None, "error": None}
+
+    async def extract_text(self, payload):
+        self.calls += 1
+        return {"provider": self.name, "success": self.success, "full_text": self.text,
+                "process_time": 10.0, "error": None if self.success else "failed"}
+
+
+def make_comparator(providers, prescreen=""):
+    registry = ProviderRegistry([p.name for p in providers], services={p.name: p for p in providers})
+    return OCRComparator(executor=ProviderExecutor(timeouts={}, default_timeout=5, quorum=0),
+                         registry=registry, prescreen_provider=prescreen)
+
+
+class TestProviderRegistry:
+    def test_unknown_provider_rejected(self):
+        with pytest.raises(ValueError):
+            ProviderRegistry(["google_vision", "missing"])
+
+    def test_describe_lists_registered_providers(self):
+        names = [p["name"] for p in ProviderRegistry(["naver_clova"]).describe()]
+
+        assert names[0] == "naver_clova"
+        assert {"google_vision", "tesseract"} <= set(names)
+
+
+@pytest.mark.asyncio
+class TestComparatorProviders:
+    async def test_compares_every_configured_provider(self):
+        comparator = make_comparator([
+            FakeProvider("local", "카페라떼 4,500"),
+            FakeProvider("a", "카페라떼 4,500"),
+            FakeProvider("b", "카페라테 4,000 합계"),
+        ])
+        result = await comparator.compare_ocr_results(b"img")
+
+        assert result["providers"] == ["local", "a", "b"]
+        comparison = result["comparison"]
+        assert comparison["baseline"] == "local"
+        assert set(comparison["pairwise"]) == {"a", "b"}
+        assert comparison["similarity_score"] == comparison["pairwise"]["a"]["similarity_score"] == 100.0
+        assert comparison["pairwise"]["b"]["cer"] > 0
+        assert comparison["both_successful"] is True
+        assert comparison["recommendation"].startswith("b extracted more text")
+
+    async def test_prescreen_skips_cloud_calls(self):
+        local = FakeProvider("local", "")
+        cloud = FakeProvider("cloud", "text")
+        comparator = make_comparator([local, cloud], prescreen="local")
+        result = await comparator.compare_ocr_results(b"img")
+
+        assert result["prescreen"]["passed"] is False
+        assert cloud.calls == 0
+        assert result["cloud"]["error"].startswith("Skipped")
+
+    async def test_prescreen_failure_does_not_block(self):
+        cloud = FakeProvider("cloud", "text")
+        comparator = make_comparator([FakeProvider("local", "", success=False), cloud], prescreen="local")
+        result = await comparator.compare_ocr_results(b"img")
+
+        assert result["prescreen"]["passed"] is True
+        assert result["cloud"]["success"] is True
+
+
+@pytest.mark.asyncio
+class TestTesseractOCRService:
+    async def test_builds_lines_and_word_boxes(self, monkeypatch):
+        data = {
+            "text": ["", "카페라떼", "4,500", "합계", "4,500"], "conf": [-1, 90, 80, 95, 75],
+            "left": [0, 10, 200, 10, 200], "top": [0, 50, 50, 100, 100],
+            "width": [0, 80, 50, 40, 50], "height": [0, 20, 20, 20, 20],
+            "block_num": [1, 1, 1, 1, 1], "par_num": [1, 1, 1, 1, 1], "line_num": [0, 1, 1, 2, 2],
+        }
+        monkeypatch.setattr(tesseract_ocr, "_check_tesseract", lambda: "5.3.0")
+        monkeypatch.setattr(tesseract_ocr, "_run_tesseract", lambda image, lang, config: data)
+        service = TesseractOCRService(executor=ThreadPoolExecutor(1), cache=OCRResultCache(enabled=False))
+
+        result = await service.extract_text(b"img")
+        service.shutdown()
+
+        assert result["success"] is True
+        assert result["full_text"] == "카페라떼 4,500\n합계 4,500"
+        assert result["words"]["texts"] == ["카페라떼", "4,500", "합계", "4,500"]
+        assert result["confidence"] == 0.85
+        assert service.status()["version"] == "5.3.0"
+
+    async def test_missing_engine_is_reported_as_failure(self, monkeypatch):
+        def missing():
+            raise RuntimeError("tesseract is not installed")
+
+        monkeypatch.setattr(tesseract_ocr, "_check_tesseract", missing)
+        service = TesseractOCRService(executor=ThreadPoolExecutor(1), cache=OCRResultCache(enabled=False))
+        result = await service.extract_text(b"img")
+
+        assert result["success"] is False
+        assert "not installed" in result["error"]
@@ -0,0 +1,171 @@
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.services.executor import ProviderExecutor
+from app.services.cache import OCRResultCache
+from app.services.ratelimit import (
+    ClientRateLimiter, ProviderQuotas, TokenBucket, before_provider_call, parse_tenant_limits
+)
+from app.services.resilience import CircuitBreakers
+
+
+def ok_call(provider, sent=None):
+    async def call():
+        # 실제 제공자 서비스처럼 요청을 보내기 직전에 호출 예산 확인
+        await before_provider_call()
+        if sent is not None:
+            sent.append(provider)
+        return {"provider": provider, "success": True, "full_text": "ok", "process_time": 1.0, "error": None}
+    return call
+
+
+def cached_call(cache, provider, image, sent):
+    async def fetch(payload):
+        sent.append(provider)
+        return {"provider": provider, "success": True, "full_text": "ok", "process_time": 1.0, "error": None}
+
+    async def call():
+        return await cache.get_or_fetch(provider, image, fetch)
+    return call
+
+
+class TestTokenBucket:
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=20, burst=2)
+
+        assert bucket.acquire() == (True, 0.0)
+        assert bucket.acquire() == (True, 0.0)
+        allowed, retry_after = bucket.acquire()
+        assert allowed is False
+        assert 0 < retry_after <= 0.05
+        time.sleep(0.06)
+        assert bucket.acquire()[0] is True
+
+    def test_reserve_borrows_up_to_max_wait(self):
+        bucket = TokenBucket(rate=10, burst=1)
+
+        assert bucket.reserve(max_wait=0.15) == 0.0
+        assert 0.09 <= bucket.reserve(max_wait=0.15) <= 0.1
+        # 두 번째 예약까지 빌려 쓴 상태라 다음 대기는 약 0.2초로 한도 초과
+        assert bucket.reserve(max_wait=0.15) is None
+
+
+class TestClientRateLimiter:
+    def test_limits_each_client_separately(self):
+        limiter = ClientRateLimiter(enabled=True, rate=0.1, burst=2, tenant_limits=parse_tenant_limits("big=100/5"))
+
+        assert [limiter.check("ip:1") for _ in range(2)] == [None, None]
+        assert limiter.check("ip:1") > 1
+        assert limiter.check("ip:2") is None
+        # 등록된 API 키는 자기 한도(버스트 5) 사용
+        assert all(limiter.check("big") is None for _ in range(5))
+        assert limiter.status()["rejected"] == 1
+
+    def test_unregistered_keys_are_limited_by_ip(self):
+        limiter = ClientRateLimiter(enabled=True, rate=1, burst=1, tenant_limits={}, api_keys=["known"])
+        # 요청마다 다른 키를 보내도 같은 IP의 익명 요청으로 제한
+        keys = [limiter.client_key(f"rotating-{i}", "10.0.0.1") for i in range(5)]
+
+        assert set(keys) == {"ip:10.0.0.1"}
+        assert [limiter.check(key) is None for key in keys] == [True, False, False, False, False]
+        assert limiter.client_key("known", "10.0.0.1") == "known"
+
+    def test_forwarded_for_needs_trusted_proxy(self):
+        direct = ClientRateLimiter(enabled=True, rate=1, burst=1, tenant_limits={}, api_keys=[])
+        behind_proxy = ClientRateLimiter(enabled=True, rate=1, burst=1, tenant_limits={}, api_keys=[], trusted_proxies=1)
+
+        # 프록시가 없으면 위조한 X-Forwarded-For는 무시하고 연결 주소 사용
+        spoofed = [direct.client_key(None, "203.0.113.9", f"198.51.100.{i}") for i in range(5)]
+        assert set(spoofed) == {"ip:203.0.113.9"}
+        assert [direct.check(key) is None for key in spoofed] == [True, False, False, False, False]
+        # 신뢰하는 프록시 하나 뒤에서는 프록시가 덧붙인 맨 오른쪽 주소만 사용 (왼쪽의 위조 항목 무시)
+        assert behind_proxy.client_key(None, "10.0.0.2", "1.1.1.1, 203.0.113.9") == "ip:203.0.113.9"
+        assert behind_proxy.client_key(None, "10.0.0.2", "2.2.2.2, 203.0.113.9") == "ip:203.0.113.9"
+        assert behind_proxy.client_key(None, "10.0.0.2", None) == "ip:10.0.0.2"
+
+    def test_disabled_allows_everything(self):
+        limiter = ClientRateLimiter(enabled=False, rate=0.1, burst=1)
+
+        assert all(limiter.check("ip:1") is None for _ in range(10))
+
+
+@pytest.mark.asyncio
+class TestProviderQuotas:
+    async def test_calls_over_budget_wait_instead_of_failing(self):
+        quotas = ProviderQuotas(qps={"p": 20}, burst={"p": 1}, max_wait=1)
+        executor = ProviderExecutor(timeouts={}, default_timeout=5, quorum=0, breakers=CircuitBreakers(), quotas=quotas)
+        start = time.monotonic()
+        results = await asyncio.gather(*(executor.run({"p": ok_call("p")}) for _ in range(4)))
+
+        assert all(result["p"]["success"] for result in results)
+        # 첫 호출 이후 세 번은 초당 20회 속도로 나눠 실행
+        assert time.monotonic() - start >= 0.14
+        assert quotas.status()["providers"]["p"]["waited"] == 3
+
+    async def test_rejects_when_wait_exceeds_budget(self):
+        quotas = ProviderQuotas(qps={"p": 1}, burst={"p": 1}, max_wait=0.1)
+        executor = ProviderExecutor(timeouts={}, default_timeout=5, quorum=0, breakers=CircuitBreakers(), quotas=quotas)
+        first = await executor.run({"p": ok_call("p")})
+        second = await executor.run({"p": ok_call("p")})
+
+        assert first["p"]["success"] is True
+        assert second["p"]["rate_limited"] is True
+        assert second["p"]["skipped"] is True
+        assert quotas.retry_after(["p", "unlimited"]) > 0
+
+
+    async def test_budget_wait_is_not_counted_against_timeout(self):
+        quotas = ProviderQuotas(qps={"p": 5}, burst={"p": 1}, max_wait=1)
+        executor = ProviderExecutor(timeouts={"p": 0.1}, default_timeout=5, quorum=0, breakers=CircuitBreakers(), quotas=quotas)
+        await executor.run({"p": ok_call("p")})
+        # 약 0.2초 예산 대기 후 호출해도 마감 시간(0.1초)은 호출 시점부터
+        result = await executor.run({"p": ok_call("p")})
+
+        assert result["p"]["success"] is True
+
+    async def test_cache_hits_do_not_use_budget(self):
+        quotas = ProviderQuotas(qps={"p": 0.01}, burst={"p": 1}, max_wait=0.1)
+        executor = ProviderExecutor(timeouts={}, default_timeout=5, quorum=0, breakers=CircuitBreakers(), quotas=quotas)
+        cache = OCRResultCache(enabled=True, backend=None)
+        sent = []
+        results = [await executor.run({"p": cached_call(cache, "p", b"same image", sent)}) for _ in range(5)]
+
+        # 첫 호출만 제공자로 나가고 예산을 씀, 나머지 캐시 적중은 대기/거절 없이 처리
+        assert sent == ["p"]
+        assert all(result["p"]["success"] for result in results)
+        assert [result["p"].get("cached", False) for result in results] == [False, True, True, True, True]
+        assert quotas.status()["providers"]["p"]["rejected"] == 0
+
+    async def test_quorum_cancel_during_wait_refunds_token(self):
+        quotas = ProviderQuotas(qps={"slow": 10}, burst={"slow": 1}, max_wait=1)
+        executor = ProviderExecutor(timeouts={}, default_timeout=5, quorum=0, breakers=CircuitBreakers(), quotas=quotas)
+        await executor.run({"slow": ok_call("slow")})
+        sent = []
+        # 예산을 기다리는 동안 쿼럼(1)에 도달해 취소된 호출은 토큰을 돌려줌
+        result = await executor.run({"fast": ok_call("fast"), "slow": ok_call("slow", sent)}, quorum=1)
+
+        assert result["slow"]["skipped"] is True
+        assert sent == []
+        assert quotas.status()["providers"]["slow"]["tokens"] <= 0.1
+        assert quotas.status()["providers"]["slow"]["tokens"] > -0.5
+
+
+class TestAdmission:
+    def test_rejects_with_retry_after(self, monkeypatch):
+        from app.main import app
+        from app.api import ocr as ocr_api
+
+        limiter = ClientRateLimiter(enabled=True, rate=0.01, burst=1, tenant_limits={}, api_keys=["tenant-a", "tenant-b"])
+        monkeypatch.setattr(ocr_api, "client_limiter", limiter)
+        client = TestClient(app)
+        files = {"file": ("note.txt", b"text", "text/plain")}
+        first = client.post("/api/naver-clova", files=files, headers={"X-API-Key": "tenant-a"})
+        second = client.post("/api/naver-clova", files=files, headers={"X-API-Key": "tenant-a"})
+        other = client.post("/api/naver-clova", files=files, headers={"X-API-Key": "tenant-b"})
+
+        # 진입 제어는 통과하고 업로드 검증에서 400
+        assert first.status_code == 400
+        assert second.status_code == 429
+        assert int(second.headers["Retry-After"]) >= 1
+        assert other.status_code == 400
@@ -0,0 +1,66 @@
+from app.services.layout import WordBoxes
+from app.services.receipt import extract_receipt_fields, field_accuracy, group_lines, parse_amount
+
+
+def receipt_words():
+    """세 줄짜리 영수증 (단어 순서를 섞어 배치)"""
+    words = WordBoxes()
+    layout = [
+        ("4,500", 300, 52), ("카페라떼", 10, 50), ("1", 200, 51),
+        ("합계", 10, 150), ("아메리카노", 10, 100), ("2", 200, 101),
+        ("9,000", 300, 99), ("13,500", 300, 151),
+    ]
+    for text, x, y in layout:
+        words.append(text, [(x, y), (x + 60, y), (x + 60, y + 20), (x, y + 20)])
+    return words
+
+
+class TestWordBoxes:
+    def test_round_trip(self):
+        words = receipt_words()
+        restored = WordBoxes.from_dict(words.to_dict())
+
+        assert restored.texts == words.texts
+        assert restored.box(1) == (10.0, 50.0, 70.0, 70.0)
+
+
+class TestReceiptExtraction:
+    def test_group_lines_by_geometry(self):
+        words = receipt_words()
+        lines = [[words.texts[i] for i in line] for line in group_lines(words)]
+
+        assert lines == [["카페라떼", "1", "4,500"], ["아메리카노", "2", "9,000"], ["합계", "13,500"]]
+
+    def test_extract_items_and_total(self):
+        fields = extract_receipt_fields({"words": receipt_words().to_dict(), "full_text": ""})
+
+        assert fields["items"] == [
+            {"name": "카페라떼", "quantity": 1, "price": 4500},
+            {"name": "아메리카노", "quantity": 2, "price": 9000},
+        ]
+        assert fields["total"] == 13500
+
+    def test_falls_back_to_text_lines(self):
+        fields = extract_receipt_fields({"full_text": "스타벅스 강남점\n카페라떼 4,500원\n부가세 409\n결제금액 4,500"})
+
+        assert fields["items"] == [{"name": "카페라떼", "quantity": None, "price": 4500}]
+        assert fields["total"] == 4500
+
+    def test_parse_amount(self):
+        assert parse_amount("12,000") == 12000
+        assert parse_amount("₩4.500") == 4500
+        assert parse_amount("3000원") == 3000
+        assert parse_amount("-1,000") == -1000
+        assert parse_amount("합계") is None
+
+
+class TestFieldAccuracy:
+    def test_partial_match(self):
+        reference = {"items": [{"name": "카페 라떼", "price": 4500}, {"name": "아메리카노", "price": 9000}], "total": 13500}
+        hypothesis = {"items": [{"name": "카페라떼", "price": 4500}, {"name": "아메리카노", "price": 8000}], "total": 13500}
+        accuracy = field_accuracy(reference, hypothesis)
+
+        assert accuracy["total_match"] is True
+        assert accuracy["item_precision"] == 0.5
+        assert accuracy["item_recall"] == 0.5
+        assert accuracy["price_recall"] == 0.5
@@ -0,0 +1,116 @@
+import asyncio
+import time
+import pytest
+from app.services.executor import ProviderExecutor
+from app.services.resilience import CircuitBreaker, CircuitBreakers
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker("p", failure_threshold=3, slow_call_threshold=10, reset_timeout=60)
+        for _ in range(2):
+            breaker.record(False, 0.1)
+        breaker.record(True, 0.1)
+        for _ in range(3):
+            breaker.record(False, 0.1)
+
+        assert breaker.state == "open"
+        assert breaker.allow() is False
+        assert breaker.status()["short_circuits"] == 1
+
+    def test_slow_calls_count_as_failures(self):
+        breaker = CircuitBreaker("p", failure_threshold=2, slow_call_threshold=1, reset_timeout=60)
+        breaker.record(True, 2.0)
+        breaker.record(True, 3.0)
+
+        assert breaker.state == "open"
+
+    def test_half_open_allows_single_trial(self):
+        breaker = CircuitBreaker("p", failure_threshold=1, slow_call_threshold=10, reset_timeout=0.05)
+        breaker.record(False, 0.1)
+        time.sleep(0.06)
+
+        assert breaker.state == "half_open"
+        assert breaker.allow() is True
+        assert breaker.allow() is False
+        breaker.record(True, 0.1)
+        assert breaker.state == "closed"
+
+
+def failing_call(counter):
+    async def call():
+        counter.append(1)
+        return {"provider": "p", "success": False, "full_text": "", "process_time": 1.0, "error": "down"}
+    return call
+
+
+@pytest.mark.asyncio
+class TestResilientExecutor:
+    async def test_open_breaker_short_circuits(self):
+        breakers = CircuitBreakers(enabled=True, failure_threshold=2, reset_timeout=60)
+        executor = ProviderExecutor(timeouts={}, default_timeout=5, quorum=0, breakers=breakers)
+        calls = []
+        for _ in range(3):
+            result = (await executor.run({"p": failing_call(calls)}))["p"]
+
+        assert len(calls) == 2
+        assert result["circuit_open"] is True
+        assert result["error"].startswith("Circuit open")
+
+    async def test_cached_trial_call_releases_half_open_breaker(self):
+        breakers = CircuitBreakers(enabled=True, failure_threshold=1, reset_timeout=0.05)
+        executor = ProviderExecutor(timeouts={}, default_timeout=5, quorum=0, breakers=breakers)
+        await executor.run({"p": failing_call([])})
+        time.sleep(0.06)
+
+        async def cached():
+            return {"provider": "p", "success": True, "full_text": "ok", "process_time": 0.0, "cached": True}
+
+        # 반열림 상태의 시험 호출이 캐시 응답이면 기록 없이 권한만 반환되어 다음 호출이 막히지 않음
+        assert (await executor.run({"p": cached}))["p"]["cached"] is True
+        assert breakers.get("p").state == "half_open"
+        calls = []
+        result = (await executor.run({"p": failing_call(calls)}))["p"]
+        assert len(calls) == 1
+        assert "circuit_open" not in result
+
+    async def test_half_open_short_circuit_message(self):
+        breakers = CircuitBreakers(enabled=True, failure_threshold=1, reset_timeout=0.05)
+        executor = ProviderExecutor(timeouts={}, default_timeout=5, quorum=0, breakers=breakers)
+        await executor.run({"p": failing_call([])})
+        time.sleep(0.06)
+        # 시험 호출이 진행 중인 동안 들어온 호출
+        assert breakers.get("p").allow() is True
+        result = (await executor.run({"p": failing_call([])}))["p"]
+
+        assert result["circuit_open"] is True
+        assert "None" not in result["error"]
+        assert result["error"].endswith("trial call in progress")
+
+    async def test_timeouts_trip_breaker(self):
+        breakers = CircuitBreakers(enabled=True, failure_threshold=1, reset_timeout=60)
+        executor = ProviderExecutor(timeouts={"p": 0.05}, default_timeout=5, quorum=0, breakers=breakers)
+
+        async def hang():
+            await asyncio.sleep(1)
+
+        await executor.run({"p": hang})
+        assert breakers.get("p").state == "open"
+
+    async def test_hedged_duplicate_request(self):
+        executor = ProviderExecutor(timeouts={}, default_timeout=5, quorum=0, breakers=CircuitBreakers(),
+                                    hedge_providers=["p"], hedge_delay=0.05)
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            # 첫 요청만 느림
+            await asyncio.sleep(1 if len(attempts) == 1 else 0.01)
+            return {"provider": "p", "success": True, "full_text": str(len(attempts)), "process_time": 1.0}
+
+        start = time.monotonic()
+        result = (await executor.run({"p": call}))["p"]
+
+        assert time.monotonic() - start < 0.5
+        assert result["hedged"] is True
+        assert len(attempts) == 2
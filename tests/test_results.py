@@ -0,0 +1,101 @@
+import time
+from concurrent.futures import Future
+import pytest
+from app.services.comparator import OCRComparator
+from app.services.executor import ProviderExecutor
+from app.services.providers import ProviderRegistry
+from app.services.results import ResultSheetSync, ResultStore
+from app.utils.lazy import Lazy
+from app.utils.payload import ImagePayload
+
+
+def make_result(google_text="합계 12,000", clova_text="합계 12,000", clova_success=True, similarity=100.0):
+    return {
+        "comparison": {"baseline": "google_vision", "similarity_score": similarity, "both_successful": clova_success,
+                       "recommendation": "ok", "pairwise": {"naver_clova": {"similarity_score": similarity, "cer": 0.0}}},
+        "google_vision": {"provider": "google_vision", "success": True, "full_text": google_text, "process_time": 100.0},
+        "naver_clova": {"provider": "naver_clova", "success": clova_success, "full_text": clova_text,
+                        "process_time": 50.0, "confidence": 0.9},
+        "providers": ["google_vision", "naver_clova"]
+    }
+
+
+class FakeWriter:
+    def __init__(self):
+        self.rows = []
+
+    def submit(self, sheet_name, row):
+        self.rows.append((sheet_name, row))
+        future = Future()
+        future.set_result({"saved": True})
+        return future
+
+
+class TestResultStore:
+    def test_query_filters(self, tmp_path):
+        store = ResultStore(str(tmp_path / "results.sqlite3"))
+        first = store.add(ImagePayload(b"image-1", filename="a.png"), make_result())
+        cutoff = time.time()
+        store.add(ImagePayload(b"image-2", filename="b.png"), make_result(clova_success=False, clova_text=""))
+
+        assert [r["image_name"] for r in store.query()] == ["b.png", "a.png"]
+        assert [r["id"] for r in store.query(until=cutoff)] == [first]
+        by_hash = store.query(image_hash=ImagePayload(b"image-2").digest)
+        assert by_hash[0]["providers"]["naver_clova"]["success"] is False
+        only_clova = store.query(provider="naver_clova", include_text=True)
+        assert set(only_clova[0]["providers"]) == {"naver_clova"}
+        assert "full_text" not in store.query()[0]["providers"]["google_vision"]
+
+    def test_stats_aggregated_in_store(self, tmp_path):
+        store = ResultStore(str(tmp_path / "results.sqlite3"))
+        store.add(ImagePayload(b"image-1"), make_result())
+        store.add(ImagePayload(b"image-1"), make_result(clova_success=False, clova_text="", similarity=0.0))
+
+        stats = store.stats()
+        assert stats["comparisons"] == 2
+        assert stats["unique_images"] == 1
+        assert stats["both_success_rate"] == 0.5
+        assert stats["providers"]["naver_clova"]["success_rate"] == 0.5
+        assert stats["providers"]["naver_clova"]["avg_process_time"] == 50.0
+        assert stats["providers"]["google_vision"]["calls"] == 2
+        assert store.stats(since=time.time() + 60)["comparisons"] == 0
+
+
+class TestResultSheetSync:
+    def test_exports_each_result_once(self, tmp_path):
+        store = ResultStore(str(tmp_path / "results.sqlite3"))
+        store.add(ImagePayload(b"image-1", filename="a.png"), make_result())
+        exported = store.add(ImagePayload(b"image-2"), make_result())
+        store.mark_exported([exported], "OCR Comparison")
+        writer = FakeWriter()
+        sync = ResultSheetSync(lambda: store, writer, "History", interval=60)
+
+        assert sync.sync_once() == 1
+        assert sync.sync_once() == 0
+        sheet_name, row = writer.rows[0]
+        assert sheet_name == "History"
+        assert row[1] == "a.png"
+        assert row[5] == "합계 12,000"
+
+
+class FakeProvider:
+    def __init__(self, name):
+        self.name = name
+
+    async def extract_text(self, payload):
+        return {"provider": self.name, "success": True, "full_text": "합계 5,000", "process_time": 1.0}
+
+
+@pytest.mark.asyncio
+async def test_comparator_records_results(tmp_path):
+    store = Lazy("result_store", lambda: ResultStore(str(tmp_path / "results.sqlite3")))
+    names = ["google_vision", "naver_clova"]
+    comparator = OCRComparator(executor=ProviderExecutor(timeouts={}, default_timeout=5, quorum=0),
+                               registry=ProviderRegistry(names, services={n: FakeProvider(n) for n in names}),
+                               results=store)
+    result = await comparator.compare_ocr_results(ImagePayload(b"image", filename="r.png"))
+
+    stored = store.get().get(result["result_id"])
+    assert stored["image_name"] == "r.png"
+    assert stored["similarity_score"] == 100.0
+    assert stored["providers"]["naver_clova"]["full_text"] == "합계 5,000"
@@ -0,0 +1,118 @@
+import asyncio
+import pytest
+from app.services.executor import ProviderExecutor
+from app.services.providers import ProviderRegistry
+from app.services.routing import ProviderRouter, ProviderStats
+
+
+class DelayedProvider:
+    def __init__(self, name: str, text: str = "카페라떼 4,500", delay: float = 0.0,
+                 success: bool = True, confidence=None):
+        self.name = name
+        self.text = text
+        self.delay = delay
+        self.success = success
+        self.confidence = confidence
+        self.calls = 0
+
+    async def extract_text(self, payload):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"provider": self.name, "success": self.success, "full_text": self.text if self.success else "",
+                "process_time": self.delay * 1000, "confidence": self.confidence,
+                "error": None if self.success else "failed"}
+
+
+def make_router(providers, costs=None, hedge_after=0.0, stats=None):
+    registry = ProviderRegistry([p.name for p in providers], services={p.name: p for p in providers})
+    return ProviderRouter(registry, ProviderExecutor(timeouts={}, default_timeout=5, quorum=0),
+                          stats=stats or ProviderStats(window=50), costs=costs or {}, hedge_after=hedge_after)
+
+
+def ocr(success=True, process_time=100.0, **extra):
+    return {"success": success, "full_text": "text" if success else "", "process_time": process_time, **extra}
+
+
+class TestProviderStats:
+    def test_rolling_summary(self):
+        stats = ProviderStats(window=3)
+        for process_time in (100.0, 200.0, 300.0, 400.0):
+            stats.record("a", ocr(process_time=process_time))
+        stats.record("a", ocr(success=False))
+        stats.record("a", ocr(), quality=0.5)
+        # 캐시 적중과 생략된 호출은 통계에서 제외
+        stats.record("a", ocr(process_time=0.0, cached=True))
+        stats.record("a", ocr(success=False, skipped=True))
+        summary = stats.summary("a")
+
+        assert summary["samples"] == 3
+        assert summary["error_rate"] == round(1 / 3, 4)
+        assert summary["latency_p95"] == 400.0
+        assert summary["quality"] == 0.5
+
+    def test_two_providers_record_no_quality(self):
+        stats = ProviderStats()
+        results = {"a": ocr(), "b": ocr(), "c": ocr(success=False)}
+        comparison = {"baseline": "a", "pairwise": {"b": {"similarity_score": 90.0}, "c": {"similarity_score": 0.0}}}
+        stats.record_comparison(results, comparison)
+
+        # 둘만 성공하면 유사도가 양쪽에 같아 품질을 구분할 수 없음
+        assert stats.summary("a")["quality"] is None
+        assert stats.summary("b")["quality"] is None
+        assert stats.summary("a")["samples"] == 1
+        assert stats.summary("c")["error_rate"] == 1.0
+
+    def test_quality_is_agreement_with_majority(self):
+        stats = ProviderStats()
+        results = {"a": ocr(full_text="카페라떼 4,500"), "b": ocr(full_text="카페라떼 4,500"),
+                   "c": ocr(full_text="커피 9,999원")}
+        comparison = {"baseline": "a", "pairwise": {"b": {"similarity_score": 100.0},
+                                                    "c": {"similarity_score": 20.0}}}
+        stats.record_comparison(results, comparison)
+        quality = {name: stats.summary(name)["quality"] for name in results}
+
+        # 다수(a, b)와 다른 결과를 낸 c만 품질이 낮음
+        assert min(quality["a"], quality["b"]) > quality["c"]
+        # 기준 제공자와의 유사도는 비교 결과 값을 재사용
+        assert quality["a"] == round((1.0 + 0.2) / 2, 4)
+        router = make_router([DelayedProvider(name) for name in ("c", "a", "b")], stats=stats)
+        assert router.rank()[-1][0] == "c"
+
+
+@pytest.mark.asyncio
+class TestProviderRouter:
+    async def test_routes_to_single_best_provider(self):
+        expensive, cheap = DelayedProvider("expensive"), DelayedProvider("cheap")
+        router = make_router([expensive, cheap], costs={"expensive": 3.0, "cheap": 1.0})
+        routed = await router.route(b"img")
+
+        assert routed["provider"] == "cheap"
+        assert routed["accepted"] is True
+        assert (expensive.calls, cheap.calls) == (0, 1)
+
+    async def test_hedges_when_primary_is_slow(self):
+        slow, fast = DelayedProvider("slow", delay=1.0), DelayedProvider("fast", delay=0.01)
+        router = make_router([slow, fast], hedge_after=0.05)
+        routed = await router.route(b"img")
+
+        assert routed["provider"] == "fast"
+        assert routed["attempts"][0]["hedge"] is True
+        assert routed["elapsed"] < 500
+
+    async def test_falls_back_on_low_confidence(self):
+        primary = DelayedProvider("primary", confidence=0.3)
+        secondary = DelayedProvider("secondary", confidence=0.95)
+        router = make_router([primary, secondary])
+        routed = await router.route(b"img")
+
+        assert routed["provider"] == "secondary"
+        assert [a["rejected"] for a in routed["attempts"]] == ["low_confidence", None]
+
+    async def test_failures_lower_rank(self):
+        stats = ProviderStats()
+        for _ in range(10):
+            stats.record("flaky", ocr(success=False))
+            stats.record("steady", ocr())
+        router = make_router([DelayedProvider("flaky"), DelayedProvider("steady")], stats=stats)
+
+        assert router.rank()[0][0] == "steady"
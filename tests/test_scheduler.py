@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from app.services.executor import ProviderExecutor
+from app.services.resilience import CircuitBreakers
+from app.services.scheduler import BatchItem, BatchScheduler
+
+
+class FakeComparator:
+    """제공자별 동시 호출 수를 기록하는 가짜 비교기"""
+
+    def __init__(self, delay=0.02, failing=()):
+        self.delay = delay
+        self.failing = set(failing)
+        # 실패 응답이 전역 서킷 브레이커를 열지 않도록 별도 브레이커 사용
+        self.executor = ProviderExecutor(timeouts={}, default_timeout=5, quorum=0, breakers=CircuitBreakers())
+        self.active = {"google_vision": 0, "naver_clova": 0}
+        self.peak = {"google_vision": 0, "naver_clova": 0}
+
+    def _call(self, provider):
+        async def call():
+            self.active[provider] += 1
+            self.peak[provider] = max(self.peak[provider], self.active[provider])
+            await asyncio.sleep(self.delay)
+            self.active[provider] -= 1
+            if provider in self.failing:
+                return {"provider": provider, "success": False, "full_text": "", "process_time": 1.0, "error": "down"}
+            return {"provider": provider, "success": True, "full_text": "ok", "process_time": 1.0}
+        return call
+
+    async def compare_ocr_results(self, image_content, quorum=None, limits=None):
+        return await self.executor.run({
+            "google_vision": self._call("google_vision"),
+            "naver_clova": self._call("naver_clova"),
+        }, limits=limits)
+
+
+def make_items(count):
+    def loader(i):
+        async def load():
+            return f"image-{i}".encode()
+        return load
+    return [BatchItem(i, f"{i}.png", loader(i)) for i in range(count)]
+
+
+@pytest.mark.asyncio
+class TestBatchScheduler:
+    async def test_respects_provider_limits(self):
+        comparator = FakeComparator()
+        scheduler = BatchScheduler(comparator, workers=8,
+                                   provider_limits={"google_vision": 2, "naver_clova": 3})
+        results = [line async for line in scheduler.run(make_items(20))]
+
+        assert sorted(r["index"] for r in results) == list(range(20))
+        assert all(r["success"] for r in results)
+        assert comparator.peak["google_vision"] <= 2
+        assert comparator.peak["naver_clova"] <= 3
+
+    async def test_rejected_items_are_reported(self):
+        scheduler = BatchScheduler(FakeComparator(), workers=2, provider_limits={})
+        items = make_items(2) + [BatchItem(2, "notes.txt", None, error="File must be an image")]
+        results = {r["index"]: r async for r in scheduler.run(items)}
+
+        assert results[2]["success"] is False
+        assert results[2]["error"] == "File must be an image"
+        assert results[0]["success"] and results[1]["success"]
+
+    async def test_items_where_every_provider_failed_are_failures(self):
+        all_failed = BatchScheduler(FakeComparator(failing=["google_vision", "naver_clova"]), workers=2, provider_limits={})
+        one_failed = BatchScheduler(FakeComparator(failing=["naver_clova"]), workers=2, provider_limits={})
+        failed = [line async for line in all_failed.run(make_items(2))]
+        partial = [line async for line in one_failed.run(make_items(2))]
+
+        assert not any(line["success"] for line in failed)
+        assert failed[0]["error"] == "google_vision: down; naver_clova: down"
+        # 한 제공자라도 성공하면 비교 결과가 있는 항목
+        assert all(line["success"] for line in partial)
@@ -0,0 +1,138 @@
+import sys
+import time
+import pytest
+from app.core.metrics import MetricsRegistry
+from app.services.cache import SharedCacheBackend
+from app.services.ratelimit import ClientRateLimiter, SharedTokenBucket
+from app.services.shared import SQLiteSharedStore, create_shared_store
+from app.services.sheet_writer import SheetWriter
+
+
+def two_workers(tmp_path):
+    """같은 파일을 여는 두 워커의 저장소 연결"""
+    path = str(tmp_path / "state.sqlite3")
+    return SQLiteSharedStore(path), SQLiteSharedStore(path)
+
+
+class TestSQLiteSharedStore:
+    def test_bucket_is_shared_between_connections(self, tmp_path):
+        first, second = two_workers(tmp_path)
+        a = SharedTokenBucket(first, "provider:p", rate=10, burst=2)
+        b = SharedTokenBucket(second, "provider:p", rate=10, burst=2)
+
+        assert a.acquire() == (True, 0.0)
+        assert b.acquire() == (True, 0.0)
+        # 두 워커가 버스트 2개를 나눠 썼으므로 세 번째는 대기
+        assert a.acquire()[0] is False
+        assert 0.09 <= b.reserve(max_wait=0.15) <= 0.1
+        assert b.reserve(max_wait=0.15) is None
+
+    def test_level_read_does_not_take_write_lock(self, tmp_path):
+        first, second = two_workers(tmp_path)
+        bucket = SharedTokenBucket(first, "provider:p", rate=10, burst=2)
+        bucket.acquire()
+        # 다른 워커가 쓰기 트랜잭션을 잡고 있어도 잔량 조회는 기다리지 않음
+        second._conn.execute("BEGIN IMMEDIATE")
+        try:
+            start = time.monotonic()
+            assert bucket.wait_time() == 0.0
+            assert 1 <= bucket.status()["tokens"] <= 2
+            assert time.monotonic() - start < 0.5
+        finally:
+            second._conn.execute("ROLLBACK")
+
+    def test_client_limits_span_workers(self, tmp_path):
+        first, second = two_workers(tmp_path)
+        limiters = [ClientRateLimiter(enabled=True, rate=0.1, burst=2, tenant_limits={}, store=store)
+                    for store in (first, second)]
+
+        assert limiters[0].check("ip:1") is None
+        assert limiters[1].check("ip:1") is None
+        assert limiters[0].check("ip:1") > 1
+        assert limiters[1].check("ip:2") is None
+
+    def test_kv_expiry_and_scan(self, tmp_path):
+        first, second = two_workers(tmp_path)
+        first.set("metrics:1", {"a": 1}, ttl=60)
+        second.set("metrics:2", {"a": 2}, ttl=60)
+        second.set("metrics:old", {"a": 3}, ttl=-1)
+        first.set("cache:x", {"b": 1}, ttl=60)
+
+        assert second.get("metrics:1") == {"a": 1}
+        assert first.scan("metrics:") == {"metrics:1": {"a": 1}, "metrics:2": {"a": 2}}
+
+    def test_lease_has_one_owner(self, tmp_path):
+        first, second = two_workers(tmp_path)
+
+        assert first.claim("sheet_sync", "1", ttl=60) is True
+        assert second.claim("sheet_sync", "2", ttl=60) is False
+        # 소유자는 갱신 가능, 만료되면 다른 워커가 가져감
+        assert first.claim("sheet_sync", "1", ttl=0.05) is True
+        time.sleep(0.06)
+        assert second.claim("sheet_sync", "2", ttl=60) is True
+
+    def test_release_only_by_owner(self, tmp_path):
+        first, second = two_workers(tmp_path)
+        first.claim("jobs_resume:boot-a", "1", ttl=60)
+
+        second.release("jobs_resume:boot-a", "2")
+        assert second.claim("jobs_resume:boot-a", "2", ttl=60) is False
+        first.release("jobs_resume:boot-a", "1")
+        assert second.claim("jobs_resume:boot-a", "2", ttl=60) is True
+        # 다른 기동(boot id)의 리스는 서로 막지 않음
+        assert first.claim("jobs_resume:boot-b", "1", ttl=60) is True
+
+    def test_redis_backend_without_package(self, monkeypatch):
+        # redis 패키지가 없으면 저장소 생성 시점에 설치 안내와 함께 실패
+        monkeypatch.setitem(sys.modules, "redis", None)
+        with pytest.raises(RuntimeError, match="requires the redis package"):
+            create_shared_store("redis", "", "redis://localhost:6379/0")
+
+    def test_shared_cache_backend(self, tmp_path):
+        first, second = two_workers(tmp_path)
+        expires_at = time.time() + 60
+        SharedCacheBackend(first).set("k", {"full_text": "hi"}, expires_at)
+
+        assert SharedCacheBackend(second).get("k") == ({"full_text": "hi"}, expires_at)
+        SharedCacheBackend(second).clear()
+        assert SharedCacheBackend(first).get("k") is None
+
+
+class TestSheetWritePacing:
+    def test_append_calls_share_write_budget(self, tmp_path):
+        store, _ = two_workers(tmp_path)
+        calls = []
+
+        class Service:
+            def append_rows(self, sheet_name, rows):
+                calls.append(time.monotonic())
+
+        writer = SheetWriter(Service, batch_size=1, flush_interval=5, write_rate=20,
+                             spill_path=str(tmp_path / "spill.jsonl"), store=store)
+        futures = [writer.submit("s", [i]) for i in range(3)]
+        assert all(future.result(timeout=2)["saved"] for future in futures)
+        writer.stop()
+
+        # 초당 20회 예산이므로 호출 간격은 약 0.05초
+        assert calls[-1] - calls[0] >= 0.09
+        assert writer.stats()["write_wait"] > 0
+
+
+class TestMetricsMerge:
+    def test_render_merges_worker_snapshots(self):
+        def worker(requests, ratio, breaker):
+            registry = MetricsRegistry()
+            registry.counter("requests_total", "Requests", ("route",)).inc(requests, route="/a")
+            registry.gauge("hit_ratio", "Hit ratio", merge_mode="mean").set(ratio)
+            registry.gauge("circuit_open", "Breaker", ("provider",), merge_mode="max").set(breaker, provider="p")
+            registry.histogram("latency_seconds", "Latency", buckets=(1,)).observe(0.5)
+            return registry
+
+        first, second = worker(3, 0.2, 0.0), worker(4, 0.6, 1.0)
+        text = first.render([first.snapshot(), second.snapshot()])
+
+        assert 'requests_total{route="/a"} 7.0' in text
+        assert "hit_ratio 0.4" in text
+        assert 'circuit_open{provider="p"} 1.0' in text
+        assert 'latency_seconds_bucket{le="1.0"} 2' in text
+        assert "latency_seconds_count 2" in text
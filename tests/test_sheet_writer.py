@@ -0,0 +1,79 @@
+import time
+from app.services.sheet_writer import SheetWriter
+
+
+class FakeSheetsService:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = []
+
+    def append_rows(self, sheet_name, rows):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("Quota exceeded")
+        self.calls.append((sheet_name, rows))
+
+
+class TestSheetWriter:
+    def test_rows_are_flushed_in_one_batch(self, tmp_path):
+        service = FakeSheetsService()
+        writer = SheetWriter(lambda: service, batch_size=3, flush_interval=5,
+                             spill_path=str(tmp_path / "spill.jsonl"))
+        futures = [writer.submit("OCR Comparison", [i]) for i in range(3)]
+        results = [future.result(timeout=2) for future in futures]
+        writer.stop()
+
+        assert service.calls == [("OCR Comparison", [[0], [1], [2]])]
+        assert all(result["saved"] for result in results)
+
+    def test_flush_on_interval_and_stop(self, tmp_path):
+        service = FakeSheetsService()
+        writer = SheetWriter(lambda: service, batch_size=100, flush_interval=0.05,
+                             spill_path=str(tmp_path / "spill.jsonl"))
+        first = writer.submit("a", [1])
+        assert first.result(timeout=2)["saved"] is True
+        writer.submit("b", [2])
+        writer.stop()
+
+        assert service.calls == [("a", [[1]]), ("b", [[2]])]
+
+    def test_failed_rows_spill_and_retry(self, tmp_path):
+        spill_path = tmp_path / "spill.jsonl"
+        service = FakeSheetsService(failures=1)
+        writer = SheetWriter(lambda: service, batch_size=2, flush_interval=5,
+                             retry_interval=0.05, spill_path=str(spill_path))
+        futures = [writer.submit("OCR Comparison", [i]) for i in range(2)]
+        results = [future.result(timeout=2) for future in futures]
+
+        assert all(result["queued"] and not result["saved"] for result in results)
+        # 재시도 주기가 지나면 스필 파일의 행이 다시 기록됨
+        for _ in range(100):
+            if not spill_path.exists():
+                break
+            time.sleep(0.02)
+        writer.stop()
+
+        assert not spill_path.exists()
+        assert service.calls == [("OCR Comparison", [[0], [1]])]
+        assert writer.stats()["rows_written"] == 2
+
+    def test_start_retries_existing_spill_without_submit(self, tmp_path):
+        spill_path = tmp_path / "spill.jsonl"
+        spill_path.write_text(
+            '{"sheet_name": "OCR Comparison", "row": [1]}\n{"sheet_name": "OCR Comparison", "row": [2]}\n',
+            encoding="utf-8")
+        service = FakeSheetsService()
+        # 재시도 주기가 길어도 기동 직후 한 번은 바로 재시도
+        writer = SheetWriter(lambda: service, batch_size=10, flush_interval=5,
+                             retry_interval=60, spill_path=str(spill_path))
+        assert writer.stats()["spill_pending"] is True
+        writer.start()
+        for _ in range(100):
+            if not spill_path.exists():
+                break
+            time.sleep(0.02)
+        writer.stop()
+
+        assert not spill_path.exists()
+        assert service.calls == [("OCR Comparison", [[1], [2]])]
+        assert writer.stats()["rows_written"] == 2
@@ -0,0 +1,58 @@
+import random
+import pytest
+from app.services.text_metrics import compare_texts, cer, levenshtein, levenshtein_python, normalize_text, wer
+
+
+def naive_levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y)))
+        previous = current
+    return previous[-1]
+
+
+@pytest.mark.parametrize("distance", [levenshtein, levenshtein_python])
+class TestLevenshtein:
+    @pytest.mark.parametrize("a, b, expected", [
+        ("", "", 0),
+        ("abc", "", 3),
+        ("kitten", "sitting", 3),
+        ("합계 12,000원", "합계 12.000원", 1),
+        ("영수증", "영수증", 0),
+    ])
+    def test_known_distances(self, distance, a, b, expected):
+        assert distance(a, b) == expected
+        assert distance(b, a) == expected
+
+    def test_matches_naive_dp_on_random_strings(self, distance):
+        rng = random.Random(0)
+        alphabet = "ab가나 1"
+        for _ in range(300):
+            a = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 150)))
+            b = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 150)))
+            assert distance(a, b) == naive_levenshtein(a, b)
+
+    def test_word_sequences(self, distance):
+        assert distance(["카페", "라떼", "4,500"], ["카페라떼", "4,500"]) == 2
+
+    def test_max_distance_cuts_off(self, distance):
+        assert distance("a" * 100, "b" * 100, max_distance=5) == 6
+        assert distance("abcdef", "abcxef", max_distance=5) == 1
+
+
+class TestErrorRates:
+    def test_normalization_ignores_whitespace_layout(self):
+        assert normalize_text("합계\n 12,000  원") == "합계 12,000 원"
+        assert cer("합계\n12,000", "합계 12,000") == 0.0
+
+    def test_cer_and_wer(self):
+        assert cer("abcd", "abxd") == 0.25
+        assert wer("아메리카노 2잔 9,000", "아메리카노 2잔 8,000") == pytest.approx(1 / 3)
+
+    def test_compare_texts(self):
+        metrics = compare_texts("총 합계 12,000", "총 합계 12,000")
+        assert metrics["cer"] == 0.0
+        assert metrics["char_similarity"] == 1.0
+        assert compare_texts("", "")["cer"] == 0.0
@@ -0,0 +1,59 @@
+"""
+Ground Truth 기반 오프라인 평가
+
+    # 실제 제공자 호출 후 출력 기록
+    python validation/evaluate.py ground_truth.json --record outputs.jsonl --report report.json
+    # 기록된 출력 재사용 (네트워크 호출 없음)
+    python validation/evaluate.py ground_truth.json --replay outputs.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.services.evaluation import (  # noqa: E402
+    collect_outputs, format_report, load_ground_truth, load_outputs, save_outputs, score
+)
+
+
+async def run(args):
+    items = load_ground_truth(args.ground_truth)
+    if args.replay:
+        outputs = load_outputs(args.replay)
+    else:
+        from app.services.comparator import OCRComparator
+        from app.services.scheduler import BatchScheduler
+
+        comparator = OCRComparator()
+        try:
+            outputs = await collect_outputs(BatchScheduler(comparator, workers=args.workers), items)
+        finally:
+            await comparator.registry.aclose()
+        if args.record:
+            save_outputs(args.record, outputs)
+
+    providers = args.providers.split(",") if args.providers else settings.OCR_PROVIDERS
+    report = score(items, outputs, providers=providers)
+    print(format_report(report))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate OCR providers against ground truth")
+    parser.add_argument("ground_truth", help="Ground Truth JSON 파일")
+    parser.add_argument("--replay", help="기록된 제공자 출력(JSONL)으로 평가")
+    parser.add_argument("--record", help="실제 호출한 출력을 JSONL로 저장")
+    parser.add_argument("--report", help="평가 결과 JSON 저장 경로")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--providers", help="평가할 제공자 (쉼표 구분, 기본값: OCR_PROVIDERS 설정)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()